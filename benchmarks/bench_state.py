@@ -0,0 +1,77 @@
+"""Замер памяти на состояние арендаторов: словари против колонок.
+
+Запуск: `python benchmarks/bench_state.py [число арендаторов ...]`.
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from state import TenantStates  # noqa: E402
+
+TENANT_COUNTS = (10_000, 100_000, 1_000_000)
+STATUSES = ('approved', 'reviewing', 'rejected')
+ROW = '{kind:>8} {count:>10} {total:>12} {per_tenant:>10.1f} {seconds:>8.3f}'
+
+
+def build_dicts(count):
+    """Состояние в виде словаря на арендатора, как в `main()`."""
+    timestamp = int(time.time())
+    return {
+        tenant: {
+            'timestamp': timestamp + tenant,
+            'recent_error_message': '',
+            'status': STATUSES[tenant % 3],
+            'next_due': float(tenant),
+        }
+        for tenant in range(count)
+    }
+
+
+def build_columns(count):
+    """Состояние в колоночном хранилище."""
+    states = TenantStates(STATUSES)
+    states.extend(count, timestamp=int(time.time()))
+    for tenant in range(count):
+        states.timestamps[tenant] += tenant
+        states.next_due[tenant] = float(tenant)
+        states.set_status(tenant, STATUSES[tenant % 3])
+    return states
+
+
+def measure(build, count):
+    """Пиковая память и время построения состояния."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    states = build(count)
+    seconds = time.perf_counter() - started
+    total = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del states
+    return total, seconds
+
+
+def run(counts=TENANT_COUNTS):
+    """Результаты замеров для каждого числа арендаторов."""
+    results = []
+    for count in counts:
+        for kind, build in (('dicts', build_dicts),
+                            ('columns', build_columns)):
+            total, seconds = measure(build, count)
+            results.append({
+                'kind': kind,
+                'count': count,
+                'total': total,
+                'per_tenant': total / count,
+                'seconds': seconds,
+            })
+    return results
+
+
+if __name__ == '__main__':
+    counts = [int(arg) for arg in sys.argv[1:]] or TENANT_COUNTS
+    print('    kind    tenants        bytes  B/tenant  seconds')
+    for result in run(counts):
+        print(ROW.format(**result))
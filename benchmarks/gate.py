@@ -0,0 +1,273 @@
+"""Проверка производительности против сохранённых замеров.
+
+Запуск:
+`python benchmarks/gate.py record [--version v1]` - замер и сохранение
+в `benchmarks/baselines/<версия>.json`;
+`python benchmarks/gate.py check benchmarks/baselines/v1.json` - замер и
+сравнение, код выхода 1 при значимом ухудшении.
+"""
+import argparse
+from datetime import datetime, timezone
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, 'tests'))
+
+import requests  # noqa: E402
+
+import homework  # noqa: E402
+from simulation import generate_timelines, simulate  # noqa: E402
+from state import TenantStates  # noqa: E402
+import utils  # noqa: E402
+
+SCHEMA = 1
+BASELINES_DIR = os.path.join(ROOT, 'benchmarks', 'baselines')
+THRESHOLD = 0.1
+NOISE_FACTOR = 3
+REPEAT = 5
+STATUSES = tuple(homework.HOMEWORK_VERDICTS)
+LOWER = 'lower'
+HIGHER = 'higher'
+ROW = '{name:<22} {baseline:>14.6g} {current:>14.6g} {change:>+8.1%} {verdict}'
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(funcName)s - %(message)s'
+
+
+def mocked_api():
+    """Подмена `requests.get`, меняющая статус работы на каждом запросе."""
+    calls = []
+
+    def get(*args, **kwargs):
+        calls.append(1)
+        return utils.MockResponseGET(*args, data={
+            'homeworks': [{
+                'homework_name': 'hw',
+                'status': STATUSES[len(calls) % len(STATUSES)],
+            }],
+            'current_date': len(calls),
+        }, **kwargs)
+    return get
+
+
+def logged_cycles(cycles):
+    """Циклы `poll_once` с заглушками API и бота и журналом в файл.
+
+    Записи бота доходят только до файла: передача корневому журналу
+    отключена, а предупреждения заглушки `requests.get` поглощаются.
+    """
+    with tempfile.TemporaryDirectory() as directory, \
+            mock.patch.object(requests, 'get', mocked_api()), \
+            mock.patch.object(homework, '__file__',
+                              os.path.join(directory, 'homework.py')):
+        handler = homework.create_log_handler()
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        homework.logger.addHandler(handler)
+        level = homework.logger.level
+        propagate = homework.logger.propagate
+        homework.logger.setLevel(logging.DEBUG)
+        homework.logger.propagate = False
+        silence = logging.NullHandler()
+        logging.root.addHandler(silence)
+        try:
+            bot = utils.MockTelegramBot()
+            extensions = homework.Extensions(None, None, None, None)
+            timestamp = 0
+            started = time.perf_counter()
+            for _ in range(cycles):
+                timestamp = homework.poll_once(bot, timestamp, extensions)
+            return time.perf_counter() - started
+        finally:
+            logging.root.removeHandler(silence)
+            homework.logger.propagate = propagate
+            homework.logger.setLevel(level)
+            homework.logger.removeHandler(handler)
+            handler.close()
+
+
+def cycle_latency(scale):
+    """Среднее время цикла опроса, секунды."""
+    cycles = 1000 * scale
+    return logged_cycles(cycles) / cycles
+
+
+def cycle_peak_memory(scale):
+    """Пик выделенной памяти за циклы опроса, байты."""
+    tracemalloc.start()
+    try:
+        logged_cycles(100 * scale)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def parse_throughput(scale):
+    """Проверка и разбор ответа API, работ в секунду."""
+    response = {'homeworks': [
+        {'homework_name': f'hw{index}', 'status': STATUSES[index % 3]}
+        for index in range(500)
+    ], 'current_date': 0}
+    count = 0
+    started = time.perf_counter()
+    for _ in range(10 * scale):
+        homework.check_response(response)
+        for item in response['homeworks']:
+            homework.parse_status(item)
+            count += 1
+    return count / (time.perf_counter() - started)
+
+
+def simulation_throughput(scale):
+    """Запросов к API в секунду при моделировании общего опроса."""
+    duration = 24 * 3600
+    timelines = generate_timelines(100 * scale, duration)
+    started = time.perf_counter()
+    report = simulate(timelines, duration)
+    return report['api_calls'] / (time.perf_counter() - started)
+
+
+def state_memory(scale):
+    """Память колоночного состояния на арендатора, байты."""
+    count = 10_000 * scale
+    tracemalloc.start()
+    try:
+        states = TenantStates(STATUSES)
+        states.extend(count)
+        return tracemalloc.get_traced_memory()[0] / count
+    finally:
+        tracemalloc.stop()
+
+
+SCENARIOS = {
+    'cycle_latency': (cycle_latency, LOWER, 's'),
+    'cycle_peak_memory': (cycle_peak_memory, LOWER, 'B'),
+    'parse_throughput': (parse_throughput, HIGHER, '1/s'),
+    'simulation_throughput': (simulation_throughput, HIGHER, '1/s'),
+    'state_memory': (state_memory, LOWER, 'B'),
+}
+
+
+def measure(names=None, repeat=REPEAT, scale=1):
+    """Замеры сценариев: медиана и относительный разброс (MAD)."""
+    results = {}
+    for name in names or SCENARIOS:
+        scenario, better, unit = SCENARIOS[name]
+        scenario(1)
+        samples = [scenario(scale) for _ in range(repeat)]
+        median = statistics.median(samples)
+        mad = statistics.median(abs(sample - median) for sample in samples)
+        results[name] = {
+            'better': better,
+            'unit': unit,
+            'samples': samples,
+            'median': median,
+            'noise': mad / median if median else 0,
+        }
+    return results
+
+
+def git_revision():
+    """Текущая ревизия git или None."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def baseline(results, version):
+    """Документ замеров с версией и окружением."""
+    return {
+        'schema': SCHEMA,
+        'version': version,
+        'revision': git_revision(),
+        'created': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+
+
+def compare(base, current, threshold=THRESHOLD, noise_factor=NOISE_FACTOR):
+    """Строки `(имя, было, стало, изменение, ухудшение)` по сценариям.
+
+    Изменение считается ухудшением, если оно в худшую сторону больше
+    порога `threshold` и больше `noise_factor` суммарных разбросов.
+    """
+    rows = []
+    for name, result in current.items():
+        if name not in base:
+            continue
+        before = base[name]['median']
+        change = (result['median'] - before) / before if before else 0
+        worse = change if result['better'] == LOWER else -change
+        allowed = max(
+            threshold,
+            noise_factor * (base[name]['noise'] + result['noise'])
+        )
+        rows.append((name, before, result['median'], change, worse > allowed))
+    return rows
+
+
+def parse_args(args=None):
+    """Разбор аргументов командной строки."""
+    parser = argparse.ArgumentParser(
+        description='Проверка производительности против сохранённых замеров.'
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+    record = commands.add_parser('record')
+    record.add_argument('--version', default=git_revision() or 'local')
+    record.add_argument('--output')
+    check = commands.add_parser('check')
+    check.add_argument('baseline')
+    check.add_argument('--threshold', type=float, default=THRESHOLD)
+    check.add_argument('--noise-factor', type=float, default=NOISE_FACTOR)
+    for command in (record, check):
+        command.add_argument('--repeat', type=int, default=REPEAT)
+        command.add_argument('--scale', type=int, default=1)
+        command.add_argument(
+            '--scenarios', type=lambda value: value.split(',')
+        )
+    return parser.parse_args(args)
+
+
+def main(args=None):
+    """Запуск из командной строки; возвращает код выхода."""
+    options = parse_args(args)
+    if options.command == 'record':
+        results = measure(options.scenarios, options.repeat, options.scale)
+        path = options.output or os.path.join(
+            BASELINES_DIR, f'{options.version}.json'
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(baseline(results, options.version), file, indent=2)
+        print(path)
+        return 0
+    with open(options.baseline, encoding='utf-8') as file:
+        base = json.load(file)['results']
+    results = measure(
+        options.scenarios or list(base), options.repeat, options.scale
+    )
+    rows = compare(base, results, options.threshold, options.noise_factor)
+    for name, before, after, change, regressed in rows:
+        print(ROW.format(
+            name=name, baseline=before, current=after, change=change,
+            verdict='REGRESSION' if regressed else 'ok'
+        ))
+    return 1 if any(row[-1] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+import argparse
+import gzip
+import json
+import threading
+import time
+
+
+REDACTED = '<redacted>'
+SEPARATORS = (',', ':')
+
+REPLAY_ERROR_MESSAGE = 'Запись {index}: {error}'
+
+
+def open_log(path, mode):
+    """Открытие журнала; файлы `.gz` сжимаются gzip."""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class Capture:
+    """Запись ответов API в журнал только для добавления.
+
+    Каждая строка журнала - компактный JSON с временем записи, параметром
+    `from_date`, статусом и исходным телом ответа. Секреты из `secrets`
+    заменяются на `<redacted>`, заголовки запроса не записываются.
+    """
+
+    def __init__(self, path, secrets=(), clock=time.time):
+        self.path = path
+        self.secrets = [secret for secret in secrets if secret]
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.file = open_log(path, 'a')
+
+    def redact(self, text):
+        """Замена секретов в тексте."""
+        for secret in self.secrets:
+            text = text.replace(secret, REDACTED)
+        return text
+
+    def record(self, from_date, status_code, body):
+        """Добавление ответа API в журнал."""
+        line = json.dumps({
+            'time': self.clock(),
+            'from_date': from_date,
+            'status_code': status_code,
+            'body': self.redact(body),
+        }, ensure_ascii=False, separators=SEPARATORS)
+        with self.lock:
+            self.file.write(line + '\n')
+            self.file.flush()
+
+    def close(self):
+        """Закрытие журнала."""
+        with self.lock:
+            self.file.close()
+
+
+def read_log(path):
+    """Записи журнала по порядку."""
+    with open_log(path, 'r') as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def load_responses(path, status_code=200):
+    """Разобранные ответы API из журнала, например для фикстур тестов."""
+    return [
+        json.loads(entry['body']) for entry in read_log(path)
+        if entry['status_code'] == status_code
+    ]
+
+
+def replay(path, check, parse, repeat=1, clock=time.perf_counter):
+    """Прогон журнала через проверку и разбор с максимальной скоростью.
+
+    Возвращает число ответов, работ, ошибок и пропускную способность.
+    """
+    bodies = [
+        entry['body'] for entry in read_log(path)
+        if entry['status_code'] == 200
+    ]
+    homeworks = 0
+    errors = []
+    started = clock()
+    for _ in range(repeat):
+        for index, body in enumerate(bodies):
+            try:
+                response = json.loads(body)
+                check(response)
+                for item in response['homeworks']:
+                    parse(item)
+                    homeworks += 1
+            except Exception as error:
+                errors.append(
+                    REPLAY_ERROR_MESSAGE.format(index=index, error=error)
+                )
+    seconds = clock() - started
+    return {
+        'responses': len(bodies) * repeat,
+        'homeworks': homeworks,
+        'errors': errors,
+        'seconds': seconds,
+        'responses_per_second': len(bodies) * repeat / seconds
+        if seconds else None,
+        'homeworks_per_second': homeworks / seconds if seconds else None,
+    }
+
+
+if __name__ == '__main__':
+    import homework
+
+    parser = argparse.ArgumentParser(
+        description='Прогон записанных ответов API через разбор.'
+    )
+    parser.add_argument('path')
+    parser.add_argument('--repeat', type=int, default=1)
+    options = parser.parse_args()
+    report = replay(
+        options.path, homework.check_response, homework.parse_status,
+        options.repeat
+    )
+    print(json.dumps(report, ensure_ascii=False, indent=2))
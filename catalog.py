@@ -0,0 +1,145 @@
+from functools import lru_cache
+import json
+from string import Formatter
+
+
+RENDER_CACHE_SIZE = 4096
+
+LOCALES = {
+    'en': {
+        'verdicts': {
+            'approved': 'The work has been reviewed: the reviewer liked '
+                        'everything. Hooray!',
+            'reviewing': 'The work has been taken for review.',
+            'rejected': 'The work has been reviewed: the reviewer has '
+                        'comments.',
+        },
+        'messages': {
+            'status': 'The review status of "{name}" has changed. {verdict}',
+            'digest_header': 'Review statuses have changed ({count}):',
+            'digest_line': '"{name}": {verdict}',
+            'error': 'Bot failure: {new_error}',
+        },
+    },
+}
+
+UNKNOWN_LOCALE_MESSAGE = 'Неизвестная локаль {locale}.'
+
+
+def parse_chat_locales(value):
+    """Разбор настройки вида `чат:локаль,чат:локаль`."""
+    return dict(
+        (part.strip() for part in item.split(':', 1))
+        for item in value.split(',') if ':' in item
+    )
+
+
+class Template:
+    """Шаблон `str.format`, разобранный один раз при загрузке.
+
+    Поля из `fixed` подставляются сразу, остальные хранятся списком
+    частей, так что отрисовка - склейка строк без повторного разбора.
+    """
+
+    __slots__ = ('parts',)
+
+    def __init__(self, text, **fixed):
+        self.parts = []
+        literal = ''
+        for prefix, field, spec, _ in Formatter().parse(text):
+            literal += prefix
+            if field is None:
+                continue
+            if field in fixed:
+                literal += format(fixed[field], spec)
+                continue
+            self.parts.extend((literal, (field, spec)))
+            literal = ''
+        self.parts.append(literal)
+
+    def render(self, **values):
+        """Подстановка значений полей."""
+        return ''.join(
+            part if isinstance(part, str) else format(values[part[0]], part[1])
+            for part in self.parts
+        )
+
+
+class Catalog:
+    """Каталог сообщений с выбором локали по чату и кешем отрисовки.
+
+    Для каждой пары (локаль, статус) шаблон сообщения компилируется при
+    загрузке с уже подставленным вердиктом. Готовые сообщения для
+    (локаль, статус, название работы) хранятся в ограниченном LRU-кеше.
+    Вердикты и сообщения, которых нет в локали, берутся из локали по
+    умолчанию.
+    """
+
+    def __init__(self, locales, default_locale, chat_locales=None,
+                 cache_size=RENDER_CACHE_SIZE):
+        self.default_locale = default_locale
+        self.chat_locales = chat_locales or {}
+        self.verdicts = {}
+        self.statuses = {}
+        self.messages = {}
+        self.texts = {}
+        defaults = locales[default_locale]
+        for locale, catalog in locales.items():
+            messages = {**defaults['messages'], **catalog.get('messages', {})}
+            verdicts = {**defaults['verdicts'], **catalog.get('verdicts', {})}
+            self.verdicts[locale] = verdicts
+            self.texts[locale] = messages
+            self.messages[locale] = {
+                key: Template(text) for key, text in messages.items()
+            }
+            self.statuses[locale] = {
+                status: Template(messages['status'], verdict=verdict)
+                for status, verdict in verdicts.items()
+            }
+        self.status = lru_cache(maxsize=cache_size)(self.render_status)
+
+    @classmethod
+    def load(cls, path, locales, default_locale, chat_locales=None):
+        """Каталог из встроенных локалей и локалей из JSON-файла."""
+        locales = {**LOCALES, **locales}
+        if path:
+            with open(path, encoding='utf-8') as file:
+                locales.update(json.load(file))
+        return cls(locales, default_locale, chat_locales)
+
+    def locale(self, chat_id):
+        """Локаль чата."""
+        return self.chat_locales.get(chat_id, self.default_locale)
+
+    def render_status(self, locale, status, name):
+        """Сообщение об изменении статуса без кеша."""
+        if locale not in self.statuses:
+            raise KeyError(UNKNOWN_LOCALE_MESSAGE.format(locale=locale))
+        return self.statuses[locale][status].render(name=name)
+
+    def for_chat(self, chat_id, homework):
+        """Сообщение об изменении статуса на языке чата."""
+        return self.status(
+            self.locale(chat_id), homework['status'], homework['homework_name']
+        )
+
+    def text(self, locale, key):
+        """Исходный шаблон сообщения локали по ключу."""
+        return self.texts[locale][key]
+
+    def message(self, locale, key, **values):
+        """Прочее сообщение локали по ключу."""
+        return self.messages[locale][key].render(**values)
+
+    def digest(self, chat_id, statuses):
+        """Дайджест `{название работы: статус}` на языке чата."""
+        locale = self.locale(chat_id)
+        verdicts = self.verdicts[locale]
+        return '\n'.join(
+            [self.message(locale, 'digest_header', count=len(statuses))] + [
+                self.message(
+                    locale, 'digest_line', name=name, verdict=verdicts[status]
+                )
+                for name, status in statuses.items()
+            ]
+        )
@@ -0,0 +1,214 @@
+from collections import deque
+import logging
+import threading
+import time
+
+from metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+POLL_TIMEOUT = 30
+ERROR_DELAY = 5
+DEFERRED_SIZE = 50
+
+STATUS_LINE = '"{name}": {verdict}'
+NO_STATUS_MESSAGE = 'Статусы работ пока неизвестны.'
+STATS_HEADER = 'Работает {uptime} с.'
+STATS_LINE = '{name}: {value}'
+STATS_DENIED_MESSAGE = 'Счётчики бота доступны только чату владельца.'
+PAUSED_MESSAGE = 'Уведомления приостановлены. Продолжить: /resume'
+RESUMED_MESSAGE = 'Уведомления возобновлены.'
+HELP_MESSAGE = ('Команды: /status - последние статусы работ, /stats - '
+                'счётчики бота, /pause и /resume - приостановка и '
+                'возобновление уведомлений.')
+COMMAND_MESSAGE = 'Команда {command} из чата {chat_id}.'
+UPDATES_ERROR_MESSAGE = 'Ошибка `{error}` при получении команд.'
+STARTED_MESSAGE = 'Приём команд запущен.'
+
+
+class ChatState:
+    """Последние известные статусы работ и приостановленные чаты.
+
+    Заполняется из ответов API по ходу опроса, поэтому команды
+    отвечают без запросов к API. Сообщения приостановленного чата
+    откладываются (последние `DEFERRED_SIZE`) до возобновления.
+    """
+
+    def __init__(self):
+        self.statuses = {}
+        self.paused = set()
+        self.deferred = {}
+        self.lock = threading.Lock()
+
+    def update(self, chat_id, homeworks):
+        """Запоминание статусов работ для чата."""
+        with self.lock:
+            statuses = self.statuses.setdefault(chat_id, {})
+            for homework in homeworks:
+                statuses[homework['homework_name']] = homework['status']
+
+    def get(self, chat_id):
+        """Копия статусов `{название работы: статус}` чата."""
+        with self.lock:
+            return dict(self.statuses.get(chat_id, {}))
+
+    def pause(self, chat_id, unsent=()):
+        """Приостановка уведомлений чата.
+
+        Неотправленные сообщения `unsent` ставятся перед отложенными.
+        """
+        with self.lock:
+            self.paused.add(chat_id)
+            if unsent:
+                self.deferred.setdefault(
+                    chat_id, deque(maxlen=DEFERRED_SIZE)
+                ).extendleft(reversed(unsent))
+
+    def resume(self, chat_id):
+        """Возобновление уведомлений чата; возвращает отложенные сообщения."""
+        with self.lock:
+            self.paused.discard(chat_id)
+            return deque(self.deferred.pop(chat_id, ()))
+
+    def defer(self, chat_id, message):
+        """Откладывание сообщения, если чат приостановлен; True, если да."""
+        with self.lock:
+            if chat_id not in self.paused:
+                return False
+            self.deferred.setdefault(
+                chat_id, deque(maxlen=DEFERRED_SIZE)
+            ).append(message)
+            return True
+
+    def is_paused(self, chat_id):
+        """Проверка, приостановлены ли уведомления чата."""
+        return chat_id in self.paused
+
+
+class CommandPoller:
+    """Приём команд бота длинным опросом `getUpdates` в отдельном потоке.
+
+    Ответы строятся только из `ChatState` и счётчиков `metrics`, так что
+    команды не добавляют запросов к API Практикума. Счётчики общие для
+    всех арендаторов, поэтому /stats отвечает только чатам `stats_chats`.
+    """
+
+    def __init__(self, bot, state, verdicts, timeout=POLL_TIMEOUT,
+                 clock=time.monotonic, stats_chats=()):
+        self.bot = bot
+        self.state = state
+        self.verdicts = verdicts
+        self.stats_chats = frozenset(map(str, stats_chats))
+        self.timeout = timeout
+        self.clock = clock
+        self.started = clock()
+        self.offset = None
+        self.stopped = threading.Event()
+        self.thread = None
+        self.handlers = {
+            'status': self.status,
+            'stats': self.stats,
+            'pause': self.pause,
+            'resume': self.resume,
+            'help': self.help,
+            'start': self.help,
+        }
+
+    def status(self, chat_id):
+        """Ответ на /status."""
+        statuses = self.state.get(chat_id)
+        if not statuses:
+            return NO_STATUS_MESSAGE
+        return '\n'.join(
+            STATUS_LINE.format(
+                name=name, verdict=self.verdicts.get(status, status)
+            )
+            for name, status in statuses.items()
+        )
+
+    def stats(self, chat_id):
+        """Ответ на /stats."""
+        if chat_id not in self.stats_chats:
+            return STATS_DENIED_MESSAGE
+        return '\n'.join(
+            [STATS_HEADER.format(uptime=int(self.clock() - self.started))] + [
+                STATS_LINE.format(name=name, value=value)
+                for name, value in sorted(metrics.snapshot().items())
+            ]
+        )
+
+    def pause(self, chat_id):
+        """Ответ на /pause."""
+        self.state.pause(chat_id)
+        return PAUSED_MESSAGE
+
+    def resume(self, chat_id):
+        """Ответ на /resume: сначала отложенные сообщения.
+
+        Если отправка не удалась, чат остаётся приостановленным, а
+        неотправленные сообщения - отложенными.
+        """
+        deferred = self.state.resume(chat_id)
+        while deferred:
+            try:
+                self.bot.send_message(chat_id, deferred[0])
+            except Exception:
+                self.state.pause(chat_id, deferred)
+                raise
+            deferred.popleft()
+        return RESUMED_MESSAGE
+
+    def help(self, chat_id):
+        """Ответ на /help и /start."""
+        return HELP_MESSAGE
+
+    def handle(self, update):
+        """Обработка одного обновления; возвращает ответ или None."""
+        message = update.message
+        if message is None or not message.text:
+            return None
+        if not message.text.startswith('/'):
+            return None
+        command = message.text.split()[0][1:].split('@')[0].lower()
+        handler = self.handlers.get(command)
+        if handler is None:
+            return None
+        chat_id = str(message.chat_id)
+        logger.debug(COMMAND_MESSAGE.format(command=command, chat_id=chat_id))
+        metrics.inc(f'commands.{command}')
+        return handler(chat_id)
+
+    def poll_once(self):
+        """Получение и обработка одной пачки обновлений."""
+        updates = self.bot.get_updates(
+            offset=self.offset, timeout=self.timeout,
+            allowed_updates=['message']
+        )
+        for update in updates:
+            self.offset = update.update_id + 1
+            reply = self.handle(update)
+            if reply is not None:
+                self.bot.send_message(update.message.chat_id, reply)
+
+    def run(self):
+        """Цикл приёма команд до вызова `stop`."""
+        while not self.stopped.is_set():
+            try:
+                self.poll_once()
+            except Exception as error:
+                logger.error(UPDATES_ERROR_MESSAGE.format(error=error))
+                self.stopped.wait(ERROR_DELAY)
+
+    def start(self):
+        """Запуск приёма команд в фоновом потоке."""
+        self.thread = threading.Thread(
+            target=self.run, name='commands', daemon=True
+        )
+        self.thread.start()
+        logger.info(STARTED_MESSAGE)
+        return self
+
+    def stop(self):
+        """Остановка приёма команд после текущего опроса."""
+        self.stopped.set()
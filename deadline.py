@@ -0,0 +1,74 @@
+import contextvars
+import logging
+import time
+
+from exceptions import BudgetExceeded
+from metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+current_budget = contextvars.ContextVar('current_budget', default=None)
+
+BUDGET_EXCEEDED_MESSAGE = ('Бюджет цикла {total} с исчерпан '
+                           'перед этапом `{stage}`.')
+CYCLE_OVERRUN_MESSAGE = 'Цикл превысил бюджет {total} с на {overrun:.3f} с.'
+
+
+class Budget:
+    """Бюджет времени на один цикл опроса.
+
+    Этапы цикла (запрос к API, разбор JSON, отправка сообщений) получают
+    таймаут из оставшегося бюджета, но не больше своей доли `share` от
+    общего. Если бюджет исчерпан, этап не запускается, а превышение
+    учитывается в метриках `budget_overrun.<этап>`.
+    """
+
+    def __init__(self, total, clock=time.monotonic):
+        self.total = total
+        self.clock = clock
+        self.deadline = clock() + total
+        self.token = None
+
+    def remaining(self):
+        """Оставшееся время в секундах."""
+        return self.deadline - self.clock()
+
+    def timeout(self, stage, share):
+        """Таймаут этапа; исключение, если бюджет исчерпан."""
+        remaining = self.remaining()
+        if remaining <= 0:
+            metrics.inc(f'budget_overrun.{stage}')
+            raise BudgetExceeded(
+                BUDGET_EXCEEDED_MESSAGE.format(total=self.total, stage=stage)
+            )
+        return min(remaining, self.total * share)
+
+    def start(self):
+        """Назначение бюджета текущим для этапов цикла."""
+        self.token = current_budget.set(self)
+        return self
+
+    def stop(self):
+        """Снятие бюджета и учёт превышения всего цикла."""
+        current_budget.reset(self.token)
+        overrun = -self.remaining()
+        if overrun > 0:
+            metrics.inc('budget_overrun.cycle')
+            logger.warning(
+                CYCLE_OVERRUN_MESSAGE.format(total=self.total, overrun=overrun)
+            )
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def stage_timeout(stage, share):
+    """Таймаут этапа из текущего бюджета; None вне цикла с бюджетом."""
+    budget = current_budget.get()
+    if budget is None:
+        return None
+    return budget.timeout(stage, share)
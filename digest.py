@@ -0,0 +1,83 @@
+from collections import OrderedDict
+import time
+
+
+DIGEST_HEADER = 'Изменились статусы проверки работ ({count}):'
+DIGEST_LINE = '"{name}": {verdict}'
+
+
+class Digest:
+    """Буфер изменений статусов, объединяемых в одно сообщение на чат.
+
+    Изменения копятся в течение окна `window` секунд или до `max_size`
+    работ, после чего отдаются одним сообщением. Статусы из
+    `urgent_statuses` буфер не задерживает. С каталогом `catalog`
+    дайджест отрисовывается на языке чата.
+    """
+
+    def __init__(self, verdicts, window, max_size,
+                 urgent_statuses=(), clock=time.monotonic, catalog=None):
+        self.verdicts = verdicts
+        self.catalog = catalog
+        self.window = window
+        self.max_size = max_size
+        self.urgent_statuses = frozenset(urgent_statuses)
+        self.clock = clock
+        self.buffers = {}
+        self.opened_at = {}
+
+    def add(self, chat_id, homework):
+        """Добавление изменения в буфер чата.
+
+        Возвращает False, если статус срочный и сообщение нужно отправить
+        сразу, минуя буфер.
+        """
+        status = homework['status']
+        if status in self.urgent_statuses:
+            return False
+        if chat_id not in self.buffers:
+            self.buffers[chat_id] = OrderedDict()
+            self.opened_at[chat_id] = self.clock()
+        buffer = self.buffers[chat_id]
+        buffer.pop(homework['homework_name'], None)
+        buffer[homework['homework_name']] = status
+        return True
+
+    def is_due(self, chat_id, now):
+        """Проверка, пора ли отправлять накопленное для чата."""
+        return (
+            len(self.buffers[chat_id]) >= self.max_size
+            or now - self.opened_at[chat_id] >= self.window
+        )
+
+    def flush(self, send):
+        """Отправка готовых дайджестов через `send(чат, текст)`.
+
+        Неотправленный дайджест остаётся в буфере чата и уходит в
+        следующий раз вместе с новыми изменениями. Возвращает True, если
+        отправлены все готовые.
+        """
+        now = self.clock()
+        delivered = True
+        for chat_id in [chat_id for chat_id in self.buffers
+                        if self.is_due(chat_id, now)]:
+            if send(chat_id, self.render(chat_id, self.buffers[chat_id])):
+                del self.buffers[chat_id]
+                del self.opened_at[chat_id]
+            else:
+                delivered = False
+        return delivered
+
+    def render(self, chat_id, buffer):
+        """Дайджест `{название работы: статус}` одним сообщением."""
+        if self.catalog is not None:
+            return self.catalog.digest(chat_id, buffer)
+        return '\n'.join(
+            [DIGEST_HEADER.format(count=len(buffer))] + [
+                DIGEST_LINE.format(name=name, verdict=self.verdicts[status])
+                for name, status in buffer.items()
+            ]
+        )
+
+    def __len__(self):
+        return sum(len(buffer) for buffer in self.buffers.values())
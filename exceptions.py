@@ -1,2 +1,18 @@
 class ApiError(Exception):
     pass
+
+
+class AuthError(ApiError):
+    """API отклонил токен: ответ 401 или 403."""
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+class SchemaError(TypeError):
+    """Данные не соответствуют схеме; `errors` - все найденные нарушения."""
+
+    def __init__(self, errors):
+        super().__init__('; '.join(str(error) for error in errors))
+        self.errors = errors
@@ -0,0 +1,103 @@
+from collections import deque
+import threading
+import time
+
+from metrics import metrics
+
+
+class TokenBucket:
+    """Ведро токенов: `rate` запросов в секунду с запасом `burst`."""
+
+    def __init__(self, rate, burst=None, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst or rate
+        self.clock = clock
+        self.tokens = self.burst
+        self.updated = clock()
+
+    def refill(self):
+        """Пополнение ведра за прошедшее время."""
+        now = self.clock()
+        self.tokens = min(
+            self.burst, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+
+
+class FairShare:
+    """Общий бюджет запросов к API с честным разделением по арендаторам.
+
+    `admit` раздаёт запросы на цикл длиной `horizon` секунд из токенов
+    ведра и тех, что накопятся за цикл, а `acquire` перед каждым
+    запросом ждёт его токена, так что запросы идут с частотой `rate`.
+    Когда токенов меньше, чем запросов, они раздаются по схеме deficit
+    round-robin: за проход арендатор получает `quantum * вес` запросов,
+    а недополучивший сохраняет дефицит и первым обслуживается в
+    следующий раз. Поэтому шумный арендатор не вытесняет остальных.
+    Выданные и отклонённые запросы считаются в `metrics` по арендаторам.
+    """
+
+    def __init__(self, rate, burst=None, weights=None, quantum=1,
+                 horizon=0, clock=time.monotonic, sleep=time.sleep):
+        self.bucket = TokenBucket(rate, burst, clock)
+        self.horizon = horizon
+        self.sleep = sleep
+        self.reserved = 0
+        self.weights = weights or {}
+        self.quantum = quantum
+        self.deficits = {}
+        self.ring = deque()
+        self.lock = threading.Lock()
+
+    def admit(self, demands):
+        """Раздача токенов по запросам `{арендатор: число запросов}`.
+
+        Возвращает `{арендатор: разрешено запросов}`.
+        """
+        with self.lock:
+            self.bucket.refill()
+            allowance = self.bucket.tokens + self.bucket.rate * self.horizon
+            pending = {
+                tenant: count for tenant, count in demands.items() if count
+            }
+            for tenant in pending:
+                if tenant not in self.deficits:
+                    self.deficits[tenant] = 0
+                    self.ring.append(tenant)
+            granted = dict.fromkeys(pending, 0)
+            while pending and allowance >= 1:
+                tenant = self.ring.popleft()
+                if tenant not in pending:
+                    del self.deficits[tenant]
+                    continue
+                self.deficits[tenant] += (
+                    self.quantum * self.weights.get(tenant, 1)
+                )
+                while (self.deficits[tenant] >= 1 and pending[tenant]
+                       and allowance >= 1):
+                    allowance -= 1
+                    self.deficits[tenant] -= 1
+                    pending[tenant] -= 1
+                    granted[tenant] += 1
+                if pending[tenant]:
+                    self.ring.append(tenant)
+                else:
+                    del pending[tenant]
+                    del self.deficits[tenant]
+            reserved = sum(granted.values())
+            self.bucket.tokens -= reserved
+            self.reserved += reserved
+        for tenant, count in granted.items():
+            metrics.inc(f'api_budget.{tenant}.used', count)
+        for tenant, count in pending.items():
+            metrics.inc(f'api_budget.{tenant}.denied', count)
+        return granted
+
+    def acquire(self):
+        """Ожидание токена для одного из выданных `admit` запросов."""
+        with self.lock:
+            self.bucket.refill()
+            available = self.bucket.tokens + self.reserved
+            self.reserved = max(self.reserved - 1, 0)
+        if available < 1:
+            self.sleep((1 - available) / self.bucket.rate)
@@ -0,0 +1,247 @@
+import argparse
+import json
+import logging
+import random
+import time
+from unittest import mock
+
+import requests
+from telegram.error import NetworkError, RetryAfter
+
+from deadline import Budget
+import homework
+from simulation import VirtualClock
+
+
+STATUSES = ('reviewing', 'approved', 'rejected')
+
+DEFAULT_PROFILES = {
+    'baseline': {},
+    'slow_api': {
+        'http': {'latency': {'distribution': 'lognormal',
+                             'mu': 2.5, 'sigma': 1}},
+    },
+    'flaky_api': {
+        'http': {'error_rate': 0.2, 'error_statuses': [500, 502, 503],
+                 'exception_rate': 0.05, 'truncate_rate': 0.05},
+    },
+    'telegram_throttled': {
+        'telegram': {'retry_after_rate': 0.3, 'retry_after': 30,
+                     'error_rate': 0.05},
+    },
+}
+
+INJECTED_MESSAGE = 'Внедрённый сбой'
+
+
+def latency(rng, spec):
+    """Случайная задержка в секундах по описанию распределения."""
+    if not spec:
+        return 0
+    distribution = spec.get('distribution', 'constant')
+    if distribution == 'constant':
+        return spec['value']
+    if distribution == 'uniform':
+        return rng.uniform(spec['low'], spec['high'])
+    if distribution == 'exponential':
+        return rng.expovariate(1 / spec['mean'])
+    if distribution == 'lognormal':
+        return rng.lognormvariate(spec['mu'], spec['sigma'])
+    raise ValueError(distribution)
+
+
+class FaultResponse:
+    """Ответ HTTP с заданным статусом и телом."""
+
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+        self.reason = ''
+
+    def json(self):
+        """Разбор тела; обрезанное тело вызывает JSONDecodeError."""
+        return json.loads(self.text)
+
+    def iter_content(self, chunk_size):
+        """Тело кусками для потокового разбора."""
+        data = self.text.encode()
+        return (
+            data[index:index + chunk_size]
+            for index in range(0, len(data), chunk_size)
+        )
+
+
+class FaultyHttp:
+    """Обёртка над `requests.get` с задержками, ошибками и порчей ответов.
+
+    Задержка больше переданного `timeout` превращается в
+    `requests.Timeout` после ожидания таймаута, как у настоящего клиента.
+    """
+
+    def __init__(self, get, profile, rng, sleep):
+        self.get = get
+        self.profile = profile
+        self.rng = rng
+        self.sleep = sleep
+
+    def __call__(self, *args, timeout=None, **kwargs):
+        """Запрос с внедрёнными сбоями."""
+        profile = self.profile
+        delay = latency(self.rng, profile.get('latency'))
+        if timeout is not None and delay > timeout:
+            self.sleep(timeout)
+            raise requests.Timeout(INJECTED_MESSAGE)
+        self.sleep(delay)
+        if self.rng.random() < profile.get('exception_rate', 0):
+            raise requests.ConnectionError(INJECTED_MESSAGE)
+        if self.rng.random() < profile.get('error_rate', 0):
+            return FaultResponse(
+                self.rng.choice(profile.get('error_statuses', [500])), '{}'
+            )
+        response = self.get(*args, timeout=timeout, **kwargs)
+        if self.rng.random() < profile.get('truncate_rate', 0):
+            return FaultResponse(
+                response.status_code,
+                response.text[:self.rng.randrange(len(response.text) or 1)]
+            )
+        return response
+
+
+class FaultyBot:
+    """Обёртка над Telegram-ботом с задержками, ошибками и 429."""
+
+    def __init__(self, bot, profile, rng, sleep):
+        self.bot = bot
+        self.profile = profile
+        self.rng = rng
+        self.sleep = sleep
+
+    def send_message(self, chat_id, text, timeout=None, **kwargs):
+        """Отправка с внедрёнными сбоями."""
+        profile = self.profile
+        delay = latency(self.rng, profile.get('latency'))
+        if timeout is not None and delay > timeout:
+            self.sleep(timeout)
+            raise NetworkError(INJECTED_MESSAGE)
+        self.sleep(delay)
+        if self.rng.random() < profile.get('retry_after_rate', 0):
+            raise RetryAfter(profile.get('retry_after', 1))
+        if self.rng.random() < profile.get('error_rate', 0):
+            raise NetworkError(INJECTED_MESSAGE)
+        return self.bot.send_message(chat_id, text, **kwargs)
+
+
+def inject(monkeypatch, profile, seed=0, sleep=time.sleep):
+    """Подмена `requests.get` обёрткой со сбоями через `monkeypatch`.
+
+    Оборачивается текущий `requests.get`, так что вызов подходит после
+    подмены API заглушкой в тестах.
+    """
+    get = FaultyHttp(requests.get, profile, random.Random(seed), sleep)
+    monkeypatch.setattr(requests, 'get', get)
+    return get
+
+
+class RecordingBot:
+    """Бот, запоминающий отправленные сообщения."""
+
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, chat_id, text, **kwargs):
+        """Запоминание сообщения."""
+        self.sent.append((chat_id, text))
+
+
+def scripted_get(clock):
+    """Настоящий по форме API, меняющий статус работы на каждом запросе."""
+    calls = []
+
+    def get(*args, **kwargs):
+        calls.append(kwargs.get('params'))
+        return FaultResponse(200, json.dumps({
+            'homeworks': [{
+                'homework_name': 'hw',
+                'status': STATUSES[len(calls) % len(STATUSES)],
+            }],
+            'current_date': int(clock()),
+        }))
+    return get
+
+
+def run_profile(profile, cycles=1000, seed=0,
+                retry_period=homework.RETRY_PERIOD):
+    """Прогон циклов `poll_once` под профилем сбоев в виртуальном времени.
+
+    Возвращает долю успешных циклов, пропускную способность и время
+    восстановления: от начала первого неудачного цикла серии до конца
+    следующего успешного. Курсор начинается с предыдущего цикла, так
+    что без сбоев успешен каждый цикл.
+    """
+    clock = VirtualClock()
+    rng = random.Random(seed)
+    get = FaultyHttp(scripted_get(clock), profile.get('http', {}), rng,
+                     clock.sleep)
+    bot = FaultyBot(RecordingBot(), profile.get('telegram', {}), rng,
+                    clock.sleep)
+    extensions = homework.Extensions(None, None, None, None)
+    started = clock()
+    timestamp = int(started) - retry_period
+    delivered = 0
+    failed_since = None
+    recoveries = []
+    with mock.patch.object(requests, 'get', get), \
+            mock.patch.object(homework, 'STREAM_RESPONSES', False):
+        for _ in range(cycles):
+            cycle_started = clock()
+            with Budget(homework.CYCLE_BUDGET, clock=clock):
+                try:
+                    new_timestamp = homework.poll_once(
+                        bot, timestamp, extensions
+                    )
+                    success = new_timestamp != timestamp
+                    timestamp = new_timestamp
+                except Exception:
+                    success = False
+            if success:
+                delivered += 1
+                if failed_since is not None:
+                    recoveries.append(clock() - failed_since)
+                    failed_since = None
+            elif failed_since is None:
+                failed_since = cycle_started
+            clock.sleep(retry_period)
+    elapsed = clock() - started
+    return {
+        'cycles': cycles,
+        'delivered': delivered,
+        'success_rate': delivered / cycles,
+        'throughput_per_hour': delivered / elapsed * 3600,
+        'recovery_mean': sum(recoveries) / len(recoveries)
+        if recoveries else 0,
+        'recovery_max': max(recoveries, default=0),
+    }
+
+
+def load_scenario(path):
+    """Профили и зерно генератора из JSON-файла сценария."""
+    with open(path, encoding='utf-8') as file:
+        scenario = json.load(file)
+    return scenario.get('profiles', {}), scenario.get('seed', 0)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Прогон цикла опроса под профилями сбоев.'
+    )
+    parser.add_argument('scenario', nargs='?')
+    parser.add_argument('--cycles', type=int, default=1000)
+    options = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    profiles, seed = DEFAULT_PROFILES, 0
+    if options.scenario:
+        profiles, seed = load_scenario(options.scenario)
+    print(json.dumps({
+        name: run_profile(profile, options.cycles, seed)
+        for name, profile in profiles.items()
+    }, indent=2))
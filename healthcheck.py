@@ -0,0 +1,154 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TENANT = 'default'
+CHECK_INTERVAL = 1
+
+STUCK_MESSAGE = 'Цикл опроса {tenants} не завершился за {deadline} с.'
+DUMP_MESSAGE = 'Стеки потоков записаны в {path}.'
+RESTART_MESSAGE = 'Перезапуск процесса из-за зависшего цикла опроса.'
+STARTED_MESSAGE = 'Сторож цикла опроса слушает порт {port}.'
+THREAD_HEADER = '--- Поток {name} ({ident}) ---\n'
+
+
+class Watchdog:
+    """Сторож зависших циклов опроса.
+
+    Отслеживает начало и конец цикла каждого арендатора, проверяет их в
+    фоновом потоке (`watch`) и отдаёт liveness (`/health`) и readiness
+    (`/ready`) по HTTP на локальном порту (`serve`).
+    """
+
+    def __init__(self, deadline, dump_path=None, restart=False,
+                 clock=time.monotonic):
+        self.deadline = deadline
+        self.dump_path = dump_path
+        self.restart = restart
+        self.clock = clock
+        self.started = {}
+        self.finished = {}
+        self.stuck = False
+        self.server = None
+
+    def begin(self, tenant=DEFAULT_TENANT):
+        """Отметка начала цикла опроса."""
+        self.started[tenant] = self.clock()
+
+    def end(self, tenant=DEFAULT_TENANT):
+        """Отметка завершения цикла опроса."""
+        self.started.pop(tenant, None)
+        self.finished[tenant] = self.clock()
+
+    def stuck_tenants(self):
+        """Арендаторы, цикл которых идёт дольше допустимого."""
+        now = self.clock()
+        return sorted(
+            tenant for tenant, started in list(self.started.items())
+            if now - started > self.deadline
+        )
+
+    def is_alive(self):
+        """Liveness: нет зависших циклов."""
+        return not self.stuck_tenants()
+
+    def is_ready(self):
+        """Readiness: хотя бы один цикл завершён и нет зависших."""
+        return bool(self.finished) and self.is_alive()
+
+    def state(self):
+        """Состояние для HTTP-ответа: возраст последних циклов."""
+        now = self.clock()
+        return {
+            'alive': self.is_alive(),
+            'ready': self.is_ready(),
+            'last_cycle_age': {
+                tenant: round(now - finished, 3)
+                for tenant, finished in list(self.finished.items())
+            },
+        }
+
+    def check(self):
+        """Проверка циклов: дамп стеков и перезапуск при зависании."""
+        stuck = self.stuck_tenants()
+        if not stuck:
+            self.stuck = False
+            return
+        if self.stuck:
+            return
+        self.stuck = True
+        logger.critical(
+            STUCK_MESSAGE.format(tenants=stuck, deadline=self.deadline)
+        )
+        if self.dump_path:
+            self.dump_stacks()
+        if self.restart:
+            logger.critical(RESTART_MESSAGE)
+            os.execv(sys.executable, [sys.executable] + sys.argv)
+
+    def dump_stacks(self):
+        """Запись стеков всех потоков в файл."""
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        with open(self.dump_path, 'a', encoding='utf-8') as file:
+            file.write(time.strftime('=== %Y-%m-%d %H:%M:%S ===\n'))
+            for ident, frame in sys._current_frames().items():
+                file.write(THREAD_HEADER.format(
+                    name=names.get(ident, '?'), ident=ident
+                ))
+                file.write(''.join(traceback.format_stack(frame)))
+        logger.error(DUMP_MESSAGE.format(path=self.dump_path))
+
+    def run(self):
+        """Периодическая проверка циклов в фоновом потоке."""
+        while True:
+            time.sleep(CHECK_INTERVAL)
+            self.check()
+
+    def watch(self):
+        """Запуск фоновой проверки циклов."""
+        threading.Thread(target=self.run, name='watchdog', daemon=True).start()
+
+    def serve(self, port, host='127.0.0.1'):
+        """Запуск HTTP-сервера проверок."""
+        self.server = ThreadingHTTPServer((host, port), make_handler(self))
+        self.server.daemon_threads = True
+        threading.Thread(
+            target=self.server.serve_forever, name='watchdog-http',
+            daemon=True
+        ).start()
+        logger.info(STARTED_MESSAGE.format(port=self.server.server_port))
+
+    def start(self, port, host='127.0.0.1'):
+        """Запуск фоновой проверки и HTTP-сервера."""
+        self.watch()
+        self.serve(port, host)
+
+
+def make_handler(watchdog):
+    """Класс обработчика HTTP-запросов, привязанный к сторожу."""
+    class WatchdogHandler(BaseHTTPRequestHandler):
+        checks = {'/health': watchdog.is_alive, '/ready': watchdog.is_ready}
+
+        def do_GET(self):
+            if self.path not in self.checks:
+                self.send_error(404)
+                return
+            body = json.dumps(watchdog.state()).encode()
+            self.send_response(200 if self.checks[self.path]() else 503)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(format, *args)
+
+    return WatchdogHandler
@@ -0,0 +1,130 @@
+import calendar
+import math
+import sqlite3
+import threading
+import time
+
+
+DEFAULT_TENANT = 'default'
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+FINAL_STATUSES = ('approved', 'rejected')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transitions (
+    tenant TEXT NOT NULL,
+    homework_name TEXT NOT NULL,
+    lesson_name TEXT,
+    status TEXT NOT NULL,
+    updated_at INTEGER NOT NULL,
+    recorded_at INTEGER NOT NULL,
+    UNIQUE (tenant, homework_name, status, updated_at)
+);
+CREATE INDEX IF NOT EXISTS transitions_homework
+    ON transitions (homework_name, updated_at);
+CREATE INDEX IF NOT EXISTS transitions_updated
+    ON transitions (updated_at);
+"""
+INSERT = (
+    'INSERT OR IGNORE INTO transitions (tenant, homework_name, lesson_name, '
+    'status, updated_at, recorded_at) VALUES (?, ?, ?, ?, ?, ?)'
+)
+SELECT = (
+    'SELECT tenant, homework_name, lesson_name, status, updated_at '
+    'FROM transitions '
+)
+REVIEW_LATENCIES = """
+SELECT final.updated_at - MAX(started.updated_at)
+FROM transitions AS final
+JOIN transitions AS started
+    ON started.tenant = final.tenant
+    AND started.homework_name = final.homework_name
+    AND started.status = 'reviewing'
+    AND started.updated_at <= final.updated_at
+WHERE final.status IN (?, ?) AND final.updated_at BETWEEN ? AND ?
+GROUP BY final.rowid
+"""
+
+
+def parse_date(value, default):
+    """Перевод `date_updated` из ответа API в unix-время."""
+    try:
+        return calendar.timegm(time.strptime(value, DATE_FORMAT))
+    except (TypeError, ValueError):
+        return default
+
+
+def percentile(values, share):
+    """Перцентиль отсортированного списка методом ближайшего ранга."""
+    if not values:
+        return None
+    rank = max(math.ceil(share * len(values)) - 1, 0)
+    return values[rank]
+
+
+class History:
+    """История изменений статусов домашних работ в SQLite.
+
+    База работает в режиме WAL, так что чтение не блокирует запись из
+    цикла опроса. Запросы по периоду и по работе идут по индексам и не
+    обращаются к API.
+    """
+
+    def __init__(self, path, clock=time.time):
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SCHEMA)
+
+    def record(self, homeworks, tenant=DEFAULT_TENANT):
+        """Пакетная запись работ из ответа API одной транзакцией."""
+        now = int(self.clock())
+        rows = [
+            (
+                tenant,
+                homework['homework_name'],
+                homework.get('lesson_name'),
+                homework['status'],
+                parse_date(homework.get('date_updated'), now),
+                now,
+            )
+            for homework in homeworks
+            if 'homework_name' in homework and 'status' in homework
+        ]
+        with self.lock, self.connection:
+            self.connection.executemany(INSERT, rows)
+        return len(rows)
+
+    def query(self, where, parameters):
+        """Выборка переходов по условию."""
+        with self.lock:
+            return self.connection.execute(
+                SELECT + where + ' ORDER BY updated_at', parameters
+            ).fetchall()
+
+    def homework(self, homework_name):
+        """Все переходы одной работы в хронологическом порядке."""
+        return self.query('WHERE homework_name = ?', (homework_name,))
+
+    def between(self, start, end):
+        """Переходы за период [start, end] в unix-времени."""
+        return self.query('WHERE updated_at BETWEEN ? AND ?', (start, end))
+
+    def review_latencies(self, start, end):
+        """Длительности проверок, завершённых за период, в секундах."""
+        with self.lock:
+            rows = self.connection.execute(
+                REVIEW_LATENCIES, FINAL_STATUSES + (start, end)
+            ).fetchall()
+        return sorted(latency for latency, in rows)
+
+    def latency_percentiles(self, start, end, shares=(0.5, 0.9, 0.99)):
+        """Перцентили длительности проверки за период."""
+        latencies = self.review_latencies(start, end)
+        return {share: percentile(latencies, share) for share in shares}
+
+    def close(self):
+        """Закрытие базы."""
+        with self.lock:
+            self.connection.close()
@@ -1,14 +1,41 @@
+from collections import namedtuple
+from contextlib import closing, contextmanager
+from functools import lru_cache, partial
 from logging.handlers import RotatingFileHandler
+import json
 import logging
 import os
+import signal
 import sys
 import time
 
 from dotenv import load_dotenv
 from telegram import Bot
+from telegram.error import BadRequest, InvalidToken, Unauthorized
 import requests
 
-from exceptions import ApiError
+from capture import Capture
+from catalog import Catalog, parse_chat_locales
+from commands import ChatState, CommandPoller
+from deadline import Budget, stage_timeout
+from digest import DIGEST_HEADER, DIGEST_LINE, Digest
+from exceptions import ApiError, AuthError, BudgetExceeded, SchemaError
+from fairshare import FairShare
+from healthcheck import Watchdog
+from history import History
+from logrotate import CompressingRotatingFileHandler
+from metrics import metrics
+from notifiers import FanOut, SmtpNotifier, WebhookNotifier
+from pipeline import Pipeline
+from preflight import Preflight, secret_key
+from profiling import Profiler
+from routing import Router
+from scheduler import IDLE
+from schema import ResponseValidator
+from sharedstate import Segment, SegmentWriter
+from sources import Poller, load_sources
+from streaming import HomeworkStream
+from subscriptions import DEFAULT_TENANT, Hub, load_subscriptions
 
 
 load_dotenv()
@@ -22,9 +49,97 @@ TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
 TOKENS = ['PRACTICUM_TOKEN', 'TELEGRAM_TOKEN', 'TELEGRAM_CHAT_ID']
 
 RETRY_PERIOD = 600
+MIN_SLEEP = 1
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
 
+DIGEST_WINDOW = int(os.getenv('DIGEST_WINDOW', 0))
+DIGEST_MAX_SIZE = int(os.getenv('DIGEST_MAX_SIZE', 10))
+DIGEST_URGENT_STATUSES = os.getenv(
+    'DIGEST_URGENT_STATUSES', 'rejected'
+).split(',')
+
+WATCHDOG_PORT = int(os.getenv('WATCHDOG_PORT', 0))
+WATCHDOG_DEADLINE = int(os.getenv('WATCHDOG_DEADLINE', 120))
+WATCHDOG_DUMP_STACKS = bool(os.getenv('WATCHDOG_DUMP_STACKS'))
+WATCHDOG_RESTART = bool(os.getenv('WATCHDOG_RESTART'))
+RESTART_CURSORS = 'HOMEWORK_RESTART_CURSORS'
+
+SUBSCRIPTIONS_FILE = os.getenv('SUBSCRIPTIONS_FILE')
+POLL_INTERVAL_REVIEWING = int(
+    os.getenv('POLL_INTERVAL_REVIEWING', RETRY_PERIOD)
+)
+POLL_INTERVAL_IDLE = int(os.getenv('POLL_INTERVAL_IDLE', 0))
+API_RATE = float(os.getenv('API_RATE', 0))
+API_BURST = float(os.getenv('API_BURST', 0))
+
+CYCLE_BUDGET = float(os.getenv('CYCLE_BUDGET', 60))
+FETCH_SHARE = 0.6
+DECODE_SHARE = 0.1
+SEND_SHARE = 0.3
+
+SMTP_HOST = os.getenv('SMTP_HOST')
+SMTP_PORT = int(os.getenv('SMTP_PORT', 25))
+SMTP_FROM = os.getenv('SMTP_FROM')
+SMTP_TO = os.getenv('SMTP_TO', '').split(',')
+WEBHOOK_URL = os.getenv('WEBHOOK_URL')
+NOTIFIER_WORKERS = int(os.getenv('NOTIFIER_WORKERS', 2))
+NOTIFIER_TIMEOUT = float(os.getenv('NOTIFIER_TIMEOUT', 10))
+NOTIFIER_RETRIES = int(os.getenv('NOTIFIER_RETRIES', 2))
+
+HISTORY_DB = os.getenv('HISTORY_DB')
+
+PROFILE_CYCLES = int(os.getenv('PROFILE_CYCLES', 3))
+
+ROUTING_RULES_FILE = os.getenv('ROUTING_RULES_FILE')
+
+STREAM_RESPONSES = bool(os.getenv('STREAM_RESPONSES'))
+STREAM_CHUNK_SIZE = 16384
+
+LOCALES_FILE = os.getenv('LOCALES_FILE')
+DEFAULT_LOCALE = os.getenv('DEFAULT_LOCALE', 'ru')
+CHAT_LOCALES = parse_chat_locales(os.getenv('CHAT_LOCALES', ''))
+
+CAPTURE_FILE = os.getenv('CAPTURE_FILE')
+
+COMMANDS_ENABLED = bool(os.getenv('COMMANDS_ENABLED'))
+
+SCHEMA_STRICT = bool(os.getenv('SCHEMA_STRICT'))
+
+SOURCES_FILE = os.getenv('SOURCES_FILE')
+
+PREFLIGHT = bool(os.getenv('PREFLIGHT'))
+PREFLIGHT_CACHE = os.getenv('PREFLIGHT_CACHE', __file__ + '.preflight.json')
+PREFLIGHT_TTL = int(os.getenv('PREFLIGHT_TTL', 24 * 3600))
+PREFLIGHT_WORKERS = int(os.getenv('PREFLIGHT_WORKERS', 8))
+QUARANTINE_PERIOD = int(os.getenv('QUARANTINE_PERIOD', 3600))
+AUTH_STATUSES = (requests.codes.unauthorized, requests.codes.forbidden)
+PERMANENT_ERRORS = (AuthError, BadRequest, InvalidToken, Unauthorized)
+
+LOG_MAX_BYTES = 50000000
+LOG_BACKUPS = int(os.getenv('LOG_BACKUPS', 3))
+LOG_COMPRESS = bool(os.getenv('LOG_COMPRESS'))
+LOG_RETENTION_DAYS = float(os.getenv('LOG_RETENTION_DAYS', 0))
+LOG_MAX_TOTAL_BYTES = int(os.getenv('LOG_MAX_TOTAL_BYTES', 0))
+
+SHARED_STATE_FILE = os.getenv('SHARED_STATE_FILE')
+SHARED_WORKER = int(os.getenv('SHARED_WORKER', 0))
+SHARED_WORKERS = int(os.getenv('SHARED_WORKERS', 1))
+SHARED_TENANTS = int(os.getenv('SHARED_TENANTS', 1024))
+SHARED_COUNTERS = (
+    'poll.cycles', 'poll.errors', 'telegram.sent', 'telegram.failed',
+    'budget_overrun.cycle', 'pipeline.delivered', 'pipeline.shed',
+    'schema.dropped'
+)
+
+PIPELINE_CAPACITY = int(os.getenv('PIPELINE_CAPACITY', 0))
+PIPELINE_POLICY = os.getenv('PIPELINE_POLICY', 'pause')
+
+Extensions = namedtuple(
+    'Extensions', ('digest', 'fan_out', 'history', 'router', 'pipeline'),
+    defaults=(None,)
+)
+
 
 HOMEWORK_VERDICTS = {
     'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
@@ -35,31 +150,30 @@ HOMEWORK_VERDICTS = {
 CHECK_TOKENS_MESSAGE = 'Отсутствуют токены: {missing_tokens}!'
 SEND_MESSAGE = 'Отправлено сообщение: `{message}`'
 SEND_MESSAGE_ERROR = 'Ошибка `{error}` при отправке сообщения: `{message}`'
+SEND_DEFERRED_MESSAGE = 'Отправка сообщения `{message}` отложена: {error}'
+SEND_PAUSED_MESSAGE = ('Уведомления чата {chat_id} приостановлены, '
+                       'сообщение `{message}` отложено.')
 API_ERROR_MESSAGE = ('Ошибка при обращении к API: {error}. Параметры запроса: '
                      '`{url}`, '
-                     '`{headers}`, '
                      '`{params}`.')
 ERROR_KEY_MESSAGE = (' Найден ключ {key} со значением {homework_statuses_key}.'
                      ' Параметры запроса: '
                      '`{url}`, '
-                     '`{headers}`, '
                      '`{params}`.')
 STATUS_ERROR_MESSAGE = ('Получен неожиданный статус сервера: {status_code}. '
                         'Параметры запроса: '
                         '`{url}`, '
-                        '`{headers}`, '
                         '`{params}`.')
 STATUS_MESSAGE = ('Изменился статус проверки работы "{name}". '
                   '{verdict}')
-RESPONSE_MESSAGE = ('Тип ответа не соответствует ожидаемому. '
-                    'Тип ответа: {response}')
-HOMEWORKS_MISSING_MESSAGE = 'В ответе отсутствует ключ `homeworks`'
-HOMEWORKS_WRONG_TYPE_MESSAGE = ('Неправильный тип поля `homeworks`. '
-                                'Тип поля `homeworks`: {homeworks}')
-PARSE_MESSAGE = 'В домашней работе отстутсвует ключ {key}.'
-PARSE_STATUS_MESSAGE = 'Неожиданный статус домашней работы: {status}.'
+SCHEMA_DROPPED_MESSAGE = ('Отброшено работ, не соответствующих схеме: '
+                          '{count}. Нарушения: {errors}')
 NO_NEW_STATUS_MESSAGE = 'Статус домашней работы не изменился.'
+PIPELINE_FULL_MESSAGE = 'Очереди доставки заполнены, опрос пропущен.'
 ERROR_MESSAGE = 'Сбой в работе программы: {new_error}'
+SHARED_STATE_ERROR_MESSAGE = ('Разделяемый сегмент {path} не подключён: '
+                              '{error}')
+PREFLIGHT_FAILED_MESSAGE = 'Предстартовые проверки не пройдены: {failed}'
 
 
 def check_tokens():
@@ -75,109 +189,721 @@ def check_tokens():
 
 def send_message(bot, message):
     """Отправка сообщения в Telegram чат."""
+    return send_message_to(bot, TELEGRAM_CHAT_ID, message)
+
+
+def send_message_to(bot, chat_id, message):
+    """Отправка сообщения в заданный Telegram чат."""
+    state = get_chat_state()
+    if state is not None and state.defer(chat_id, message):
+        logger.info(SEND_PAUSED_MESSAGE.format(
+            chat_id=chat_id, message=message
+        ))
+        return True
     try:
-        bot.send_message(TELEGRAM_CHAT_ID, message)
+        timeout = stage_timeout('send', SEND_SHARE)
+    except BudgetExceeded as error:
+        logger.warning(
+            SEND_DEFERRED_MESSAGE.format(error=error, message=message)
+        )
+        return False
+    try:
+        if timeout is None:
+            bot.send_message(chat_id, message)
+        else:
+            bot.send_message(chat_id, message, timeout=timeout)
         logger.debug(SEND_MESSAGE.format(message=message))
+        metrics.inc('telegram.sent')
         return True
     except Exception as error:
         logger.error(SEND_MESSAGE_ERROR.format(error=error, message=message))
+        metrics.inc('telegram.failed')
         return False
 
 
 def get_api_answer(timestamp):
     """Получение ответа от API-сервиса."""
-    try:
-        rq_pars = {
-            'url': ENDPOINT,
-            'headers': HEADERS,
-            'params': {'from_date': timestamp}
-        }
-        homework_statuses = requests.get(**rq_pars)
-    except requests.RequestException as error:
-        raise requests.ConnectionError(API_ERROR_MESSAGE.format(
-            error, **rq_pars
-        ))
-    status_code = homework_statuses.status_code
-    if homework_statuses.status_code != requests.codes.ok:
-        raise ApiError(
-            STATUS_ERROR_MESSAGE.format(status_code=status_code, **rq_pars)
-        )
+    return request_api_answer(timestamp, HEADERS)
+
+
+def get_token_api_answer(timestamp, token):
+    """Получение ответа от API-сервиса для заданного токена."""
+    return request_api_answer(timestamp, {'Authorization': f'OAuth {token}'})
+
+
+def request_api_answer(timestamp, headers):
+    """Запрос к API-сервису с заданными заголовками."""
+    homework_statuses = send_api_request(timestamp, headers)
+    stage_timeout('decode', DECODE_SHARE)
     homework_statuses = homework_statuses.json()
     for key in ('error', 'code'):
         if key in homework_statuses:
             raise ApiError(
                 ERROR_KEY_MESSAGE.format(
-                    key,
-                    homework_statuses[key],
-                    **rq_pars
+                    key=key,
+                    homework_statuses_key=homework_statuses[key],
+                    url=ENDPOINT,
+                    params={'from_date': timestamp}
                 )
             )
     return homework_statuses
 
 
-def check_response(response):
-    """Проверика ответа API на соответствие документации."""
-    if not isinstance(response, dict):
-        raise TypeError(RESPONSE_MESSAGE.format(response=type(response)))
-    if 'homeworks' not in response:
-        raise KeyError(HOMEWORKS_MISSING_MESSAGE)
-    homeworks = response['homeworks']
-    if not isinstance(homeworks, list):
-        raise TypeError(
-            HOMEWORKS_WRONG_TYPE_MESSAGE.format(homeworks=type(homeworks))
+@contextmanager
+def stream_api_answer(timestamp):
+    """Потоковое получение ответа API; соединение закрывается на выходе."""
+    response = send_api_request(timestamp, HEADERS, stream=True)
+    with closing(response):
+        stage_timeout('decode', DECODE_SHARE)
+        yield HomeworkStream(response.iter_content(STREAM_CHUNK_SIZE))
+
+
+@lru_cache(maxsize=None)
+def get_capture():
+    """Журнал ответов API, если задан файл записи."""
+    if not CAPTURE_FILE:
+        return None
+    return Capture(CAPTURE_FILE, secrets=(PRACTICUM_TOKEN, TELEGRAM_TOKEN))
+
+
+def send_api_request(timestamp, headers, **kwargs):
+    """Отправка запроса к API и проверка статуса ответа."""
+    try:
+        rq_pars = {
+            'url': ENDPOINT,
+            'headers': headers,
+            'params': {'from_date': timestamp}
+        }
+        response = requests.get(
+            timeout=stage_timeout('fetch', FETCH_SHARE), **rq_pars, **kwargs
+        )
+    except requests.RequestException as error:
+        raise ConnectionError(API_ERROR_MESSAGE.format(
+            error=error, **rq_pars
+        )) from error
+    capture = get_capture()
+    if capture is not None and not kwargs.get('stream'):
+        capture.record(timestamp, response.status_code, response.text)
+    status_code = response.status_code
+    if response.status_code != requests.codes.ok:
+        if kwargs.get('stream'):
+            response.close()
+        error_class = AuthError if status_code in AUTH_STATUSES else ApiError
+        raise error_class(
+            STATUS_ERROR_MESSAGE.format(status_code=status_code, **rq_pars)
         )
+    return response
+
+
+@lru_cache(maxsize=None)
+def get_validator():
+    """Скомпилированная схема ответа API."""
+    return ResponseValidator(HOMEWORK_VERDICTS, strict=SCHEMA_STRICT)
+
+
+def check_response(response):
+    """Проверика ответа API на соответствие документации.
+
+    В нестрогом режиме некорректные работы удаляются из ответа.
+    """
+    homeworks, errors = get_validator().validate(response)
+    if errors:
+        dropped = len(response['homeworks']) - len(homeworks)
+        logger.warning(SCHEMA_DROPPED_MESSAGE.format(
+            count=dropped, errors='; '.join(map(str, errors))
+        ))
+        metrics.inc('schema.dropped', dropped)
+        response['homeworks'] = homeworks
+
+
+def is_valid_homework(homework):
+    """Проверка работы из потока; в нестрогом режиме без исключения."""
+    try:
+        get_validator().validate_homework(homework)
+    except SchemaError as error:
+        if SCHEMA_STRICT:
+            raise
+        logger.warning(SCHEMA_DROPPED_MESSAGE.format(count=1, errors=error))
+        metrics.inc('schema.dropped')
+        return False
+    return True
+
+
+def render_status(homework):
+    """Сообщение о работе, уже проверенной `check_response`."""
+    return get_catalog().status(
+        DEFAULT_LOCALE, homework['status'], homework['homework_name']
+    )
 
 
 def parse_status(homework):
     """Извлечение статуса домашней работы работы."""
-    for key in ('status', 'homework_name'):
-        if key not in homework:
-            raise KeyError(PARSE_MESSAGE.format(key=key))
-    status = homework['status']
-    if status not in HOMEWORK_VERDICTS:
-        raise ValueError(PARSE_STATUS_MESSAGE.format(status=status))
-    return STATUS_MESSAGE.format(
-        name=homework['homework_name'], verdict=HOMEWORK_VERDICTS[status]
+    get_validator().validate_homework(homework)
+    return render_status(homework)
+
+
+@lru_cache(maxsize=None)
+def get_catalog():
+    """Каталог сообщений, загружаемый при первом обращении."""
+    return Catalog.load(
+        LOCALES_FILE,
+        {
+            'ru': {
+                'verdicts': HOMEWORK_VERDICTS,
+                'messages': {
+                    'status': STATUS_MESSAGE,
+                    'digest_header': DIGEST_HEADER,
+                    'digest_line': DIGEST_LINE,
+                    'error': ERROR_MESSAGE
+                }
+            }
+        },
+        DEFAULT_LOCALE,
+        CHAT_LOCALES
+    )
+
+
+@lru_cache(maxsize=None)
+def get_chat_state():
+    """Последние известные статусы для команд бота, если они включены."""
+    if not COMMANDS_ENABLED:
+        return None
+    return ChatState()
+
+
+def remember(chat_id, homeworks):
+    """Запоминание статусов из ответа API для команд и других процессов."""
+    state = get_chat_state()
+    if state is not None:
+        state.update(chat_id, homeworks)
+    shared = get_shared()
+    if shared is not None and homeworks:
+        shared.set_status(0, homeworks[0]['status'])
+
+
+@lru_cache(maxsize=None)
+def get_shared():
+    """Запись в разделяемый сегмент состояния, если задан его файл."""
+    if not SHARED_STATE_FILE:
+        return None
+    try:
+        return SegmentWriter(
+            Segment.create(
+                SHARED_STATE_FILE, SHARED_WORKERS, SHARED_TENANTS,
+                tuple(HOMEWORK_VERDICTS), SHARED_COUNTERS
+            ),
+            SHARED_WORKER
+        )
+    except ValueError as error:
+        logger.error(SHARED_STATE_ERROR_MESSAGE.format(
+            error=error, path=SHARED_STATE_FILE
+        ))
+        return None
+
+
+def publish_state(timestamp):
+    """Запись курсора и счётчиков в разделяемый сегмент после цикла."""
+    shared = get_shared()
+    if shared is None:
+        return
+    if not SUBSCRIPTIONS_FILE:
+        shared.set_tenant(0, timestamp)
+    shared.publish(metrics.snapshot())
+
+
+def localize(chat_id, homework):
+    """Сообщение об изменении статуса на языке чата."""
+    return get_catalog().for_chat(chat_id, homework)
+
+
+def create_digest():
+    """Создание дайджеста, если он включён в настройках."""
+    if not DIGEST_WINDOW:
+        return None
+    return Digest(
+        HOMEWORK_VERDICTS,
+        DIGEST_WINDOW,
+        DIGEST_MAX_SIZE,
+        DIGEST_URGENT_STATUSES,
+        catalog=get_catalog()
+    )
+
+
+def create_watchdog():
+    """Создание сторожа цикла и запуск проверки и HTTP-проверок."""
+    watchdog = Watchdog(
+        WATCHDOG_DEADLINE,
+        dump_path=__file__ + '.stacks' if WATCHDOG_DUMP_STACKS else None,
+        restart=WATCHDOG_RESTART
+    )
+    if WATCHDOG_PORT or WATCHDOG_DUMP_STACKS or WATCHDOG_RESTART:
+        watchdog.watch()
+    if WATCHDOG_PORT:
+        watchdog.serve(WATCHDOG_PORT)
+    return watchdog
+
+
+def save_cursors(timestamp, hub):
+    """Сохранение курсоров в окружении для перезапуска сторожем."""
+    if not WATCHDOG_RESTART:
+        return
+    cursors = {DEFAULT_TENANT: timestamp} if hub is None else hub.cursors()
+    os.environ[RESTART_CURSORS] = json.dumps(cursors)
+
+
+def load_cursors():
+    """Курсоры, сохранённые процессом до перезапуска сторожем."""
+    return json.loads(os.environ.pop(RESTART_CURSORS, '{}'))
+
+
+def create_fan_out():
+    """Создание дополнительных каналов доставки из настроек."""
+    options = {
+        'workers': NOTIFIER_WORKERS,
+        'timeout': NOTIFIER_TIMEOUT,
+        'retries': NOTIFIER_RETRIES
+    }
+    notifiers = []
+    if SMTP_HOST:
+        notifiers.append(
+            SmtpNotifier(SMTP_HOST, SMTP_PORT, SMTP_FROM, SMTP_TO, **options)
+        )
+    if WEBHOOK_URL:
+        notifiers.append(WebhookNotifier(WEBHOOK_URL, **options))
+    if not notifiers:
+        return None
+    return FanOut(notifiers)
+
+
+def create_history():
+    """Открытие истории статусов, если задан путь к базе."""
+    if not HISTORY_DB:
+        return None
+    return History(HISTORY_DB)
+
+
+def create_profiler():
+    """Установка профилирования по сигналам SIGUSR1 и SIGUSR2."""
+    profiler = Profiler(__file__, PROFILE_CYCLES)
+    if PROFILE_CYCLES and hasattr(signal, 'SIGUSR1'):
+        profiler.install()
+    return profiler
+
+
+def create_commands(bot):
+    """Запуск приёма команд бота, если он включён в настройках."""
+    if not COMMANDS_ENABLED:
+        return None
+    return CommandPoller(
+        bot, get_chat_state(), HOMEWORK_VERDICTS,
+        stats_chats=(TELEGRAM_CHAT_ID,)
+    ).start()
+
+
+def create_router():
+    """Загрузка правил маршрутизации, если задан файл правил."""
+    if not ROUTING_RULES_FILE:
+        return None
+    return Router(ROUTING_RULES_FILE)
+
+
+def create_pipeline(bot, extensions):
+    """Запуск стадий разбора и доставки, если задан размер очередей."""
+    if not PIPELINE_CAPACITY:
+        return None
+    return Pipeline(
+        partial(delivery_chats, extensions=extensions),
+        render_delivery,
+        partial(send_message_to, bot),
+        PIPELINE_CAPACITY,
+        PIPELINE_POLICY
+    ).start()
+
+
+def create_extensions(bot):
+    """Создание включённых в настройках дополнений конвейера."""
+    extensions = Extensions(
+        digest=create_digest(),
+        fan_out=create_fan_out(),
+        history=create_history(),
+        router=create_router()
+    )
+    return extensions._replace(
+        pipeline=create_pipeline(bot, extensions)
+    )
+
+
+def poll_intervals():
+    """Периоды опроса по статусам, если включено расписание арендаторов."""
+    if not POLL_INTERVAL_IDLE:
+        return None
+    return {'reviewing': POLL_INTERVAL_REVIEWING, IDLE: POLL_INTERVAL_IDLE}
+
+
+def create_api_budget():
+    """Общий бюджет запросов к API, если задана допустимая частота."""
+    if not API_RATE:
+        return None
+    return FairShare(API_RATE, API_BURST, horizon=RETRY_PERIOD)
+
+
+def create_hub(bot, extensions, watchdog=None, cursors=None):
+    """Создание общего опроса токенов, если задан файл подписок."""
+    if not SUBSCRIPTIONS_FILE:
+        return None
+    hub = Hub(
+        get_token_api_answer,
+        check_response,
+        render_status,
+        partial(send_message_to, bot),
+        get_catalog().text(DEFAULT_LOCALE, 'error'),
+        digest=extensions.digest,
+        cycle_budget=CYCLE_BUDGET,
+        fan_out=extensions.fan_out,
+        history=extensions.history,
+        router=extensions.router,
+        localize=localize,
+        known=get_chat_state(),
+        shared=get_shared(),
+        quarantine_period=QUARANTINE_PERIOD,
+        intervals=poll_intervals(),
+        budget=create_api_budget(),
+        watchdog=watchdog
+    )
+    hub.subscribe(PRACTICUM_TOKEN, TELEGRAM_CHAT_ID, DEFAULT_TENANT)
+    for token, chat_id, name in load_subscriptions(SUBSCRIPTIONS_FILE):
+        hub.subscribe(token, chat_id, name)
+    hub.restore(cursors or {})
+    return hub
+
+
+def create_poller(bot, hub=None):
+    """Создание общего опроса дополнительных источников из файла.
+
+    При общем опросе сообщения уходят через очереди чатов `hub`, а при
+    расписании арендаторов источники опрашиваются в том же цикле
+    ожидания ближайшего срока и могут иметь период короче
+    `RETRY_PERIOD`.
+    """
+    if not SOURCES_FILE:
+        return None
+    if hub is None:
+        poller = Poller(
+            partial(send_message_to, bot), min_interval=RETRY_PERIOD
+        )
+    else:
+        poller = Poller(hub.deliver, min_interval=(
+            0 if hub.scheduler is not None else RETRY_PERIOD
+        ))
+    for source in load_sources(SOURCES_FILE):
+        poller.add(source)
+    return poller
+
+
+def validate_token(token):
+    """Проверка токена Практикума пробным запросом к API."""
+    with Budget(CYCLE_BUDGET):
+        get_token_api_answer(int(time.time()), token)
+
+
+def preflight_checks(bot, subscriptions):
+    """Проверки бота, токенов и доступности чатов подписок."""
+    checks = [(secret_key('telegram', TELEGRAM_TOKEN), bot.get_me)]
+    for token, chat_id in subscriptions:
+        checks.append(
+            (secret_key('practicum', token), partial(validate_token, token))
+        )
+        checks.append((f'chat:{chat_id}', partial(bot.get_chat, chat_id)))
+    return checks
+
+
+def run_preflight(bot, hub):
+    """Предстартовая проверка; False, если бот не может работать.
+
+    Учитываются только постоянные ошибки (отклонённый токен, ненайденный
+    чат): сетевые сбои не мешают запуску. При общем опросе токены с
+    ошибкой уходят на карантин, а недоступные чаты отписываются.
+    """
+    if not PREFLIGHT:
+        return True
+    subscriptions = [(PRACTICUM_TOKEN, TELEGRAM_CHAT_ID)]
+    if hub is not None:
+        subscriptions = [
+            (token, chat_id) for tenant, token in enumerate(hub.tokens)
+            for chat_id in hub.chats[tenant]
+        ]
+    failed = {
+        key: error for key, error in Preflight(
+            PREFLIGHT_CACHE, PREFLIGHT_TTL, PREFLIGHT_WORKERS
+        ).run(preflight_checks(bot, subscriptions)).items()
+        if isinstance(error, PERMANENT_ERRORS)
+    }
+    if not failed:
+        return True
+    if hub is None or secret_key('telegram', TELEGRAM_TOKEN) in failed:
+        logger.critical(PREFLIGHT_FAILED_MESSAGE.format(failed=list(failed)))
+        return False
+    for tenant, token in enumerate(hub.tokens):
+        if secret_key('practicum', token) in failed:
+            hub.quarantine(tenant, time.time() + QUARANTINE_PERIOD)
+        for chat_id in list(hub.chats[tenant]):
+            if f'chat:{chat_id}' in failed:
+                hub.unsubscribe(tenant, chat_id)
+    return True
+
+
+def route(homework, extensions):
+    """Чаты и каналы для уведомления; None - получатели по умолчанию."""
+    if extensions.router is None:
+        return None
+    return extensions.router.route(homework)
+
+
+def plan_delivery(homework, extensions):
+    """Выбор чатов для проверенной работы; None - получатель по умолчанию."""
+    recipients = route(homework, extensions)
+    if recipients is None or not recipients.chats:
+        return None
+    return recipients.chats
+
+
+def fan_out(homeworks, extensions):
+    """Отправка уведомлений в дополнительные каналы.
+
+    Вызывается после сдвига метки времени, чтобы повтор цикла из-за
+    сбоя Telegram не дублировал письма и вебхуки.
+    """
+    if extensions.fan_out is None:
+        return
+    for homework in homeworks:
+        recipients = route(homework, extensions)
+        extensions.fan_out.notify(
+            render_status(homework), recipients and recipients.backends
+        )
+
+
+def delivery_chats(homework, extensions):
+    """Чаты для доставки работы через конвейер."""
+    chats = plan_delivery(homework, extensions) or (TELEGRAM_CHAT_ID,)
+    fan_out((homework,), extensions)
+    return chats
+
+
+def render_delivery(chat_id, homeworks):
+    """Сообщение о работах `{название: работа}` на языке чата."""
+    if len(homeworks) == 1:
+        homework, = homeworks.values()
+        return localize(chat_id, homework)
+    return get_catalog().digest(chat_id, {
+        name: homework['status'] for name, homework in homeworks.items()
+    })
+
+
+def notify(bot, homework, extensions):
+    """Отправка уведомления о работе в Telegram."""
+    chats = plan_delivery(homework, extensions)
+    if chats is None:
+        return send_message(bot, localize(TELEGRAM_CHAT_ID, homework))
+    return all([
+        send_message_to(bot, chat_id, localize(chat_id, homework))
+        for chat_id in chats
+    ])
+
+
+def notify_digest(bot, homeworks, extensions):
+    """Накопление изменений в дайджесте и отправка готовых сообщений.
+
+    Неотправленный дайджест остаётся в буфере; False, если не удалось
+    отправить срочное сообщение.
+    """
+    digest = extensions.digest
+    delivered = True
+    for homework in homeworks:
+        chats = plan_delivery(homework, extensions) or (TELEGRAM_CHAT_ID,)
+        for chat_id in chats:
+            if not digest.add(chat_id, homework) and not send_message_to(
+                bot, chat_id, localize(chat_id, homework)
+            ):
+                delivered = False
+    digest.flush(partial(send_message_to, bot))
+    return delivered
+
+
+def poll_stream(bot, timestamp, extensions):
+    """Цикл опроса с разбором работ по мере загрузки ответа."""
+    delivered = True
+    homeworks = []
+    with stream_api_answer(timestamp) as stream:
+        for homework in stream:
+            if not is_valid_homework(homework):
+                continue
+            homeworks.append(homework)
+            remember(TELEGRAM_CHAT_ID, (homework,))
+            if extensions.history is not None:
+                extensions.history.record((homework,))
+            if extensions.digest is not None:
+                sent = notify_digest(bot, (homework,), extensions)
+            else:
+                sent = notify(bot, homework, extensions)
+            delivered = sent and delivered
+    if extensions.digest is not None:
+        notify_digest(bot, (), extensions)
+    if not delivered:
+        return timestamp
+    fan_out(homeworks, extensions)
+    return stream.fields.get('current_date', timestamp)
+
+
+def poll_pipeline(timestamp, extensions):
+    """Цикл опроса с передачей работ на разбор и доставку в фоне."""
+    if not extensions.pipeline.accepting():
+        logger.warning(PIPELINE_FULL_MESSAGE)
+        metrics.inc('pipeline.paused')
+        return timestamp
+    response = get_api_answer(timestamp)
+    check_response(response)
+    homeworks = response['homeworks']
+    remember(TELEGRAM_CHAT_ID, homeworks)
+    if extensions.history is not None:
+        extensions.history.record(homeworks)
+    if homeworks:
+        extensions.pipeline.submit(homeworks)
+    return response.get('current_date', timestamp)
+
+
+def poll_once(bot, timestamp, extensions):
+    """Один цикл опроса API; возвращает новую метку времени."""
+    if extensions.pipeline is not None:
+        return poll_pipeline(timestamp, extensions)
+    if STREAM_RESPONSES:
+        return poll_stream(bot, timestamp, extensions)
+    response = get_api_answer(timestamp)
+    check_response(response)
+    homeworks = response.get('homeworks')
+    remember(TELEGRAM_CHAT_ID, homeworks)
+    if extensions.history is not None:
+        extensions.history.record(homeworks)
+    if extensions.digest is not None:
+        if not notify_digest(bot, homeworks, extensions):
+            return timestamp
+    elif not homeworks:
+        logger.debug(NO_NEW_STATUS_MESSAGE)
+        return timestamp
+    else:
+        homeworks = homeworks[:1]
+        if not notify(bot, homeworks[0], extensions):
+            return timestamp
+    fan_out(homeworks, extensions)
+    return response.get('current_date', timestamp)
+
+
+def create_log_handler():
+    """Файловый журнал с ротацией; с LOG_COMPRESS - со сжатием в фоне."""
+    if not LOG_COMPRESS:
+        return RotatingFileHandler(
+            __file__ + '.log',
+            maxBytes=LOG_MAX_BYTES,
+            backupCount=LOG_BACKUPS
+        )
+    return CompressingRotatingFileHandler(
+        __file__ + '.log',
+        maxBytes=LOG_MAX_BYTES,
+        backupCount=LOG_BACKUPS,
+        max_age=LOG_RETENTION_DAYS * 24 * 3600,
+        max_total_bytes=LOG_MAX_TOTAL_BYTES
     )
 
 
+def poll_cycle(bot, timestamp, extensions, hub, poller, watchdog=None):
+    """Один тик опроса; возвращает новую метку времени.
+
+    Общий бюджет цикла и отметки сторожа действуют только при опросе
+    одного токена: при общем опросе их получает каждый арендатор.
+    """
+    if watchdog is not None:
+        watchdog.begin()
+    try:
+        if extensions.router is not None:
+            extensions.router.reload()
+        if poller is not None:
+            poller.tick()
+        if hub is None:
+            with Budget(CYCLE_BUDGET):
+                return poll_once(bot, timestamp, extensions)
+    finally:
+        if watchdog is not None:
+            watchdog.end()
+    hub.poll_all()
+    return timestamp
+
+
+def sleep_period(hub, poller=None):
+    """Пауза до следующего тика, не дольше `RETRY_PERIOD`.
+
+    При расписании арендаторов бот просыпается к ближайшему сроку
+    опроса арендатора или источника, но не чаще раза в `MIN_SLEEP`
+    секунд.
+    """
+    if hub is None or hub.scheduler is None:
+        return RETRY_PERIOD
+    schedulers = [hub.scheduler]
+    if poller is not None:
+        schedulers.append(poller.scheduler)
+    due = [
+        scheduler.next_time() for scheduler in schedulers
+        if scheduler.next_time() is not None
+    ]
+    if not due:
+        return RETRY_PERIOD
+    return min(max(min(due) - hub.clock(), MIN_SLEEP), RETRY_PERIOD)
+
+
 def main():
     """Основная логика работы бота."""
     if not check_tokens():
         return
     bot = Bot(token=TELEGRAM_TOKEN)
     recent_error_message = ''
-    timestamp = int(time.time())
+    cursors = load_cursors()
+    timestamp = cursors.get(DEFAULT_TENANT, int(time.time()))
+    watchdog = create_watchdog()
+    profiler = create_profiler()
+    extensions = create_extensions(bot)
+    hub = create_hub(bot, extensions, watchdog, cursors)
+    if not run_preflight(bot, hub):
+        return
+    poller = create_poller(bot, hub)
+    create_commands(bot)
 
     while True:
+        profiler.begin()
+        metrics.inc('poll.cycles')
         try:
-            response = get_api_answer(timestamp)
-            check_response(response)
-            homeworks = response.get('homeworks')
-            if not homeworks:
-                logger.debug(NO_NEW_STATUS_MESSAGE)
-                continue
-            if send_message(bot, parse_status(homeworks[0])):
-                timestamp = response.get('current_date', timestamp)
+            timestamp = poll_cycle(
+                bot, timestamp, extensions, hub, poller, watchdog
+            )
         except Exception as new_error:
-            error_message = ERROR_MESSAGE.format(new_error=new_error)
+            error_message = get_catalog().message(
+                DEFAULT_LOCALE, 'error', new_error=new_error
+            )
             logger.error(error_message)
+            metrics.inc('poll.errors')
             if error_message != recent_error_message and send_message(
                 bot, error_message
             ):
                 recent_error_message = error_message
         finally:
-            time.sleep(RETRY_PERIOD)
+            publish_state(timestamp)
+            save_cursors(timestamp, hub)
+            profiler.end()
+            delay = sleep_period(hub, poller)
+            time.sleep(delay)
 
 
 if __name__ == '__main__':
     logging.basicConfig(
         handlers=(
-            RotatingFileHandler(
-                __file__ + '.log',
-                maxBytes=50000000,
-                backupCount=3
-            ),
+            create_log_handler(),
             logging.StreamHandler(stream=sys.stdout)
         ),
         level=logging.DEBUG,
@@ -0,0 +1,171 @@
+from datetime import datetime
+import glob
+import gzip
+import logging
+from logging.handlers import RotatingFileHandler
+import os
+import queue
+import shutil
+import threading
+import time
+
+from metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+COMPRESS_LEVEL = 6
+ARCHIVE_SUFFIX = '.gz'
+STAMP_FORMAT = '%Y%m%d-%H%M%S-%f'
+
+ARCHIVE_ERROR_MESSAGE = 'Ошибка `{error}` при сжатии журнала {path}.'
+
+
+class LogArchiver:
+    """Фоновое сжатие закрытых журналов и удаление старых архивов.
+
+    Файлы сжимаются gzip в отдельном потоке. После каждого сжатия
+    архивы сверх `max_files`, старше `max_age` секунд или не влезающие в
+    `max_bytes` удаляются, начиная с самых старых.
+    """
+
+    def __init__(self, pattern, max_files=0, max_age=0, max_bytes=0,
+                 compresslevel=COMPRESS_LEVEL, clock=time.time):
+        self.pattern = pattern
+        self.max_files = max_files
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.compresslevel = compresslevel
+        self.clock = clock
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(
+            target=self.run, name='log-archiver', daemon=True
+        )
+        self.thread.start()
+
+    def submit(self, path):
+        """Постановка закрытого журнала в очередь на сжатие."""
+        self.queue.put(path)
+
+    def compress(self, path):
+        """Сжатие файла рядом с исходным и удаление исходного."""
+        with open(path, 'rb') as source, gzip.open(
+            path + ARCHIVE_SUFFIX, 'wb', compresslevel=self.compresslevel
+        ) as target:
+            shutil.copyfileobj(source, target)
+        metrics.inc('logs.bytes_in', os.path.getsize(path))
+        metrics.inc('logs.bytes_out', os.path.getsize(path + ARCHIVE_SUFFIX))
+        metrics.inc('logs.compressed')
+        os.remove(path)
+
+    def rotated(self):
+        """Все файлы, оставшиеся после ротации журнала."""
+        return glob.glob(glob.escape(self.pattern) + '.*')
+
+    def archives(self):
+        """Архивы от новых к старым в виде (путь, размер, время)."""
+        archives = []
+        for path in self.rotated():
+            if not path.endswith(ARCHIVE_SUFFIX):
+                continue
+            stat = os.stat(path)
+            archives.append((path, stat.st_size, stat.st_mtime))
+        return sorted(archives, key=lambda archive: archive[2], reverse=True)
+
+    def expire(self):
+        """Удаление архивов, не проходящих ограничения хранения."""
+        now = self.clock()
+        total = 0
+        for index, (path, size, mtime) in enumerate(self.archives()):
+            total += size
+            if (
+                self.max_files and index >= self.max_files
+                or self.max_age and now - mtime > self.max_age
+                or self.max_bytes and total > self.max_bytes
+            ):
+                os.remove(path)
+                metrics.inc('logs.removed')
+
+    def run(self):
+        """Цикл фонового потока."""
+        while True:
+            path = self.queue.get()
+            try:
+                if path is not None:
+                    self.compress(path)
+                    self.expire()
+            except Exception as error:
+                logger.error(ARCHIVE_ERROR_MESSAGE.format(
+                    error=error, path=path
+                ))
+            finally:
+                self.queue.task_done()
+            if path is None:
+                return
+
+    def wait(self):
+        """Ожидание сжатия всех поставленных в очередь файлов."""
+        self.queue.join()
+
+    def close(self):
+        """Завершение фонового потока после очереди."""
+        self.queue.put(None)
+        self.thread.join()
+
+    def disk_usage(self):
+        """Число архивов, их суммарный размер и степень сжатия."""
+        archives = self.archives()
+        bytes_in = metrics.get('logs.bytes_in')
+        return {
+            'files': len(archives),
+            'bytes': sum(size for _, size, _ in archives),
+            'ratio': metrics.get('logs.bytes_out') / bytes_in
+            if bytes_in else None,
+        }
+
+
+class CompressingRotatingFileHandler(RotatingFileHandler):
+    """Ротация журнала по размеру со сжатием в фоне.
+
+    При переполнении файл только переименовывается с меткой времени, а
+    сжатие и удаление старых архивов выполняет `LogArchiver`, так что
+    запись в журнал не задерживается на время сжатия. Несжатые файлы,
+    оставшиеся от прошлого запуска, сжимаются при старте.
+    """
+
+    def __init__(self, filename, maxBytes, backupCount=0, max_age=0,
+                 max_total_bytes=0, encoding=None):
+        super().__init__(
+            filename, maxBytes=maxBytes, backupCount=backupCount,
+            encoding=encoding
+        )
+        self.archiver = LogArchiver(
+            self.baseFilename, backupCount, max_age, max_total_bytes
+        )
+        for path in self.archiver.rotated():
+            if not path.endswith(ARCHIVE_SUFFIX):
+                self.archiver.submit(path)
+
+    def doRollover(self):
+        """Переименование текущего файла и передача его на сжатие."""
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        rotated = '{}.{}'.format(
+            self.baseFilename, datetime.now().strftime(STAMP_FORMAT)
+        )
+        while os.path.exists(rotated) or os.path.exists(
+            rotated + ARCHIVE_SUFFIX
+        ):
+            rotated += '_'
+        if os.path.exists(self.baseFilename):
+            os.rename(self.baseFilename, rotated)
+            metrics.inc('logs.rotated')
+            self.archiver.submit(rotated)
+        if not self.delay:
+            self.stream = self._open()
+
+    def close(self):
+        """Закрытие файла и ожидание фонового сжатия."""
+        super().close()
+        self.archiver.close()
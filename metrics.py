@@ -0,0 +1,32 @@
+from collections import Counter
+import threading
+
+
+class Metrics:
+    """Потокобезопасные счётчики и показатели работы бота."""
+
+    def __init__(self):
+        self.counters = Counter()
+        self.lock = threading.Lock()
+
+    def inc(self, name, value=1):
+        """Увеличение счётчика."""
+        with self.lock:
+            self.counters[name] += value
+
+    def set(self, name, value):
+        """Запись текущего значения показателя, например длины очереди."""
+        with self.lock:
+            self.counters[name] = value
+
+    def get(self, name):
+        """Текущее значение счётчика."""
+        return self.counters[name]
+
+    def snapshot(self):
+        """Копия всех счётчиков."""
+        with self.lock:
+            return dict(self.counters)
+
+
+metrics = Metrics()
@@ -0,0 +1,148 @@
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+import logging
+import smtplib
+import time
+
+import requests
+
+from metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+EMAIL_SUBJECT = 'Статус проверки домашней работы'
+DELIVERED_MESSAGE = 'Канал {name} доставил сообщение: `{message}`'
+RETRY_MESSAGE = ('Ошибка `{error}` канала {name}, попытка {attempt} из '
+                 '{attempts}: `{message}`')
+FAILED_MESSAGE = 'Канал {name} не доставил сообщение: `{message}`'
+
+
+class Notifier:
+    """Канал доставки уведомлений со своим пулом потоков.
+
+    Каждый канал доставляет сообщения в собственном пуле, с собственным
+    таймаутом и числом повторов, поэтому медленный канал не задерживает
+    ни другие каналы, ни цикл опроса.
+    """
+
+    name = 'notifier'
+
+    def __init__(self, workers=1, timeout=10, retries=2, backoff=1):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix=self.name
+        )
+
+    def deliver(self, message):
+        """Одна попытка доставки; при неудаче выбрасывает исключение."""
+        raise NotImplementedError
+
+    def send(self, message):
+        """Доставка с повторами; True, если сообщение доставлено."""
+        attempts = self.retries + 1
+        for attempt in range(1, attempts + 1):
+            try:
+                self.deliver(message)
+            except Exception as error:
+                logger.warning(RETRY_MESSAGE.format(
+                    error=error, name=self.name, attempt=attempt,
+                    attempts=attempts, message=message
+                ))
+                if attempt < attempts:
+                    time.sleep(self.backoff * 2 ** (attempt - 1))
+                continue
+            metrics.inc(f'notifier.{self.name}.delivered')
+            logger.debug(DELIVERED_MESSAGE.format(
+                name=self.name, message=message
+            ))
+            return True
+        metrics.inc(f'notifier.{self.name}.failed')
+        logger.error(FAILED_MESSAGE.format(name=self.name, message=message))
+        return False
+
+    def submit(self, message):
+        """Постановка сообщения в очередь канала; возвращает Future."""
+        return self.pool.submit(self.send, message)
+
+    def close(self):
+        """Ожидание доставки поставленных сообщений и остановка пула."""
+        self.pool.shutdown(wait=True)
+
+
+class TelegramNotifier(Notifier):
+    """Доставка в Telegram чат."""
+
+    name = 'telegram'
+
+    def __init__(self, bot, chat_id, **kwargs):
+        super().__init__(**kwargs)
+        self.bot = bot
+        self.chat_id = chat_id
+
+    def deliver(self, message):
+        """Отправка сообщения ботом."""
+        self.bot.send_message(self.chat_id, message, timeout=self.timeout)
+
+
+class SmtpNotifier(Notifier):
+    """Доставка по электронной почте через SMTP."""
+
+    name = 'smtp'
+
+    def __init__(self, host, port, sender, recipients, **kwargs):
+        super().__init__(**kwargs)
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.recipients = recipients
+
+    def deliver(self, message):
+        """Отправка письма."""
+        email = EmailMessage()
+        email['Subject'] = EMAIL_SUBJECT
+        email['From'] = self.sender
+        email['To'] = ', '.join(self.recipients)
+        email.set_content(message)
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            smtp.send_message(email)
+
+
+class WebhookNotifier(Notifier):
+    """Доставка POST-запросом с JSON `{"text": ...}` на вебхук."""
+
+    name = 'webhook'
+
+    def __init__(self, url, **kwargs):
+        super().__init__(**kwargs)
+        self.url = url
+
+    def deliver(self, message):
+        """Отправка запроса на вебхук."""
+        requests.post(
+            self.url, json={'text': message}, timeout=self.timeout
+        ).raise_for_status()
+
+
+class FanOut:
+    """Параллельная рассылка сообщения по всем каналам."""
+
+    def __init__(self, notifiers):
+        self.notifiers = notifiers
+
+    def notify(self, message, names=None):
+        """Постановка сообщения в каналы без ожидания доставки.
+
+        Если заданы имена `names`, сообщение получают только эти каналы.
+        """
+        return [
+            notifier.submit(message) for notifier in self.notifiers
+            if not names or notifier.name in names
+        ]
+
+    def close(self):
+        """Остановка всех каналов."""
+        for notifier in self.notifiers:
+            notifier.close()
@@ -0,0 +1,266 @@
+from collections import OrderedDict
+import logging
+import queue
+import threading
+import time
+
+from metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+PAUSE = 'pause'
+COALESCE = 'coalesce'
+DROP_OLDEST = 'drop_oldest'
+POLICIES = (PAUSE, COALESCE, DROP_OLDEST)
+COALESCED = None
+RETRY_DELAY = 5
+MAX_RETRY_DELAY = 300
+WAIT_TIMEOUT = 1
+
+UNKNOWN_POLICY_MESSAGE = 'Неизвестная политика очереди доставки {policy}.'
+PARSE_ERROR_MESSAGE = 'Ошибка `{error}` при разборе работы {homework}.'
+SHED_MESSAGE = 'Очередь доставки переполнена, отброшено: {chat_id} {names}.'
+
+
+class DeliveryQueue:
+    """Ограниченная очередь доставки с политикой сброса нагрузки.
+
+    Новый статус работы всегда заменяет ещё не отправленный статус той
+    же работы в том же чате. Когда очередь заполнена, политика `pause`
+    заставляет производителя ждать, `coalesce` объединяет ожидающие
+    работы чата в одно сообщение, а `drop_oldest` отбрасывает самую
+    старую запись. Записи чата, отложенного до времени `waiting[чат]`
+    после неудачной отправки, не выдаются и не занимают место, так что
+    недоступный чат не задерживает остальные; их самих хранится не
+    больше `capacity`. Элемент очереди - чат и `{название работы: работа}`.
+    """
+
+    def __init__(self, capacity, policy=PAUSE, clock=time.monotonic):
+        if policy not in POLICIES:
+            raise ValueError(UNKNOWN_POLICY_MESSAGE.format(policy=policy))
+        self.capacity = capacity
+        self.policy = policy
+        self.clock = clock
+        self.items = OrderedDict()
+        self.waiting = {}
+        self.condition = threading.Condition()
+
+    def find(self, chat_id, name):
+        """Ключ записи с ожидающим статусом работы или None."""
+        for key in ((chat_id, name), (chat_id, COALESCED)):
+            if key in self.items and name in self.items[key][1]:
+                return key
+        return None
+
+    def supersede(self, chat_id, homework):
+        """Замена ожидающего статуса той же работы; True, если заменён."""
+        name = homework['homework_name']
+        key = self.find(chat_id, name)
+        if key is None:
+            return False
+        self.items[key][1][name] = homework
+        metrics.inc('pipeline.superseded')
+        return True
+
+    def is_ready(self, chat_id, now):
+        """Проверка, не отложена ли доставка в чат."""
+        return self.waiting.get(chat_id, now) <= now
+
+    def keys(self, ready=True):
+        """Ключи записей готовых (или отложенных) чатов по порядку."""
+        now = self.clock()
+        return [
+            key for key, (chat_id, _) in self.items.items()
+            if self.is_ready(chat_id, now) == ready
+        ]
+
+    def coalesce(self, chat_id, homework):
+        """Объединение всех ожидающих работ чата с новой в одну запись."""
+        merged = OrderedDict()
+        for key in [key for key in self.items if key[0] == chat_id]:
+            merged.update(self.items.pop(key)[1])
+        if not merged:
+            return False
+        merged[homework['homework_name']] = homework
+        self.items[(chat_id, COALESCED)] = (chat_id, merged)
+        metrics.inc('pipeline.coalesced')
+        return True
+
+    def shed(self, ready=True):
+        """Отбрасывание самой старой записи готовых (или отложенных) чатов."""
+        chat_id, homeworks = self.items.pop(self.keys(ready)[0])
+        logger.warning(
+            SHED_MESSAGE.format(chat_id=chat_id, names=list(homeworks))
+        )
+        metrics.inc('pipeline.shed', len(homeworks))
+
+    def put(self, chat_id, homework, timeout=None):
+        """Постановка работы в очередь; False, если место не освободилось."""
+        with self.condition:
+            if self.supersede(chat_id, homework):
+                return True
+            if self.is_full():
+                if self.policy == PAUSE:
+                    if not self.condition.wait_for(
+                        lambda: not self.is_full(), timeout
+                    ):
+                        return False
+                elif self.policy == COALESCE and self.coalesce(
+                    chat_id, homework
+                ):
+                    return True
+                else:
+                    self.shed()
+            self.items[(chat_id, homework['homework_name'])] = (
+                chat_id, OrderedDict([(homework['homework_name'], homework)])
+            )
+            self.condition.notify_all()
+            return True
+
+    def get(self, timeout=None):
+        """Извлечение первой записи готового чата или None."""
+        with self.condition:
+            keys = self.condition.wait_for(self.keys, timeout)
+            if not keys:
+                return None
+            item = self.items.pop(keys[0])
+            self.condition.notify_all()
+            return item
+
+    def defer(self, chat_id, homeworks, until):
+        """Возврат неотправленной записи в конец очереди до `until`.
+
+        Статус, заменённый за время отправки более новым, не
+        возвращается.
+        """
+        with self.condition:
+            self.waiting[chat_id] = until
+            for name, homework in homeworks.items():
+                if self.find(chat_id, name) is None:
+                    self.items[(chat_id, name)] = (
+                        chat_id, OrderedDict([(name, homework)])
+                    )
+            while len(self.keys(ready=False)) > self.capacity:
+                self.shed(ready=False)
+            self.condition.notify_all()
+
+    def resume(self, chat_id):
+        """Снятие отсрочки доставки в чат после успешной отправки."""
+        with self.condition:
+            self.waiting.pop(chat_id, None)
+
+    def is_full(self):
+        """Проверка заполненности очереди записями готовых чатов."""
+        return len(self.keys()) >= self.capacity
+
+    def __len__(self):
+        return len(self.items)
+
+
+class Pipeline:
+    """Конвейер опрос - разбор - доставка с ограниченными очередями.
+
+    Опрос кладёт списки работ в очередь разбора; поток разбора проверяет
+    работы и определяет чаты (`plan(homework)` возвращает чаты), поток
+    доставки отрисовывает (`render(chat_id, homeworks)`) и отправляет
+    (`send(chat_id, message)`). Медленная отправка не задерживает опрос,
+    а при заполненных очередях `accepting` сообщает опросу, что нужно
+    пропустить цикл. Неотправленная запись возвращается в конец очереди,
+    а чат откладывается на `retry_delay` секунд, удваивающихся с каждой
+    неудачей подряд до `MAX_RETRY_DELAY`. Заполненность стадий пишется
+    в `metrics`.
+    """
+
+    def __init__(self, plan, render, send, capacity, policy=PAUSE,
+                 retry_delay=RETRY_DELAY, clock=time.monotonic):
+        self.plan = plan
+        self.render = render
+        self.send = send
+        self.retry_delay = retry_delay
+        self.clock = clock
+        self.failures = {}
+        self.polled = queue.Queue(capacity)
+        self.deliveries = DeliveryQueue(capacity, policy, clock)
+        self.stopped = threading.Event()
+        self.threads = []
+
+    def accepting(self):
+        """Проверка, может ли опрос отдавать работы без переполнения."""
+        self.report()
+        if self.polled.full():
+            return False
+        return self.deliveries.policy != PAUSE or not self.deliveries.is_full()
+
+    def submit(self, homeworks):
+        """Передача работ из ответа API на разбор."""
+        self.polled.put_nowait(list(homeworks))
+
+    def parse_once(self, timeout=WAIT_TIMEOUT):
+        """Разбор одного списка работ из очереди."""
+        try:
+            homeworks = self.polled.get(timeout=timeout)
+        except queue.Empty:
+            return
+        for homework in homeworks:
+            try:
+                chats = self.plan(homework)
+            except Exception as error:
+                logger.error(PARSE_ERROR_MESSAGE.format(
+                    error=error, homework=homework
+                ))
+                continue
+            for chat_id in chats:
+                while not self.deliveries.put(
+                    chat_id, homework, timeout=WAIT_TIMEOUT
+                ):
+                    if self.stopped.is_set():
+                        return
+
+    def deliver_once(self, timeout=WAIT_TIMEOUT):
+        """Отправка одной записи очереди доставки."""
+        item = self.deliveries.get(timeout)
+        if item is None:
+            return
+        chat_id, homeworks = item
+        if self.send(chat_id, self.render(chat_id, homeworks)):
+            self.failures.pop(chat_id, None)
+            self.deliveries.resume(chat_id)
+            metrics.inc('pipeline.delivered')
+            return
+        failures = self.failures.get(chat_id, 0) + 1
+        self.failures[chat_id] = failures
+        delay = min(self.retry_delay * 2 ** (failures - 1), MAX_RETRY_DELAY)
+        self.deliveries.defer(chat_id, homeworks, self.clock() + delay)
+        metrics.inc('pipeline.retried')
+
+    def report(self):
+        """Запись заполненности стадий в метрики."""
+        metrics.set('pipeline.parse.size', self.polled.qsize())
+        metrics.set('pipeline.deliver.size', len(self.deliveries))
+        return {
+            'parse': (self.polled.qsize(), self.polled.maxsize),
+            'deliver': (len(self.deliveries), self.deliveries.capacity),
+        }
+
+    def loop(self, stage):
+        """Цикл потока стадии до остановки конвейера."""
+        while not self.stopped.is_set():
+            stage()
+
+    def start(self):
+        """Запуск потоков разбора и доставки."""
+        for name, stage in (('parse', self.parse_once),
+                            ('deliver', self.deliver_once)):
+            thread = threading.Thread(
+                target=self.loop, args=(stage,), name=name, daemon=True
+            )
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    def stop(self):
+        """Остановка потоков после текущих операций."""
+        self.stopped.set()
+        for thread in self.threads:
+            thread.join()
@@ -0,0 +1,104 @@
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import logging
+import os
+import time
+
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL = 24 * 3600
+WORKERS = 8
+
+CHECK_FAILED_MESSAGE = 'Предстартовая проверка {name} не прошла: {error}'
+CACHE_ERROR_MESSAGE = 'Ошибка `{error}` при чтении кеша проверок {path}.'
+SUMMARY_MESSAGE = ('Предстартовые проверки: {passed} пройдено, '
+                   '{cached} из кеша, {failed} с ошибками.')
+
+
+def secret_key(kind, secret):
+    """Ключ кеша для секрета без хранения самого секрета."""
+    digest = hashlib.sha256(str(secret).encode()).hexdigest()[:16]
+    return f'{kind}:{digest}'
+
+
+class Preflight:
+    """Параллельные предстартовые проверки с кешем успешных результатов.
+
+    Проверка - пара (ключ, функция), функция бросает исключение при
+    неудаче. Проверки выполняются в пуле из `workers` потоков. Успешные
+    результаты сохраняются в JSON-файл `cache_path` и `ttl` секунд не
+    повторяются, в том числе после перезапуска; неудачные проверяются
+    заново при каждом запуске.
+    """
+
+    def __init__(self, cache_path=None, ttl=CACHE_TTL, workers=WORKERS,
+                 clock=time.time):
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.workers = workers
+        self.clock = clock
+        self.cache = self.load()
+
+    def load(self):
+        """Чтение кеша `{ключ: время успешной проверки}`."""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError) as error:
+            logger.warning(CACHE_ERROR_MESSAGE.format(
+                error=error, path=self.cache_path
+            ))
+            return {}
+
+    def save(self):
+        """Запись кеша через временный файл."""
+        if not self.cache_path:
+            return
+        temporary = self.cache_path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump(self.cache, file)
+        os.replace(temporary, self.cache_path)
+
+    def is_fresh(self, key, now):
+        """Проверка, есть ли в кеше свежий успешный результат."""
+        return now - self.cache.get(key, float('-inf')) < self.ttl
+
+    def probe(self, key, check):
+        """Выполнение одной проверки; возвращает ошибку или None."""
+        try:
+            check()
+        except Exception as error:
+            logger.error(CHECK_FAILED_MESSAGE.format(name=key, error=error))
+            return error
+        return None
+
+    def run(self, checks):
+        """Выполнение проверок; возвращает `{ключ: ошибка}` неудачных."""
+        now = self.clock()
+        pending = {
+            key: check for key, check in checks
+            if not self.is_fresh(key, now)
+        }
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix='preflight'
+        ) as executor:
+            results = dict(zip(pending, executor.map(
+                self.probe, pending, pending.values()
+            )))
+        failed = {key: error for key, error in results.items() if error}
+        for key in results:
+            if key in failed:
+                self.cache.pop(key, None)
+            else:
+                self.cache[key] = now
+        self.save()
+        logger.info(SUMMARY_MESSAGE.format(
+            passed=len(results) - len(failed),
+            cached=len(dict(checks)) - len(pending),
+            failed=len(failed)
+        ))
+        return failed
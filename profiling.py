@@ -0,0 +1,103 @@
+import cProfile
+import logging
+import signal
+import time
+import tracemalloc
+
+
+logger = logging.getLogger(__name__)
+
+TRACEMALLOC_FRAMES = 10
+TOP_STATS = 30
+
+PROFILE_STARTED_MESSAGE = 'Профилирование следующих {cycles} циклов.'
+PROFILE_SAVED_MESSAGE = 'Профиль {cycles} циклов записан в {path}.'
+TRACING_STARTED_MESSAGE = 'Запущено отслеживание выделений памяти.'
+SNAPSHOT_SAVED_MESSAGE = 'Разница снимков памяти записана в {path}.'
+
+
+class Profiler:
+    """Профилирование процесса по сигналам без перезапуска.
+
+    SIGUSR1 включает cProfile на `cycles` следующих циклов опроса
+    (повторный сигнал останавливает раньше), SIGUSR2 записывает разницу
+    снимков tracemalloc с предыдущим сигналом. Вне сеанса затраты на
+    цикл - проверка одного флага.
+    """
+
+    def __init__(self, prefix, cycles, clock=time.time):
+        self.prefix = prefix
+        self.cycles = cycles
+        self.clock = clock
+        self.profile = None
+        self.remaining = 0
+        self.profiled = 0
+        self.snapshot = None
+
+    def install(self):
+        """Установка обработчиков SIGUSR1 и SIGUSR2."""
+        signal.signal(signal.SIGUSR1, self.on_toggle)
+        signal.signal(signal.SIGUSR2, self.on_snapshot)
+
+    def path(self, suffix):
+        """Путь к файлу результата рядом с логом."""
+        return f'{self.prefix}.{int(self.clock())}.{suffix}'
+
+    def on_toggle(self, signum=None, frame=None):
+        """Включение профилирования или досрочная остановка."""
+        if self.profile is not None or self.remaining:
+            self.stop()
+            return
+        self.remaining = self.cycles
+        logger.info(PROFILE_STARTED_MESSAGE.format(cycles=self.cycles))
+
+    def begin(self):
+        """Начало цикла: включение профилировщика, если запрошено."""
+        if not self.remaining:
+            return
+        if self.profile is None:
+            self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def end(self):
+        """Конец цикла: пауза профилировщика и запись по окончании."""
+        if self.profile is None:
+            return
+        self.profile.disable()
+        self.profiled += 1
+        self.remaining -= 1
+        if not self.remaining:
+            self.stop()
+
+    def stop(self):
+        """Остановка сеанса и запись профиля."""
+        profile, self.profile = self.profile, None
+        self.remaining = 0
+        if profile is None:
+            return None
+        profile.disable()
+        path = self.path('prof')
+        profile.dump_stats(path)
+        logger.info(
+            PROFILE_SAVED_MESSAGE.format(cycles=self.profiled, path=path)
+        )
+        self.profiled = 0
+        return path
+
+    def on_snapshot(self, signum=None, frame=None):
+        """Запись разницы снимков памяти с предыдущим вызовом."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self.snapshot = tracemalloc.take_snapshot()
+            logger.info(TRACING_STARTED_MESSAGE)
+            return None
+        snapshot = tracemalloc.take_snapshot()
+        stats = snapshot.compare_to(self.snapshot, 'lineno')
+        self.snapshot = snapshot
+        path = self.path('memory.txt')
+        with open(path, 'w', encoding='utf-8') as file:
+            current, peak = tracemalloc.get_traced_memory()
+            file.write(f'current={current} peak={peak}\n')
+            file.writelines(f'{stat}\n' for stat in stats[:TOP_STATS])
+        logger.info(SNAPSHOT_SAVED_MESSAGE.format(path=path))
+        return path
@@ -0,0 +1,164 @@
+from collections import namedtuple
+from itertools import product
+import json
+import logging
+import os
+import re
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TENANT = 'default'
+EXACT_FIELDS = ('tenant', 'status', 'lesson_name')
+RULE_FIELDS = EXACT_FIELDS + ('homework_name', 'homework_pattern')
+GROUP_PREFIX = '_rule'
+
+RULES_LOADED_MESSAGE = 'Загружено правил маршрутизации: {count} из {path}.'
+RULES_ERROR_MESSAGE = 'Ошибка `{error}` в правилах маршрутизации {path}.'
+RULE_FIELDS_MESSAGE = 'Неизвестные поля правила {index}: {fields}.'
+
+Route = namedtuple('Route', ('chats', 'backends'))
+
+
+def merge(rules):
+    """Объединение получателей сработавших правил с сохранением порядка."""
+    chats = {}
+    backends = {}
+    for rule in rules:
+        chats.update(dict.fromkeys(rule.get('chats', ())))
+        backends.update(dict.fromkeys(rule.get('backends', ())))
+    return Route(tuple(chats), tuple(backends))
+
+
+class RuleSet:
+    """Правила маршрутизации, скомпилированные в индекс.
+
+    Правило задаёт условия на `tenant`, `status`, `lesson_name`, точное
+    `homework_name` или регулярное выражение `homework_pattern`, и
+    получателей: `chats` и `backends`. Условия с точным значением
+    попадают в словарь по ключу (арендатор, статус, урок, название);
+    регулярные выражения одной корзины объединяются в одно выражение,
+    которое за один проход находит все подходящие правила. Каждое
+    выражение сначала компилируется отдельно; выражения со своими
+    группами (в том числе именованными и обратными ссылками) в общее не
+    входят и проверяются по одному. Поиск - не больше 16 обращений к
+    словарю независимо от числа правил.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.exact = {}
+        patterns = {}
+        for index, rule in enumerate(rules):
+            unknown = set(rule) - set(RULE_FIELDS) - {'chats', 'backends'}
+            if unknown:
+                raise ValueError(
+                    RULE_FIELDS_MESSAGE.format(index=index, fields=unknown)
+                )
+            key = tuple(rule.get(field) for field in EXACT_FIELDS)
+            if 'homework_pattern' in rule:
+                patterns.setdefault(key, []).append(index)
+                continue
+            self.exact.setdefault(
+                key + (rule.get('homework_name'),), []
+            ).append(rule)
+        self.patterns = {}
+        self.separate = {}
+        for key, indexes in patterns.items():
+            combined = []
+            for index in indexes:
+                pattern = re.compile(rules[index]['homework_pattern'])
+                if pattern.groups:
+                    self.separate.setdefault(key, []).append(
+                        (pattern, rules[index])
+                    )
+                else:
+                    combined.append(index)
+            if combined:
+                self.patterns[key] = self.combine(combined)
+
+    def combine(self, indexes):
+        """Общее выражение правил и номера его групп по правилам."""
+        pattern = re.compile(''.join(
+            f'(?=(?P<{GROUP_PREFIX}{index}>'
+            f'{self.rules[index]["homework_pattern"]})\\Z)?'
+            for index in indexes
+        ))
+        return pattern, tuple(
+            (pattern.groupindex[f'{GROUP_PREFIX}{index}'], self.rules[index])
+            for index in indexes
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Чтение и компиляция правил из JSON-файла со списком правил."""
+        with open(path, encoding='utf-8') as file:
+            return cls(json.load(file))
+
+    def match(self, homework, tenant=DEFAULT_TENANT):
+        """Все правила, подходящие под работу арендатора."""
+        values = (tenant, homework.get('status'), homework.get('lesson_name'))
+        name = homework.get('homework_name')
+        matched = []
+        for key in product(*((value, None) for value in values)):
+            for homework_name in (name, None):
+                matched.extend(self.exact.get(key + (homework_name,), ()))
+            if name is None:
+                continue
+            if key in self.patterns:
+                pattern, groups = self.patterns[key]
+                found = pattern.match(name)
+                matched.extend(
+                    rule for group, rule in groups
+                    if found.group(group) is not None
+                )
+            matched.extend(
+                rule for pattern, rule in self.separate.get(key, ())
+                if pattern.fullmatch(name)
+            )
+        return matched
+
+    def route(self, homework, tenant=DEFAULT_TENANT):
+        """Получатели уведомления; None, если ни одно правило не сработало."""
+        matched = self.match(homework, tenant)
+        if not matched:
+            return None
+        return merge(matched)
+
+
+class Router:
+    """Правила из файла с перезагрузкой при его изменении."""
+
+    def __init__(self, path):
+        self.path = path
+        self.mtime = None
+        self.rules = RuleSet([])
+        self.lock = threading.Lock()
+        self.reload()
+
+    def reload(self):
+        """Перечитывание файла правил, если он изменился.
+
+        При ошибке в новых правилах продолжают действовать старые.
+        """
+        with self.lock:
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+                if mtime == self.mtime:
+                    return False
+                self.rules = RuleSet.load(self.path)
+                self.mtime = mtime
+            except (OSError, ValueError, KeyError, re.error) as error:
+                logger.error(
+                    RULES_ERROR_MESSAGE.format(error=error, path=self.path)
+                )
+                return False
+        logger.info(RULES_LOADED_MESSAGE.format(
+            count=len(self.rules.rules), path=self.path
+        ))
+        return True
+
+    def route(self, homework, tenant=DEFAULT_TENANT):
+        """Получатели уведомления по текущим правилам."""
+        return self.rules.route(homework, tenant)
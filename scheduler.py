@@ -0,0 +1,57 @@
+import heapq
+
+
+UNSCHEDULED = float('inf')
+IDLE = None
+
+
+class Scheduler:
+    """Очередь арендаторов по времени следующего опроса на двоичной куче.
+
+    Время опроса хранится в колонке `next_due` состояния арендаторов, в
+    куче лежат пары (время, арендатор). Перепланирование добавляет новую
+    пару, а устаревшие пропускаются при извлечении, так что и
+    планирование, и выдача стоят O(log n), а пустой тик - O(1).
+    """
+
+    def __init__(self, next_due):
+        self.next_due = next_due
+        self.heap = []
+
+    def schedule(self, tenant, due):
+        """Назначение времени следующего опроса арендатора."""
+        self.next_due[tenant] = due
+        heapq.heappush(self.heap, (due, tenant))
+
+    def discard_stale(self):
+        """Удаление с вершины кучи записей, заменённых перепланированием."""
+        heap = self.heap
+        while heap and self.next_due[heap[0][1]] != heap[0][0]:
+            heapq.heappop(heap)
+
+    def pop_due(self, now):
+        """Извлечение арендаторов, которых пора опрашивать, по порядку."""
+        due = []
+        heap = self.heap
+        self.discard_stale()
+        while heap and heap[0][0] <= now:
+            _, tenant = heapq.heappop(heap)
+            self.next_due[tenant] = UNSCHEDULED
+            due.append(tenant)
+            self.discard_stale()
+        return due
+
+    def next_time(self):
+        """Ближайшее время опроса или None, если очередь пуста."""
+        self.discard_stale()
+        if not self.heap:
+            return None
+        return self.heap[0][0]
+
+    def __len__(self):
+        return len(self.heap)
+
+
+def interval_for(intervals, status):
+    """Период опроса для статуса; `intervals[None]` - для прочих."""
+    return intervals.get(status, intervals[IDLE])
@@ -0,0 +1,129 @@
+from collections import namedtuple
+
+from exceptions import SchemaError
+
+
+TYPE_MESSAGE = 'ожидался тип {expected}, получен {actual}'
+MISSING_MESSAGE = 'отсутствует обязательный ключ'
+ENUM_MESSAGE = 'недопустимое значение {value!r}'
+
+
+class Violation(namedtuple('Violation', ('path', 'message'))):
+    """Нарушение схемы: путь к значению и описание."""
+
+    __slots__ = ()
+
+    def __str__(self):
+        path = ''.join(
+            f'[{part}]' if isinstance(part, int) else f'.{part}'
+            for part in self.path
+        ).lstrip('.')
+        return f'{path or "<ответ>"}: {self.message}'
+
+
+def homework_schema(statuses):
+    """Схема одной работы из ответа `homework_statuses`."""
+    return {
+        'type': dict,
+        'fields': {
+            'homework_name': {'type': str},
+            'status': {'type': str, 'enum': tuple(statuses)},
+            'lesson_name': {'type': str, 'required': False, 'nullable': True},
+            'date_updated': {
+                'type': str, 'required': False, 'nullable': True
+            },
+        },
+    }
+
+
+RESPONSE_SCHEMA = {
+    'type': dict,
+    'fields': {
+        'homeworks': {'type': list},
+        'current_date': {'type': int, 'required': False},
+    },
+}
+
+
+def compile_schema(spec):
+    """Сборка проверки по декларативной схеме.
+
+    Схема - словарь с ключами `type`, `fields` (схемы ключей словаря,
+    `required` по умолчанию True), `items` (схема элементов списка),
+    `enum` и `nullable`. Разбор схемы выполняется один раз; результат -
+    функция `check(value, path, errors)`, добавляющая нарушения в
+    `errors` и не останавливающаяся на первом.
+    """
+    kind = spec.get('type')
+    nullable = spec.get('nullable', False)
+    allowed = frozenset(spec['enum']) if 'enum' in spec else None
+    fields = tuple(
+        (name, field.get('required', True), compile_schema(field))
+        for name, field in spec.get('fields', {}).items()
+    )
+    items = compile_schema(spec['items']) if 'items' in spec else None
+    expected = kind.__name__ if kind is not None else None
+
+    def check(value, path, errors):
+        if value is None and nullable:
+            return
+        if kind is not None and (
+            not isinstance(value, kind)
+            or kind is int and isinstance(value, bool)
+        ):
+            errors.append(Violation(path, TYPE_MESSAGE.format(
+                expected=expected, actual=type(value).__name__
+            )))
+            return
+        if allowed is not None and value not in allowed:
+            errors.append(
+                Violation(path, ENUM_MESSAGE.format(value=value))
+            )
+        for name, required, check_field in fields:
+            if name in value:
+                check_field(value[name], path + (name,), errors)
+            elif required:
+                errors.append(Violation(path + (name,), MISSING_MESSAGE))
+        if items is not None:
+            for index, item in enumerate(value):
+                items(item, path + (index,), errors)
+
+    return check
+
+
+class ResponseValidator:
+    """Скомпилированная проверка ответа `homework_statuses`.
+
+    Ответ и все работы проверяются за один проход, нарушения собираются
+    списком. В строгом режиме любое нарушение приводит к `SchemaError`,
+    в нестрогом некорректные работы отбрасываются, а остальные
+    возвращаются вместе со списком нарушений.
+    """
+
+    def __init__(self, statuses, strict=True):
+        self.strict = strict
+        self.check_response = compile_schema(RESPONSE_SCHEMA)
+        self.check_homework = compile_schema(homework_schema(statuses))
+
+    def validate(self, response):
+        """Проверка ответа; возвращает (корректные работы, нарушения)."""
+        errors = []
+        self.check_response(response, (), errors)
+        if errors:
+            raise SchemaError(errors)
+        valid = []
+        for index, homework in enumerate(response['homeworks']):
+            found = len(errors)
+            self.check_homework(homework, ('homeworks', index), errors)
+            if len(errors) == found:
+                valid.append(homework)
+        if errors and self.strict:
+            raise SchemaError(errors)
+        return valid, errors
+
+    def validate_homework(self, homework):
+        """Проверка одной работы с `SchemaError` при нарушениях."""
+        errors = []
+        self.check_homework(homework, (), errors)
+        if errors:
+            raise SchemaError(errors)
@@ -0,0 +1,240 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+import time
+
+
+MAGIC = b'HWST'
+VERSION = 1
+HEADER = struct.Struct('<4sIIIII')
+NAME = struct.Struct('<32s')
+TENANT = struct.Struct('<IIqdB7x')
+COUNTER = struct.Struct('<q')
+READ_ATTEMPTS = 100
+
+LAYOUT_MESSAGE = 'Файл {path} не является сегментом состояния.'
+VERSION_MESSAGE = 'Версия сегмента {version} не поддерживается.'
+NAME_MESSAGE = 'Имя `{name}` длиннее 32 байт.'
+TENANT_RANGE_MESSAGE = 'Арендатор {tenant} вне сегмента из {tenants} слотов.'
+WORKER_RANGE_MESSAGE = ('Обработчик {worker} вне сегмента из {workers} '
+                        'обработчиков.')
+
+
+def encode_name(name):
+    """Имя в фиксированном поле 32 байта."""
+    data = name.encode()
+    if len(data) > NAME.size:
+        raise ValueError(NAME_MESSAGE.format(name=name))
+    return data
+
+
+class Segment:
+    """Разделяемый между процессами сегмент состояния и счётчиков.
+
+    Файл отображается в память и имеет фиксированную разметку: заголовок,
+    таблицы имён статусов и счётчиков, затем для каждого процесса-
+    обработчика `tenants` слотов арендаторов (курсор, код статуса, время
+    обновления) и строка счётчиков. Каждый обработчик пишет только в
+    свою область, поэтому блокировки не нужны; слот арендатора защищён
+    счётчиком версий (seqlock), так что читатель не видит наполовину
+    записанных значений и не мешает обработчикам.
+    """
+
+    def __init__(self, path, writable=True):
+        self.path = path
+        self.file = open(path, 'r+b' if writable else 'rb')
+        self.map = mmap.mmap(
+            self.file.fileno(), 0,
+            access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+        )
+        magic, version, self.workers, self.tenants, statuses, counters = (
+            HEADER.unpack_from(self.map)
+        )
+        if magic != MAGIC:
+            raise ValueError(LAYOUT_MESSAGE.format(path=path))
+        if version != VERSION:
+            raise ValueError(VERSION_MESSAGE.format(version=version))
+        offset = HEADER.size
+        self.statuses = self.read_names(offset, statuses)
+        offset += statuses * NAME.size
+        self.counters = self.read_names(offset, counters)
+        self.status_codes = {
+            status: code for code, status in enumerate(self.statuses, 1)
+        }
+        self.counter_indexes = {
+            name: index for index, name in enumerate(self.counters)
+        }
+        self.areas_offset = offset + counters * NAME.size
+        self.area_size = (
+            self.tenants * TENANT.size + len(self.counters) * COUNTER.size
+        )
+
+    @classmethod
+    def create(cls, path, workers, tenants, statuses, counters):
+        """Создание сегмента, если его ещё нет, и открытие на запись.
+
+        Сегмент собирается во временном файле и появляется под именем
+        `path` атомарно, так что одновременно стартующие обработчики
+        открывают один и тот же сегмент.
+        """
+        if not os.path.exists(path):
+            size = (
+                HEADER.size + (len(statuses) + len(counters)) * NAME.size
+                + workers * (
+                    tenants * TENANT.size + len(counters) * COUNTER.size
+                )
+            )
+            temporary = f'{path}.{os.getpid()}.tmp'
+            with open(temporary, 'wb') as file:
+                file.write(HEADER.pack(
+                    MAGIC, VERSION, workers, tenants, len(statuses),
+                    len(counters)
+                ))
+                for name in tuple(statuses) + tuple(counters):
+                    file.write(NAME.pack(encode_name(name)))
+                file.truncate(size)
+            try:
+                os.link(temporary, path)
+            except FileExistsError:
+                pass
+            finally:
+                os.remove(temporary)
+        return cls(path)
+
+    def read_names(self, offset, count):
+        """Чтение таблицы имён."""
+        return tuple(
+            NAME.unpack_from(self.map, offset + index * NAME.size)[0]
+            .rstrip(b'\0').decode()
+            for index in range(count)
+        )
+
+    def check_worker(self, worker):
+        """Проверка номера обработчика."""
+        if not 0 <= worker < self.workers:
+            raise IndexError(WORKER_RANGE_MESSAGE.format(
+                worker=worker, workers=self.workers
+            ))
+
+    def tenant_offset(self, worker, tenant):
+        """Смещение слота арендатора обработчика."""
+        self.check_worker(worker)
+        if not 0 <= tenant < self.tenants:
+            raise IndexError(TENANT_RANGE_MESSAGE.format(
+                tenant=tenant, tenants=self.tenants
+            ))
+        return (
+            self.areas_offset + worker * self.area_size
+            + tenant * TENANT.size
+        )
+
+    def counter_offset(self, worker, index):
+        """Смещение счётчика в строке обработчика."""
+        self.check_worker(worker)
+        return (
+            self.areas_offset + worker * self.area_size
+            + self.tenants * TENANT.size + index * COUNTER.size
+        )
+
+    def set_tenant(self, worker, tenant, cursor, status=None,
+                   updated=None):
+        """Запись состояния арендатора под счётчиком версий."""
+        offset = self.tenant_offset(worker, tenant)
+        sequence = TENANT.unpack_from(self.map, offset)[0]
+        struct.pack_into('<I', self.map, offset, sequence + 1)
+        TENANT.pack_into(
+            self.map, offset, sequence + 1, 0, cursor,
+            time.time() if updated is None else updated,
+            self.status_codes.get(status, 0)
+        )
+        struct.pack_into('<I', self.map, offset, sequence + 2)
+
+    def tenant(self, worker, tenant):
+        """Согласованное чтение `(курсор, статус, время обновления)`."""
+        offset = self.tenant_offset(worker, tenant)
+        for _ in range(READ_ATTEMPTS):
+            before, _, cursor, updated, code = TENANT.unpack_from(
+                self.map, offset
+            )
+            after = struct.unpack_from('<I', self.map, offset)[0]
+            if before == after and not before % 2:
+                status = self.statuses[code - 1] if code else None
+                return cursor, status, updated
+        raise TimeoutError(offset)
+
+    def publish(self, worker, values):
+        """Запись значений известных сегменту счётчиков обработчика."""
+        for name, value in values.items():
+            index = self.counter_indexes.get(name)
+            if index is not None:
+                COUNTER.pack_into(
+                    self.map, self.counter_offset(worker, index), value
+                )
+
+    def snapshot(self):
+        """Снимок: ненулевые слоты арендаторов и суммы счётчиков."""
+        tenants = {}
+        counters = dict.fromkeys(self.counters, 0)
+        for worker in range(self.workers):
+            for tenant in range(self.tenants):
+                cursor, status, updated = self.tenant(worker, tenant)
+                if updated:
+                    tenants[f'{worker}/{tenant}'] = {
+                        'cursor': cursor, 'status': status,
+                        'updated': updated,
+                    }
+            for index, name in enumerate(self.counters):
+                counters[name] += COUNTER.unpack_from(
+                    self.map, self.counter_offset(worker, index)
+                )[0]
+        return {'tenants': tenants, 'counters': counters}
+
+    def close(self):
+        """Закрытие отображения и файла."""
+        self.map.close()
+        self.file.close()
+
+
+class SegmentWriter:
+    """Запись в сегмент от имени одного обработчика."""
+
+    def __init__(self, segment, worker):
+        try:
+            segment.check_worker(worker)
+        except IndexError as error:
+            raise ValueError(error) from error
+        self.segment = segment
+        self.worker = worker
+        self.statuses = {}
+
+    def set_tenant(self, tenant, cursor, status=None):
+        """Запись курсора и статуса арендатора; None - прежний статус.
+
+        Арендаторы сверх числа слотов сегмента не записываются.
+        """
+        if tenant >= self.segment.tenants:
+            return
+        if status is None:
+            status = self.statuses.get(tenant)
+        self.statuses[tenant] = status
+        self.segment.set_tenant(self.worker, tenant, cursor, status)
+
+    def set_status(self, tenant, status):
+        """Запоминание статуса до следующей записи курсора."""
+        self.statuses[tenant] = status
+
+    def publish(self, values):
+        """Запись счётчиков обработчика."""
+        self.segment.publish(self.worker, values)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Снимок разделяемого состояния обработчиков бота.'
+    )
+    parser.add_argument('path')
+    options = parser.parse_args()
+    segment = Segment(options.path, writable=False)
+    print(json.dumps(segment.snapshot(), ensure_ascii=False, indent=2))
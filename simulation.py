@@ -0,0 +1,187 @@
+import argparse
+import bisect
+import json
+import random
+import re
+import time
+
+from digest import Digest
+from history import DATE_FORMAT, parse_date, percentile
+import homework
+from scheduler import IDLE
+from subscriptions import Hub
+
+
+START_TIME = 1_700_000_000
+FINAL_STATUSES = ('approved', 'rejected')
+NAME_PATTERN = re.compile(r'"([^"]+)"')
+
+
+class VirtualClock:
+    """Виртуальные часы: `sleep` сдвигает время, а не ждёт."""
+
+    def __init__(self, now=START_TIME):
+        self.now = now
+
+    def __call__(self):
+        """Текущее виртуальное время."""
+        return self.now
+
+    def sleep(self, seconds):
+        """Сдвиг виртуального времени."""
+        self.now += seconds
+
+
+class ScriptedApi:
+    """API домашек, отвечающее по заранее заданной ленте событий.
+
+    Лента - словарь `{токен: [(время, название работы, статус), ...]}`.
+    Ответ на запрос содержит события в интервале (from_date, сейчас],
+    от новых к старым, как у настоящего API.
+    """
+
+    def __init__(self, timelines, clock):
+        self.clock = clock
+        self.calls = 0
+        self.times = {}
+        self.homeworks = {}
+        for token, events in timelines.items():
+            events = sorted(events)
+            self.times[token] = [at for at, _, _ in events]
+            self.homeworks[token] = [
+                {
+                    'homework_name': name,
+                    'status': status,
+                    'date_updated': time.strftime(
+                        DATE_FORMAT, time.gmtime(at)
+                    ),
+                }
+                for at, name, status in events
+            ]
+
+    def fetch(self, timestamp, token):
+        """Ответ API для токена на текущий виртуальный момент."""
+        self.calls += 1
+        times = self.times.get(token, [])
+        first = bisect.bisect_right(times, timestamp)
+        last = bisect.bisect_right(times, self.clock())
+        return {
+            'homeworks': self.homeworks.get(token, [])[first:last][::-1],
+            'current_date': int(self.clock()),
+        }
+
+
+class Recorder:
+    """Учёт отправленных сообщений и задержки уведомлений.
+
+    Задержка считается для каждой работы, упомянутой в сообщении, от
+    `date_updated` её последнего разобранного статуса до отправки.
+    """
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.messages = 0
+        self.delays = []
+        self.updated_at = {}
+
+    def parse(self, homework_data):
+        """Разбор статуса настоящей `parse_status`."""
+        message = homework.parse_status(homework_data)
+        self.updated_at[homework_data['homework_name']] = parse_date(
+            homework_data['date_updated'], None
+        )
+        return message
+
+    def send(self, chat_id, message):
+        """Фиктивная отправка с расчётом задержки от смены статуса."""
+        self.messages += 1
+        now = self.clock()
+        self.delays.extend(
+            now - self.updated_at[name]
+            for name in NAME_PATTERN.findall(message)
+            if name in self.updated_at
+        )
+        return True
+
+
+def generate_timelines(tenants, duration, seed=0):
+    """Случайная лента: каждая работа уходит на проверку и проверяется."""
+    rng = random.Random(seed)
+    timelines = {}
+    for tenant in range(tenants):
+        reviewing = START_TIME + rng.randrange(duration)
+        reviewed = reviewing + rng.randrange(duration // 4 or 1)
+        timelines[f'token{tenant}'] = [
+            (reviewing, f'hw{tenant}', 'reviewing'),
+            (reviewed, f'hw{tenant}', rng.choice(FINAL_STATUSES)),
+        ]
+    return timelines
+
+
+def simulate(timelines, duration, chats_per_token=1,
+             retry_period=homework.RETRY_PERIOD, digest_window=0,
+             idle_interval=0):
+    """Прогон настоящего конвейера опроса в виртуальном времени."""
+    clock = VirtualClock()
+    api = ScriptedApi(timelines, clock)
+    recorder = Recorder(clock)
+    digest = None
+    if digest_window:
+        digest = Digest(
+            homework.HOMEWORK_VERDICTS,
+            digest_window,
+            homework.DIGEST_MAX_SIZE,
+            clock=clock
+        )
+    hub = Hub(
+        api.fetch, homework.check_response, recorder.parse, recorder.send,
+        homework.ERROR_MESSAGE, digest=digest, clock=clock,
+        intervals={'reviewing': retry_period, IDLE: idle_interval}
+        if idle_interval else None
+    )
+    for token in timelines:
+        for chat in range(chats_per_token):
+            hub.subscribe(token, f'{token}-chat{chat}')
+    started = time.perf_counter()
+    end = clock() + duration
+    while clock() < end:
+        hub.poll_all()
+        clock.sleep(retry_period)
+    delays = sorted(recorder.delays)
+    return {
+        'tenants': len(timelines),
+        'virtual_seconds': duration,
+        'wall_seconds': round(time.perf_counter() - started, 3),
+        'api_calls': api.calls,
+        'messages_sent': recorder.messages,
+        'delay_mean': sum(delays) / len(delays) if delays else None,
+        'delay_p50': percentile(delays, 0.5),
+        'delay_p95': percentile(delays, 0.95),
+        'delay_max': delays[-1] if delays else None,
+    }
+
+
+def parse_args(args=None):
+    """Разбор аргументов командной строки."""
+    parser = argparse.ArgumentParser(
+        description='Прогон бота в виртуальном времени.'
+    )
+    parser.add_argument('--tenants', type=int, default=1000)
+    parser.add_argument('--hours', type=float, default=24)
+    parser.add_argument('--chats', type=int, default=1)
+    parser.add_argument('--digest-window', type=int, default=0)
+    parser.add_argument('--idle-interval', type=int, default=0)
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args(args)
+
+
+if __name__ == '__main__':
+    options = parse_args()
+    duration = int(options.hours * 3600)
+    print(json.dumps(simulate(
+        generate_timelines(options.tenants, duration, options.seed),
+        duration,
+        chats_per_token=options.chats,
+        digest_window=options.digest_window,
+        idle_interval=options.idle_interval,
+    ), indent=2))
@@ -0,0 +1,186 @@
+from array import array
+from collections import deque
+from importlib import import_module
+import json
+import logging
+import time
+
+import requests
+
+from metrics import metrics
+from scheduler import Scheduler
+
+
+logger = logging.getLogger(__name__)
+
+REQUEST_TIMEOUT = 10
+QUEUE_SIZE = 100
+
+SOURCE_ERROR_MESSAGE = 'Ошибка `{error}` при опросе источника {name}.'
+STATUS_ERROR_MESSAGE = 'Источник {name} ответил статусом {status_code}.'
+ITEMS_TYPE_MESSAGE = 'Поле `{field}` источника {name} не является списком.'
+SOURCES_LOADED_MESSAGE = 'Загружено источников: {count} из {path}.'
+INTERVAL_MESSAGE = ('Период источника {name} увеличен с {interval} до '
+                    '{minimum} секунд: бот не просыпается чаще.')
+QUEUE_FULL_MESSAGE = ('Очередь неотправленных сообщений чата {chat_id} '
+                      'переполнена, отброшено: `{message}`')
+
+
+class Source:
+    """Источник статусов для общего опроса.
+
+    Источник задаёт адрес `endpoint`, заголовки авторизации `headers`,
+    параметр запроса с курсором `cursor_param`, поле ответа с новым
+    курсором `cursor_field` и поле со списком изменений `items_field`.
+    Подклассы переопределяют `check` и `render` для своего формата.
+    """
+
+    def __init__(self, name, endpoint, chat_id, headers=None,
+                 cursor_param='from_date', cursor_field='current_date',
+                 items_field='items', interval=600, template=None,
+                 cursor=None):
+        self.name = name
+        self.endpoint = endpoint
+        self.chat_id = chat_id
+        self.headers = headers or {}
+        self.cursor_param = cursor_param
+        self.cursor_field = cursor_field
+        self.items_field = items_field
+        self.interval = interval
+        self.template = template
+        self.cursor = int(time.time()) if cursor is None else cursor
+
+    def params(self):
+        """Параметры запроса с текущим курсором."""
+        return {self.cursor_param: self.cursor}
+
+    def check(self, response):
+        """Проверка ответа; возвращает список изменений."""
+        items = response[self.items_field]
+        if not isinstance(items, list):
+            raise TypeError(ITEMS_TYPE_MESSAGE.format(
+                field=self.items_field, name=self.name
+            ))
+        return items
+
+    def render(self, item):
+        """Сообщение об изменении по шаблону `str.format`."""
+        return self.template.format(**item)
+
+
+def load_renderer(path):
+    """Функция отрисовки по пути вида `модуль:функция`."""
+    module, name = path.split(':')
+    return getattr(import_module(module), name)
+
+
+def load_sources(path):
+    """Источники из JSON-файла со списком параметров `Source`.
+
+    Ключ `renderer` (`модуль:функция`) заменяет шаблон `template`.
+    """
+    with open(path, encoding='utf-8') as file:
+        configs = json.load(file)
+    sources = []
+    for config in configs:
+        renderer = config.pop('renderer', None)
+        source = Source(**config)
+        if renderer is not None:
+            source.render = load_renderer(renderer)
+        sources.append(source)
+    logger.info(SOURCES_LOADED_MESSAGE.format(count=len(sources), path=path))
+    return sources
+
+
+class Poller:
+    """Общий опрос источников с одним пулом соединений и очередью отправки.
+
+    Источники опрашиваются по расписанию `Scheduler` каждый со своим
+    периодом через общую сессию `requests`. Сообщения ответа
+    отрисовываются целиком и только затем попадают в очереди своих
+    чатов вместе со сдвигом курсора источника. Неотправленные сообщения
+    чата ждут следующего тика, не задерживая другие чаты; в очереди
+    чата хранится не больше `queue_size` сообщений. Период источника не
+    может быть меньше `min_interval` - периода, с которым бот вызывает
+    `tick`.
+    """
+
+    def __init__(self, send, session=None, clock=time.time,
+                 timeout=REQUEST_TIMEOUT, queue_size=QUEUE_SIZE,
+                 min_interval=0):
+        self.send = send
+        self.min_interval = min_interval
+        self.session = session or requests.Session()
+        self.clock = clock
+        self.timeout = timeout
+        self.sources = []
+        self.scheduler = Scheduler(array('d'))
+        self.queue_size = queue_size
+        self.queues = {}
+
+    def add(self, source):
+        """Регистрация источника; первый опрос - в ближайший тик."""
+        if source.interval < self.min_interval:
+            logger.warning(INTERVAL_MESSAGE.format(
+                name=source.name, interval=source.interval,
+                minimum=self.min_interval
+            ))
+            source.interval = self.min_interval
+        self.sources.append(source)
+        self.scheduler.next_due.append(0.0)
+        self.scheduler.schedule(len(self.sources) - 1, self.clock())
+        return source
+
+    def fetch(self, source):
+        """Запрос к источнику, проверка и постановка сообщений в очередь."""
+        response = self.session.get(
+            source.endpoint, headers=source.headers, params=source.params(),
+            timeout=self.timeout
+        )
+        if response.status_code != requests.codes.ok:
+            raise ConnectionError(STATUS_ERROR_MESSAGE.format(
+                name=source.name, status_code=response.status_code
+            ))
+        payload = response.json()
+        messages = [source.render(item) for item in source.check(payload)]
+        for message in messages:
+            self.enqueue(source.chat_id, message)
+        source.cursor = payload.get(source.cursor_field, source.cursor)
+        metrics.inc(f'source.{source.name}.polled')
+
+    def enqueue(self, chat_id, message):
+        """Постановка сообщения в очередь чата."""
+        queue = self.queues.setdefault(chat_id, deque())
+        if len(queue) >= self.queue_size:
+            logger.warning(QUEUE_FULL_MESSAGE.format(
+                chat_id=chat_id, message=queue.popleft()
+            ))
+            metrics.inc('source.dropped')
+        queue.append(message)
+
+    def flush(self):
+        """Отправка очереди каждого чата до первой неудачи в этом чате."""
+        for chat_id, queue in list(self.queues.items()):
+            while queue and self.send(chat_id, queue[0]):
+                queue.popleft()
+            if not queue:
+                del self.queues[chat_id]
+        return not self.queues
+
+    def tick(self):
+        """Опрос созревших источников и отправка очереди."""
+        for index in self.scheduler.pop_due(self.clock()):
+            source = self.sources[index]
+            try:
+                self.fetch(source)
+            except Exception as error:
+                logger.error(SOURCE_ERROR_MESSAGE.format(
+                    error=error, name=source.name
+                ))
+                metrics.inc(f'source.{source.name}.errors')
+            self.scheduler.schedule(index, self.clock() + source.interval)
+        return self.flush()
+
+    def close(self):
+        """Закрытие пула соединений."""
+        self.session.close()
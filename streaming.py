@@ -0,0 +1,153 @@
+import codecs
+import json
+
+from exceptions import ApiError
+
+
+WHITESPACE = ' \t\n\r'
+DIGITS = '0123456789'
+COMPACT_SIZE = 1 << 16
+
+UNEXPECTED_END_MESSAGE = 'Ответ API оборвался на позиции {position}.'
+UNEXPECTED_CHAR_MESSAGE = ('Ожидался символ `{expected}`, получен `{char}` '
+                           'на позиции {position}.')
+RESPONSE_MESSAGE = ('Тип ответа не соответствует ожидаемому. '
+                    'Ответ начинается с `{char}`')
+HOMEWORKS_MISSING_MESSAGE = 'В ответе отсутствует ключ `homeworks`'
+HOMEWORKS_WRONG_TYPE_MESSAGE = ('Неправильный тип поля `homeworks`. '
+                                'Поле начинается с `{char}`')
+HOMEWORK_WRONG_TYPE_MESSAGE = 'Неправильный тип домашней работы: {homework}'
+API_ERROR_KEY_MESSAGE = 'В ответе API найден ключ {key} со значением {value}.'
+
+
+def decode_chunks(chunks, encoding='utf-8'):
+    """Инкрементальное декодирование байтовых кусков в строки."""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            yield chunk
+        else:
+            yield decoder.decode(chunk)
+    yield decoder.decode(b'', final=True)
+
+
+class HomeworkStream:
+    """Потоковый разбор ответа API с выдачей работ по одной.
+
+    Работы из массива `homeworks` выдаются по мере поступления данных, в
+    памяти держится только текущая работа. Остальные поля верхнего
+    уровня (например, `current_date`) доступны в `fields` после
+    окончания перебора. Проверки совпадают с `check_response`.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = decode_chunks(chunks)
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.position = 0
+        self.exhausted = False
+        self.fields = {}
+
+    def fill(self):
+        """Дочитывание следующего куска; False, если данные кончились."""
+        if self.exhausted:
+            return False
+        if self.position > COMPACT_SIZE:
+            self.buffer = self.buffer[self.position:]
+            self.position = 0
+        for chunk in self.chunks:
+            if chunk:
+                self.buffer += chunk
+                return True
+        self.exhausted = True
+        return False
+
+    def peek(self):
+        """Следующий значимый символ без его потребления."""
+        while True:
+            while (self.position < len(self.buffer)
+                   and self.buffer[self.position] in WHITESPACE):
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.fill():
+                raise ValueError(
+                    UNEXPECTED_END_MESSAGE.format(position=self.position)
+                )
+
+    def expect(self, *expected):
+        """Потребление одного из ожидаемых символов."""
+        char = self.peek()
+        if char not in expected:
+            raise ValueError(UNEXPECTED_CHAR_MESSAGE.format(
+                expected='`, `'.join(expected), char=char,
+                position=self.position
+            ))
+        self.position += 1
+        return char
+
+    def value(self):
+        """Разбор одного JSON-значения целиком.
+
+        Число, упирающееся в конец буфера, не принимается, пока не
+        придут следующие данные: иначе оно могло бы быть обрезано.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(
+                    self.buffer, self.position
+                )
+                if (end < len(self.buffer) or self.exhausted
+                        or self.buffer[end - 1] not in DIGITS):
+                    self.position = end
+                    return value
+            except json.JSONDecodeError:
+                if self.exhausted:
+                    raise
+            self.fill()
+
+    def homeworks(self):
+        """Перебор элементов массива `homeworks`."""
+        char = self.peek()
+        if char != '[':
+            raise TypeError(HOMEWORKS_WRONG_TYPE_MESSAGE.format(char=char))
+        self.position += 1
+        if self.peek() == ']':
+            self.position += 1
+            return
+        while True:
+            homework = self.value()
+            if not isinstance(homework, dict):
+                raise TypeError(
+                    HOMEWORK_WRONG_TYPE_MESSAGE.format(homework=homework)
+                )
+            yield homework
+            if self.expect(',', ']') == ']':
+                return
+
+    def __iter__(self):
+        char = self.peek()
+        if char != '{':
+            raise TypeError(RESPONSE_MESSAGE.format(char=char))
+        self.position += 1
+        seen_homeworks = False
+        if self.peek() == '}':
+            self.position += 1
+        else:
+            while True:
+                key = self.value()
+                self.expect(':')
+                if key == 'homeworks':
+                    seen_homeworks = True
+                    yield from self.homeworks()
+                else:
+                    self.fields[key] = self.value()
+                    if key in ('error', 'code'):
+                        raise ApiError(API_ERROR_KEY_MESSAGE.format(
+                            key=key, value=self.fields[key]
+                        ))
+                if self.expect(',', '}') == '}':
+                    break
+        if not seen_homeworks:
+            raise KeyError(HOMEWORKS_MISSING_MESSAGE)
@@ -0,0 +1,337 @@
+from collections import deque
+import hashlib
+import json
+import logging
+import time
+
+from deadline import Budget
+from exceptions import AuthError
+from scheduler import UNSCHEDULED, Scheduler, interval_for
+from state import TenantStates
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TENANT = 'default'
+OUTBOX_SIZE = 100
+
+NO_NEW_STATUS_MESSAGE = ('Статус домашних работ арендатора {tenant} '
+                         'не изменился.')
+SUBSCRIBED_MESSAGE = 'Чат {chat_id} подписан на арендатора {tenant}.'
+UNSUBSCRIBED_MESSAGE = 'Чат {chat_id} отписан от арендатора {tenant}.'
+QUARANTINE_MESSAGE = 'Арендатор {tenant} на карантине до {until}.'
+DUPLICATE_NAME_MESSAGE = ('Имя арендатора {name} уже занято: курсоры и '
+                          'бюджет запросов у арендаторов были бы общими.')
+OUTBOX_FULL_MESSAGE = ('Очередь неотправленных сообщений чата {chat_id} '
+                       'переполнена, отброшено: `{message}`')
+
+
+def tenant_id(token):
+    """Постоянный идентификатор арендатора по токену без самого токена."""
+    return hashlib.sha256(str(token).encode()).hexdigest()[:8]
+
+
+def load_subscriptions(path):
+    """Чтение подписок `(токен, чат, имя арендатора)` из JSON-файла.
+
+    Файл имеет вид `{"токен": ["чат", ...]}` или
+    `{"токен": {"name": "имя", "chats": ["чат", ...]}}`; без имени оно
+    равно None. Имена должны быть уникальными и не совпадать с
+    `DEFAULT_TENANT`.
+    """
+    with open(path, encoding='utf-8') as file:
+        subscriptions = json.load(file)
+    result = []
+    names = {DEFAULT_TENANT}
+    for token, value in subscriptions.items():
+        if isinstance(value, dict):
+            name, chat_ids = value.get('name'), value['chats']
+        else:
+            name, chat_ids = None, value
+        if name is not None:
+            if name in names:
+                raise ValueError(DUPLICATE_NAME_MESSAGE.format(name=name))
+            names.add(name)
+        result.extend((token, str(chat_id), name) for chat_id in chat_ids)
+    return result
+
+
+class Hub:
+    """Опрос API одним запросом на токен с рассылкой по всем подписчикам.
+
+    Арендатор - уникальный токен Практикума, в правилах, истории и
+    метриках он обозначается постоянным именем из `names`: заданным при
+    подписке или `tenant_id(токен)`. Ответ API проверяется и
+    разбирается один раз, а готовое сообщение уходит во все чаты,
+    подписанные на этот токен. Каждый арендатор опрашивается в своём
+    бюджете времени `cycle_budget`. Изменения статусов дублируются в
+    дополнительные каналы `fan_out` и записываются в историю `history`.
+    Правила `router` могут направить уведомление в другие чаты и каналы,
+    а `localize` - отрисовать его на языке каждого чата. Полученные
+    статусы запоминаются для подписчиков в `known` для команд бота.
+
+    С периодами `intervals` (`{статус: секунды}`, ключ None - для прочих
+    статусов) каждый арендатор опрашивается по своему расписанию: за тик
+    из очереди извлекаются только те, чей срок подошёл. Общий бюджет
+    запросов `budget` делит запросы к API между арендаторами по именам и
+    выдерживает его частоту; не получившие запроса опрашиваются в
+    следующем тике. Арендатор на
+    карантине не опрашивается до его окончания. Курсоры и статусы
+    после опроса копируются в разделяемый сегмент `shared`, а начало и
+    конец опроса каждого арендатора отмечаются у сторожа `watchdog`.
+
+    Курсор арендатора сдвигается, как только ответ разобран, а доставка
+    ведётся по каждому чату отдельно: неотправленные сообщения ждут в
+    очереди чата (не больше `OUTBOX_SIZE`) и повторяются в следующих
+    тиках, не задевая остальных подписчиков.
+    """
+
+    def __init__(self, fetch, check, parse, send, error_template,
+                 digest=None, clock=time.time, cycle_budget=None,
+                 fan_out=None, history=None, router=None, localize=None,
+                 known=None, intervals=None, budget=None, shared=None,
+                 watchdog=None, quarantine_period=None):
+        self.fetch = fetch
+        self.check = check
+        self.parse = parse
+        self.send = send
+        self.error_template = error_template
+        self.digest = digest
+        self.clock = clock
+        self.cycle_budget = cycle_budget
+        self.fan_out = fan_out
+        self.history = history
+        self.router = router
+        self.localize = localize
+        self.known = known
+        self.intervals = intervals
+        self.budget = budget
+        self.shared = shared
+        self.watchdog = watchdog
+        self.quarantine_period = quarantine_period
+        self.states = TenantStates()
+        self.scheduler = None
+        if intervals is not None:
+            self.scheduler = Scheduler(self.states.next_due)
+        self.quarantined = {}
+        self.outbox = {}
+        self.tenants = {}
+        self.tokens = []
+        self.names = []
+        self.chats = []
+
+    def subscribe(self, token, chat_id, name=None):
+        """Подписка чата на токен; возвращает номер арендатора.
+
+        Имя нового арендатора не должно совпадать с уже занятым.
+        """
+        if token not in self.tenants:
+            name = name or tenant_id(token)
+            if name in self.names:
+                raise ValueError(DUPLICATE_NAME_MESSAGE.format(name=name))
+            self.tenants[token] = self.states.add(timestamp=int(self.clock()))
+            if self.scheduler is not None:
+                self.scheduler.schedule(self.tenants[token], self.clock())
+            self.tokens.append(token)
+            self.names.append(name)
+            self.chats.append([])
+        tenant = self.tenants[token]
+        if chat_id not in self.chats[tenant]:
+            self.chats[tenant].append(chat_id)
+            logger.debug(SUBSCRIBED_MESSAGE.format(
+                chat_id=chat_id, tenant=self.names[tenant]
+            ))
+        return tenant
+
+    def unsubscribe(self, tenant, chat_id):
+        """Отписка чата от арендатора."""
+        if chat_id in self.chats[tenant]:
+            self.chats[tenant].remove(chat_id)
+            logger.info(UNSUBSCRIBED_MESSAGE.format(
+                chat_id=chat_id, tenant=self.names[tenant]
+            ))
+
+    def quarantine(self, tenant, until):
+        """Исключение арендатора из опроса до времени `until`."""
+        logger.warning(QUARANTINE_MESSAGE.format(
+            tenant=self.names[tenant], until=until
+        ))
+        if self.scheduler is not None:
+            self.scheduler.schedule(tenant, until)
+        else:
+            self.quarantined[tenant] = until
+
+    def deliver(self, chat_id, message):
+        """Отправка сообщения в чат вслед за ранее неотправленными.
+
+        Возвращает True: сообщение принято в очередь чата.
+        """
+        queue = self.outbox.setdefault(chat_id, deque())
+        if len(queue) >= OUTBOX_SIZE:
+            logger.warning(OUTBOX_FULL_MESSAGE.format(
+                chat_id=chat_id, message=queue.popleft()
+            ))
+        queue.append(message)
+        self.flush(chat_id)
+        return True
+
+    def flush(self, chat_id):
+        """Отправка очереди чата по порядку до первой неудачи."""
+        queue = self.outbox[chat_id]
+        while queue and self.send(chat_id, queue[0]):
+            queue.popleft()
+        if not queue:
+            del self.outbox[chat_id]
+
+    def broadcast(self, tenant, message):
+        """Отправка сообщения всем подписчикам арендатора."""
+        for chat_id in self.chats[tenant]:
+            self.deliver(chat_id, message)
+
+    def route(self, tenant, homework):
+        """Получатели по правилам; None - подписчики и все каналы."""
+        if self.router is None:
+            return None
+        return self.router.route(homework, self.names[tenant])
+
+    def notify(self, tenant, homework, message, recipients):
+        """Рассылка изменения статуса с учётом дайджеста."""
+        chats = self.chats[tenant]
+        if recipients is not None and recipients.chats:
+            chats = recipients.chats
+        if self.digest is not None:
+            chats = [
+                chat_id for chat_id in chats
+                if not self.digest.add(chat_id, homework)
+            ]
+        for chat_id in chats:
+            if self.localize is not None:
+                message = self.localize(chat_id, homework)
+            self.deliver(chat_id, message)
+
+    def dispatch(self, tenant, homeworks):
+        """Разбор всех работ и рассылка в чаты.
+
+        Возвращает тройки (работа, сообщение, получатели).
+        """
+        planned = [
+            (homework, self.parse(homework), self.route(tenant, homework))
+            for homework in homeworks
+        ]
+        for homework, message, recipients in planned:
+            self.notify(tenant, homework, message, recipients)
+        return planned
+
+    def duplicate(self, planned):
+        """Отправка разосланных изменений в дополнительные каналы."""
+        if self.fan_out is None:
+            return
+        for _, message, recipients in planned:
+            self.fan_out.notify(message, recipients and recipients.backends)
+
+    def poll(self, tenant):
+        """Один цикл опроса токена арендатора."""
+        if self.watchdog is not None:
+            self.watchdog.begin(self.names[tenant])
+        try:
+            if self.cycle_budget is None:
+                self.poll_tenant(tenant)
+            else:
+                with Budget(self.cycle_budget):
+                    self.poll_tenant(tenant)
+        finally:
+            if self.watchdog is not None:
+                self.watchdog.end(self.names[tenant])
+        if self.shared is not None:
+            self.shared.set_tenant(
+                tenant, self.states.timestamps[tenant],
+                self.states.get_status(tenant)
+            )
+
+    def poll_tenant(self, tenant):
+        """Запрос, разбор и рассылка для одного арендатора."""
+        states = self.states
+        try:
+            response = self.fetch(
+                states.timestamps[tenant], self.tokens[tenant]
+            )
+            self.check(response)
+            homeworks = response['homeworks']
+            if self.history is not None:
+                self.history.record(homeworks, self.names[tenant])
+            if self.known is not None:
+                for chat_id in self.chats[tenant]:
+                    self.known.update(chat_id, homeworks)
+            if not homeworks:
+                logger.debug(
+                    NO_NEW_STATUS_MESSAGE.format(tenant=self.names[tenant])
+                )
+                return
+            planned = self.dispatch(tenant, homeworks)
+            states.timestamps[tenant] = response.get(
+                'current_date', states.timestamps[tenant]
+            )
+            states.set_status(tenant, homeworks[0]['status'])
+            self.duplicate(planned)
+        except Exception as new_error:
+            error_message = self.error_template.format(new_error=new_error)
+            logger.error(error_message)
+            if states.is_new_error(tenant, error_message):
+                self.broadcast(tenant, error_message)
+                states.set_error(tenant, error_message)
+            if self.quarantine_period and isinstance(new_error, AuthError):
+                self.quarantine(tenant, self.clock() + self.quarantine_period)
+
+    def cursors(self):
+        """Курсоры арендаторов по именам."""
+        return {
+            name: self.states.timestamps[tenant]
+            for tenant, name in enumerate(self.names)
+        }
+
+    def restore(self, cursors):
+        """Восстановление курсоров известных арендаторов по именам."""
+        for tenant, name in enumerate(self.names):
+            if name in cursors:
+                self.states.timestamps[tenant] = cursors[name]
+
+    def due_tenants(self):
+        """Арендаторы, которых пора опрашивать в этом тике."""
+        now = self.clock()
+        if self.scheduler is not None:
+            return self.scheduler.pop_due(now)
+        for tenant, until in list(self.quarantined.items()):
+            if until <= now:
+                del self.quarantined[tenant]
+        return [
+            tenant for tenant in range(len(self.tokens))
+            if tenant not in self.quarantined
+        ]
+
+    def poll_all(self):
+        """Опрос арендаторов по расписанию и отправка дайджестов."""
+        for chat_id in list(self.outbox):
+            self.flush(chat_id)
+        tenants = self.due_tenants()
+        if self.budget is not None:
+            granted = self.budget.admit(
+                {self.names[tenant]: 1 for tenant in tenants}
+            )
+            if self.scheduler is not None:
+                for tenant in tenants:
+                    if not granted[self.names[tenant]]:
+                        self.scheduler.schedule(tenant, self.clock())
+            tenants = [
+                tenant for tenant in tenants if granted[self.names[tenant]]
+            ]
+        for tenant in tenants:
+            if self.budget is not None:
+                self.budget.acquire()
+            self.poll(tenant)
+            if (self.scheduler is not None
+                    and self.scheduler.next_due[tenant] == UNSCHEDULED):
+                self.scheduler.schedule(tenant, self.clock() + interval_for(
+                    self.intervals, self.states.get_status(tenant)
+                ))
+        if self.digest is not None:
+            self.digest.flush(self.send)
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+import requests
+
+import utils
+from capture import Capture, load_responses, read_log, replay
+
+RESPONSE = {
+    'homeworks': [
+        {'homework_name': 'hw1', 'status': 'approved',
+         'reviewer_comment': 'Токен sometoken не светим'},
+        {'homework_name': 'hw2', 'status': 'reviewing'},
+    ],
+    'current_date': 100,
+}
+
+
+@pytest.mark.parametrize('name', ('capture.jsonl', 'capture.jsonl.gz'))
+def test_capture_redacts_and_appends(tmp_path, name):
+    path = str(tmp_path / name)
+    for _ in range(2):
+        capture = Capture(path, secrets=('sometoken', None), clock=lambda: 1)
+        capture.record(50, 200, json.dumps(RESPONSE, ensure_ascii=False))
+        capture.close()
+    entries = list(read_log(path))
+    assert len(entries) == 2, 'Журнал должен дописываться, а не затираться.'
+    assert entries[0]['from_date'] == 50
+    assert 'sometoken' not in entries[0]['body'], (
+        'Токены не должны попадать в журнал.'
+    )
+    assert load_responses(path)[0]['homeworks'][1] == RESPONSE['homeworks'][1]
+
+
+def test_replay_counts_homeworks_and_errors(tmp_path, homework_module):
+    path = str(tmp_path / 'capture.jsonl')
+    capture = Capture(path)
+    capture.record(0, 200, json.dumps(RESPONSE))
+    capture.record(0, 200, json.dumps({'homeworks': 'x'}))
+    capture.record(0, 401, json.dumps({'code': 'not_authenticated'}))
+    capture.close()
+    report = replay(
+        path, homework_module.check_response, homework_module.parse_status,
+        repeat=3
+    )
+    assert report['responses'] == 6
+    assert report['homeworks'] == 6
+    assert len(report['errors']) == 3
+
+
+def test_get_api_answer_captures_responses(monkeypatch, tmp_path,
+                                           homework_module):
+    path = str(tmp_path / 'capture.jsonl')
+
+    class TextResponse(utils.MockResponseGET):
+        @property
+        def text(self):
+            return json.dumps(self.data)
+
+        @text.setter
+        def text(self, value):
+            pass
+
+    monkeypatch.setattr(requests, 'get', lambda *args, **kwargs: (
+        TextResponse(*args, data=RESPONSE, **kwargs)
+    ))
+    monkeypatch.setattr(homework_module, 'CAPTURE_FILE', path)
+    homework_module.get_capture.cache_clear()
+    try:
+        homework_module.get_api_answer(10)
+    finally:
+        homework_module.get_capture().close()
+        homework_module.get_capture.cache_clear()
+    [response] = load_responses(path)
+    assert response['homeworks'][1] == RESPONSE['homeworks'][1]
+    assert 'sometoken' not in response['homeworks'][0]['reviewer_comment']
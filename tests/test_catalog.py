@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+from catalog import Catalog, Template, parse_chat_locales
+from digest import Digest
+
+RU = {
+    'ru': {
+        'verdicts': {'approved': 'Ура!', 'rejected': 'Есть замечания.'},
+        'messages': {
+            'status': 'Изменился статус "{name}". {verdict}',
+            'digest_header': 'Изменения ({count}):',
+            'digest_line': '"{name}": {verdict}',
+        },
+    },
+}
+
+
+@pytest.mark.parametrize('text', (
+    'Изменился статус "{name}". {verdict}',
+    '{name}{verdict}',
+    'Без полей {{в скобках}}',
+    '{count:>5} работ',
+))
+def test_template_matches_str_format(text):
+    values = {'name': 'hw1', 'verdict': 'Ура!', 'count': 3}
+    assert Template(text).render(**values) == text.format(**values)
+    assert Template(text, verdict='Ура!').render(**values) == (
+        text.format(**values)
+    )
+
+
+def test_catalog_selects_locale_per_chat():
+    catalog = Catalog.load(None, RU, 'ru', {'2': 'en'})
+    homework = {'homework_name': 'hw1', 'status': 'approved'}
+    assert catalog.for_chat('1', homework) == 'Изменился статус "hw1". Ура!'
+    assert catalog.for_chat('2', homework).startswith(
+        'The review status of "hw1" has changed.'
+    )
+    catalog.for_chat('1', homework)
+    assert catalog.status.cache_info().hits == 1, (
+        'Повторное сообщение должно браться из кеша.'
+    )
+
+
+def test_catalog_loads_locales_from_file(tmp_path):
+    path = tmp_path / 'locales.json'
+    path.write_text(json.dumps({
+        'de': {'verdicts': {'approved': 'Hurra!'}}
+    }))
+    catalog = Catalog.load(str(path), RU, 'ru', {'3': 'de'})
+    assert catalog.for_chat(
+        '3', {'homework_name': 'hw1', 'status': 'approved'}
+    ) == 'Изменился статус "hw1". Hurra!', (
+        'Недостающие шаблоны локали должны браться из локали по умолчанию.'
+    )
+
+
+def test_digest_rendered_in_chat_locale():
+    catalog = Catalog.load(None, RU, 'ru', {'2': 'en'})
+    digest = Digest(RU['ru']['verdicts'], 0, 10, catalog=catalog)
+    digest.add('2', {'homework_name': 'hw1', 'status': 'rejected'})
+    sent = []
+    digest.flush(lambda chat_id, message: sent.append(message) or True)
+    [message] = sent
+    assert message.startswith('Review statuses have changed (1):')
+
+
+def test_parse_chat_locales():
+    assert parse_chat_locales('1:en, 2:ru,') == {'1': 'en', '2': 'ru'}
+
+
+def test_missing_verdicts_fall_back_to_default_locale():
+    catalog = Catalog({
+        **RU, 'de': {'verdicts': {'approved': 'Hurra!'}}
+    }, 'ru', {'3': 'de'})
+    assert catalog.for_chat(
+        '3', {'homework_name': 'hw1', 'status': 'rejected'}
+    ) == 'Изменился статус "hw1". Есть замечания.', (
+        'Недостающие вердикты локали должны браться из локали по умолчанию.'
+    )
+
+
+def test_error_message_in_catalog(homework_module):
+    catalog = homework_module.get_catalog()
+    assert catalog.message(
+        'ru', 'error', new_error='boom'
+    ) == homework_module.ERROR_MESSAGE.format(new_error='boom')
+    assert catalog.message('en', 'error', new_error='boom') == (
+        'Bot failure: boom'
+    )
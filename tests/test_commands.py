@@ -0,0 +1,99 @@
+from types import SimpleNamespace
+
+from commands import (
+    ChatState, CommandPoller, NO_STATUS_MESSAGE, RESUMED_MESSAGE,
+    STATS_DENIED_MESSAGE
+)
+from metrics import metrics
+
+
+VERDICTS = {'approved': 'Принято', 'reviewing': 'На проверке'}
+
+
+class FakeBot:
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.offsets = []
+        self.sent = []
+
+    def get_updates(self, offset=None, timeout=0, **kwargs):
+        self.offsets.append(offset)
+        return self.batches.pop(0) if self.batches else []
+
+    def send_message(self, chat_id, text, **kwargs):
+        self.sent.append((chat_id, text))
+
+
+def update(update_id, text, chat_id=12345):
+    return SimpleNamespace(
+        update_id=update_id,
+        message=SimpleNamespace(chat_id=chat_id, text=text)
+    )
+
+
+def test_status_comes_from_cached_state():
+    state = ChatState()
+    bot = FakeBot([[update(1, '/status')], [update(2, '/status@hw_bot')]])
+    poller = CommandPoller(bot, state, VERDICTS)
+    poller.poll_once()
+    assert bot.sent == [(12345, NO_STATUS_MESSAGE)]
+    state.update('12345', [{'homework_name': 'hw1', 'status': 'reviewing'}])
+    state.update('12345', [{'homework_name': 'hw1', 'status': 'approved'}])
+    poller.poll_once()
+    assert bot.sent[-1] == (12345, '"hw1": Принято'), (
+        'Команда /status должна отвечать последним известным статусом.'
+    )
+    assert bot.offsets == [None, 2], (
+        'Следующий запрос обновлений должен подтверждать обработанные.'
+    )
+
+
+def test_pause_resume_and_unknown_commands():
+    state = ChatState()
+    bot = FakeBot([[
+        update(1, '/pause'), update(2, 'привет'), update(3, '/unknown')
+    ], [update(4, '/resume')]])
+    poller = CommandPoller(bot, state, VERDICTS)
+    poller.poll_once()
+    assert state.is_paused('12345')
+    assert len(bot.sent) == 1, 'Отвечать нужно только на известные команды.'
+    poller.poll_once()
+    assert not state.is_paused('12345')
+
+
+def test_stats_lists_metrics():
+    metrics.inc('poll.cycles')
+    bot = FakeBot([[update(1, '/stats'), update(2, '/stats', chat_id=777)]])
+    CommandPoller(
+        bot, ChatState(), VERDICTS, stats_chats=(12345,)
+    ).poll_once()
+    assert 'poll.cycles: ' in bot.sent[0][1]
+    assert bot.sent[1] == (777, STATS_DENIED_MESSAGE), (
+        'Счётчики других арендаторов не должны уходить в чужие чаты.'
+    )
+
+
+def test_paused_chat_defers_messages(monkeypatch, homework_module):
+    chat_id = homework_module.TELEGRAM_CHAT_ID
+    state = ChatState()
+    state.pause(chat_id)
+    monkeypatch.setattr(homework_module, 'get_chat_state', lambda: state)
+    monkeypatch.setattr(homework_module, 'get_api_answer', lambda ts: {
+        'homeworks': [{'homework_name': 'hw1', 'status': 'approved'}],
+        'current_date': ts + 600,
+    })
+    bot = FakeBot([[update(1, '/resume', chat_id=chat_id)]])
+    extensions = homework_module.Extensions(None, None, None, None)
+    assert homework_module.poll_once(bot, 100, extensions) == 700, (
+        'Приостановка чата не должна задерживать метку времени.'
+    )
+    assert bot.sent == []
+    assert state.get(chat_id) == {'hw1': 'approved'}
+    CommandPoller(bot, state, VERDICTS).poll_once()
+    assert [text for _, text in bot.sent] == [
+        homework_module.parse_status(
+            {'homework_name': 'hw1', 'status': 'approved'}
+        ),
+        RESUMED_MESSAGE,
+    ], 'Отложенные сообщения должны приходить после /resume.'
+    assert not state.is_paused(chat_id)
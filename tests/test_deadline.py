@@ -0,0 +1,59 @@
+import pytest
+import requests
+
+import utils
+from deadline import Budget, current_budget, stage_timeout
+from exceptions import BudgetExceeded
+from metrics import metrics
+
+
+def test_budget_stage_timeouts():
+    clock = utils.FakeClock()
+    with Budget(10, clock=clock):
+        assert stage_timeout('fetch', 0.6) == 6
+        clock.now = 8
+        assert stage_timeout('send', 0.3) == 2, (
+            'Таймаут этапа не должен превышать остаток бюджета.'
+        )
+        clock.now = 11
+        overruns = metrics.get('budget_overrun.send')
+        with pytest.raises(BudgetExceeded):
+            stage_timeout('send', 0.3)
+        assert metrics.get('budget_overrun.send') == overruns + 1
+    assert stage_timeout('fetch', 0.6) is None
+
+
+def test_budget_propagates_to_fetch_and_send(monkeypatch, homework_module):
+    timeouts = []
+
+    def mock_get(*args, timeout=None, **kwargs):
+        timeouts.append(timeout)
+        return utils.MockResponseGET(*args, **kwargs)
+
+    monkeypatch.setattr(requests, 'get', mock_get)
+    clock = utils.FakeClock()
+    bot = utils.MockTelegramBot()
+    with Budget(10, clock=clock):
+        homework_module.get_api_answer(0)
+        assert timeouts == [10 * homework_module.FETCH_SHARE]
+        clock.now = 10
+        assert not homework_module.send_message(bot, 'message'), (
+            'При исчерпанном бюджете отправка должна откладываться.'
+        )
+    assert not hasattr(bot, 'text')
+
+
+def test_hub_cycle_has_no_outer_budget(homework_module):
+    budgets = []
+
+    class FakeHub:
+        def poll_all(self):
+            budgets.append(current_budget.get())
+
+    extensions = homework_module.Extensions(None, None, None, None)
+    assert homework_module.poll_cycle(
+        None, 100, extensions, FakeHub(), None
+    ) == 100
+    assert budgets == [None], (
+        'При общем опросе бюджет получает каждый арендатор, а не весь цикл.'
+    )
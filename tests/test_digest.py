@@ -0,0 +1,70 @@
+from digest import Digest
+from utils import FakeClock
+
+VERDICTS = {
+    'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
+    'reviewing': 'Работа взята на проверку ревьюером.',
+    'rejected': 'Работа проверена: у ревьюера есть замечания.'
+}
+
+
+def flush(digest):
+    sent = []
+    assert digest.flush(
+        lambda chat_id, message: sent.append((chat_id, message)) or True
+    )
+    return sent
+
+
+def test_digest_flushes_after_window():
+    clock = FakeClock()
+    digest = Digest(VERDICTS, 60, 10, ('rejected',), clock=clock)
+    assert digest.add('1', {'homework_name': 'hw1', 'status': 'reviewing'})
+    assert digest.add('1', {'homework_name': 'hw2', 'status': 'approved'})
+    assert flush(digest) == [], (
+        'Дайджест не должен отправляться до окончания окна.'
+    )
+    clock.now = 60
+    [(chat_id, message)] = flush(digest)
+    assert chat_id == '1'
+    assert VERDICTS['reviewing'] in message
+    assert VERDICTS['approved'] in message
+    assert len(digest) == 0
+
+
+def test_digest_coalesces_same_homework():
+    digest = Digest(VERDICTS, 0, 10, clock=FakeClock())
+    digest.add('1', {'homework_name': 'hw1', 'status': 'reviewing'})
+    digest.add('1', {'homework_name': 'hw1', 'status': 'approved'})
+    [(_, message)] = flush(digest)
+    assert VERDICTS['reviewing'] not in message, (
+        'Устаревший статус работы не должен попадать в дайджест.'
+    )
+    assert VERDICTS['approved'] in message
+
+
+def test_digest_size_cap_and_urgent_statuses():
+    digest = Digest(VERDICTS, 600, 2, ('rejected',), clock=FakeClock())
+    assert not digest.add('1', {'homework_name': 'hw', 'status': 'rejected'}), (
+        'Срочный статус должен отправляться в обход буфера.'
+    )
+    digest.add('1', {'homework_name': 'hw1', 'status': 'approved'})
+    digest.add('2', {'homework_name': 'hw2', 'status': 'approved'})
+    assert flush(digest) == []
+    digest.add('1', {'homework_name': 'hw3', 'status': 'approved'})
+    assert [chat_id for chat_id, _ in flush(digest)] == ['1']
+
+
+def test_failed_digest_stays_buffered():
+    clock = FakeClock()
+    digest = Digest(VERDICTS, 60, 10, clock=clock)
+    digest.add('1', {'homework_name': 'hw1', 'status': 'reviewing'})
+    clock.now = 60
+    assert not digest.flush(lambda chat_id, message: False)
+    digest.add('1', {'homework_name': 'hw2', 'status': 'approved'})
+    sent = []
+    assert digest.flush(lambda chat_id, message: sent.append(message) or 1)
+    assert 'hw1' in sent[0] and 'hw2' in sent[0], (
+        'Неотправленный дайджест должен уйти вместе с новыми изменениями.'
+    )
+    assert len(digest) == 0
@@ -0,0 +1,71 @@
+from fairshare import FairShare
+from metrics import metrics
+from subscriptions import Hub
+from utils import FakeClock
+
+
+def test_denied_tenants_are_served_first_next_time():
+    clock = FakeClock()
+    budget = FairShare(rate=1, burst=3, clock=clock)
+    demands = dict.fromkeys(range(5), 1)
+    assert [t for t, n in budget.admit(demands).items() if n] == [0, 1, 2]
+    assert not any(budget.admit(demands).values()), (
+        'Без новых токенов запросы должны отклоняться.'
+    )
+    clock.now = 2
+    assert [t for t, n in budget.admit(demands).items() if n] == [3, 4], (
+        'Отклонённые арендаторы должны обслуживаться первыми.'
+    )
+
+
+def test_noisy_tenant_does_not_starve_others():
+    budget = FairShare(rate=10, clock=FakeClock())
+    granted = budget.admit({'noisy': 100, 'quiet': 1})
+    assert granted == {'noisy': 9, 'quiet': 1}
+
+
+def test_weights_split_tokens():
+    budget = FairShare(rate=9, weights={'a': 2}, clock=FakeClock())
+    assert budget.admit({'a': 30, 'b': 30}) == {'a': 6, 'b': 3}
+
+
+def test_hub_polls_only_admitted_tenants():
+    clock = FakeClock()
+    polled = []
+
+    def fetch(timestamp, token):
+        polled.append(token)
+        return {'homeworks': []}
+
+    budget = FairShare(rate=1, burst=2, clock=clock)
+    hub = Hub(fetch, lambda response: None, lambda homework: 'msg',
+              lambda chat_id, message: True, '{new_error}', budget=budget)
+    for token in ('t0', 't1', 't2'):
+        hub.subscribe(token, token, token)
+    denied = metrics.get('api_budget.t2.denied')
+    hub.poll_all()
+    assert polled == ['t0', 't1']
+    assert metrics.get('api_budget.t2.denied') == denied + 1
+    clock.now = 1
+    hub.poll_all()
+    assert polled[2:] == ['t2'], (
+        'Отклонённый арендатор должен получить запрос первым.'
+    )
+
+
+def test_requests_are_paced_within_cycle():
+    clock = FakeClock()
+
+    def sleep(seconds):
+        clock.now += seconds
+
+    budget = FairShare(rate=0.5, burst=1, horizon=10, clock=clock,
+                       sleep=sleep)
+    assert sum(budget.admit(dict.fromkeys(range(10), 1)).values()) == 6
+    moments = []
+    for _ in range(6):
+        budget.acquire()
+        moments.append(clock.now)
+    assert moments == [0, 2, 4, 6, 8, 10], (
+        'Выданные на цикл запросы должны идти с заданной частотой.'
+    )
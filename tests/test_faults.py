@@ -0,0 +1,71 @@
+import json
+import random
+
+import pytest
+import requests
+from telegram.error import RetryAfter
+
+import faults
+
+
+def test_latency_distributions_are_seeded():
+    spec = {'distribution': 'lognormal', 'mu': 1, 'sigma': 0.5}
+    first = [faults.latency(random.Random(7), spec) for _ in range(3)]
+    second = [faults.latency(random.Random(7), spec) for _ in range(3)]
+    assert first == second, 'Задержки с одним зерном должны совпадать.'
+    assert faults.latency(random.Random(), {'value': 3}) == 3
+    with pytest.raises(ValueError):
+        faults.latency(random.Random(), {'distribution': 'pareto'})
+
+
+def test_inject_wraps_monkeypatched_get(monkeypatch, homework_module):
+    def api(*args, **kwargs):
+        return faults.FaultResponse(200, json.dumps({'homeworks': []}))
+
+    monkeypatch.setattr(requests, 'get', api)
+    slept = []
+    faults.inject(monkeypatch, {'error_rate': 1, 'error_statuses': [503]},
+                  sleep=slept.append)
+    with pytest.raises(homework_module.ApiError):
+        homework_module.get_api_answer(0)
+    monkeypatch.setattr(requests, 'get', api)
+    faults.inject(monkeypatch, {}, sleep=slept.append)
+    assert homework_module.get_api_answer(0) == {'homeworks': []}, (
+        'Профиль без сбоев должен пропускать ответ без изменений.'
+    )
+
+
+def test_latency_over_timeout_raises_timeout():
+    slept = []
+    get = faults.FaultyHttp(
+        None, {'latency': {'value': 30}}, random.Random(), slept.append
+    )
+    with pytest.raises(requests.Timeout):
+        get('url', timeout=5)
+    assert slept == [5], 'Ожидание должно обрываться по таймауту.'
+
+
+def test_bot_throttling():
+    bot = faults.FaultyBot(
+        faults.RecordingBot(), {'retry_after_rate': 1, 'retry_after': 30},
+        random.Random(), lambda seconds: None
+    )
+    with pytest.raises(RetryAfter):
+        bot.send_message('1', 'text')
+    assert bot.bot.sent == []
+
+
+def test_run_profile_reports_recovery():
+    baseline = faults.run_profile({}, cycles=50)
+    assert baseline['success_rate'] == 1, (
+        'Без сбоев каждый цикл должен приносить сообщение.'
+    )
+    assert baseline['recovery_max'] == 0
+    flaky = faults.run_profile(
+        {'http': {'error_rate': 0.3}}, cycles=200, seed=1
+    )
+    assert flaky == faults.run_profile(
+        {'http': {'error_rate': 0.3}}, cycles=200, seed=1
+    ), 'Прогон с одним зерном должен быть воспроизводимым.'
+    assert flaky['success_rate'] < baseline['success_rate']
+    assert flaky['recovery_max'] >= flaky['recovery_mean'] > 0
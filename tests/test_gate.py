@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from benchmarks import gate
+
+
+def result(median, better, noise=0.0):
+    return {'better': better, 'unit': '', 'samples': [median],
+            'median': median, 'noise': noise}
+
+
+def test_compare_directions():
+    base = {'latency': result(1.0, gate.LOWER),
+            'throughput': result(100.0, gate.HIGHER)}
+    current = {'latency': result(1.5, gate.LOWER),
+               'throughput': result(150.0, gate.HIGHER)}
+    verdicts = {row[0]: row[-1] for row in gate.compare(base, current)}
+    assert verdicts == {'latency': True, 'throughput': False}, (
+        'Рост задержки - ухудшение, рост пропускной способности - нет.'
+    )
+
+
+def test_compare_noise():
+    base = {'latency': result(1.0, gate.LOWER, noise=0.1)}
+    current = {'latency': result(1.5, gate.LOWER, noise=0.1)}
+    assert not gate.compare(base, current)[0][-1], (
+        'Изменение в пределах шума не должно считаться ухудшением.'
+    )
+
+
+def test_record_and_check(tmp_path, capsys):
+    path = str(tmp_path / 'base.json')
+    arguments = ['--repeat', '3', '--scenarios', 'state_memory']
+    assert gate.main(['record', '--output', path, '--version', 't']
+                     + arguments) == 0
+    with open(path, encoding='utf-8') as file:
+        document = json.load(file)
+    assert document['schema'] == gate.SCHEMA
+    assert document['version'] == 't'
+    assert gate.main(['check', path] + arguments) == 0, (
+        'Повторный замер не должен считаться ухудшением.'
+    )
+    document['results']['state_memory']['median'] /= 2
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(document, file)
+    assert gate.main(['check', path] + arguments) == 1, (
+        'Рост памяти вдвое должен давать код выхода 1.'
+    )
+    assert 'REGRESSION' in capsys.readouterr().out
+
+
+def test_logged_cycles_reach_log_file(monkeypatch):
+    records = []
+    create_log_handler = gate.homework.create_log_handler
+
+    def counting_handler():
+        handler = create_log_handler()
+        handler.addFilter(lambda record: records.append(record) or True)
+        return handler
+
+    monkeypatch.setattr(gate.homework, 'create_log_handler', counting_handler)
+    gate.logged_cycles(5)
+    assert len(records) == 5, (
+        'Замер времени цикла должен включать запись журнала в файл.'
+    )
+
+
+@pytest.mark.timeout(30)
+def test_unchanged_tree_passes_every_scenario(tmp_path, capsys):
+    path = str(tmp_path / 'base.json')
+    arguments = ['--repeat', '5']
+    assert gate.main(['record', '--output', path] + arguments) == 0
+    assert gate.main(['check', path, '--threshold', '0.5'] + arguments) == 0, (
+        'Повторный замер без изменений не должен давать ухудшений: '
+        + capsys.readouterr().out
+    )
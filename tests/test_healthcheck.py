@@ -0,0 +1,74 @@
+import json
+import urllib.error
+import urllib.request
+
+from healthcheck import Watchdog
+from utils import FakeClock
+
+
+def get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        return error.code, json.loads(error.read())
+
+
+def test_watchdog_detects_stuck_cycle(tmp_path):
+    clock = FakeClock()
+    dump_path = tmp_path / 'stacks.txt'
+    watchdog = Watchdog(10, dump_path=str(dump_path), clock=clock)
+    assert not watchdog.is_ready(), (
+        'До завершения первого цикла бот не должен считаться готовым.'
+    )
+    watchdog.begin('tenant')
+    clock.now = 5
+    watchdog.end('tenant')
+    assert watchdog.is_alive() and watchdog.is_ready()
+    watchdog.begin('tenant')
+    clock.now = 20
+    assert watchdog.stuck_tenants() == ['tenant']
+    watchdog.check()
+    assert 'MainThread' in dump_path.read_text(encoding='utf-8'), (
+        'При зависании цикла должны записываться стеки всех потоков.'
+    )
+
+
+def test_watchdog_http_endpoints():
+    clock = FakeClock()
+    watchdog = Watchdog(10, clock=clock)
+    watchdog.start(0)
+    url = f'http://127.0.0.1:{watchdog.server.server_port}'
+    try:
+        assert get(url + '/health')[0] == 200
+        assert get(url + '/ready')[0] == 503
+        watchdog.begin()
+        watchdog.end()
+        status, state = get(url + '/ready')
+        assert status == 200
+        assert state['last_cycle_age'] == {'default': 0}
+        watchdog.begin()
+        clock.now = 11
+        assert get(url + '/health')[0] == 503
+    finally:
+        watchdog.server.shutdown()
+
+
+def test_watchdog_checks_without_port(monkeypatch, homework_module):
+    started = []
+    monkeypatch.setattr(homework_module, 'WATCHDOG_RESTART', True)
+    monkeypatch.setattr(Watchdog, 'watch', lambda self: started.append(1))
+    watchdog = homework_module.create_watchdog()
+    assert started == [1] and watchdog.server is None, (
+        'Перезапуск при зависании должен работать и без HTTP-порта.'
+    )
+
+
+def test_cursors_survive_restart(monkeypatch, homework_module):
+    monkeypatch.setattr(homework_module, 'WATCHDOG_RESTART', True)
+    monkeypatch.delenv(homework_module.RESTART_CURSORS, raising=False)
+    homework_module.save_cursors(500, None)
+    assert homework_module.load_cursors() == {'default': 500}, (
+        'Курсор должен переживать перезапуск процесса сторожем.'
+    )
+    assert homework_module.load_cursors() == {}
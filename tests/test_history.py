@@ -0,0 +1,52 @@
+import pytest
+
+from history import History
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = History(str(tmp_path / 'history.db'), clock=lambda: 10_000)
+    yield history
+    history.close()
+
+
+def homework(name, status, date_updated):
+    return {
+        'homework_name': name,
+        'lesson_name': 'Итоговый проект',
+        'status': status,
+        'date_updated': date_updated,
+    }
+
+
+def test_history_records_and_queries(history):
+    assert history.record([
+        homework('hw1', 'reviewing', '2020-02-13T10:00:00Z'),
+        homework('hw2', 'reviewing', '2020-02-13T11:00:00Z'),
+    ]) == 2
+    history.record([homework('hw1', 'approved', '2020-02-13T12:00:00Z')])
+    history.record([homework('hw1', 'approved', '2020-02-13T12:00:00Z')])
+    assert [row[3] for row in history.homework('hw1')] == [
+        'reviewing', 'approved'
+    ], 'Повторно полученный переход не должен дублироваться.'
+    start = 1581588000
+    assert [row[1] for row in history.between(start, start + 3600)] == [
+        'hw1', 'hw2'
+    ]
+
+
+def test_history_review_latency_percentiles(history):
+    history.record([
+        homework(f'hw{index}', 'reviewing', '2020-02-13T10:00:00Z')
+        for index in range(1, 5)
+    ])
+    history.record([
+        homework(f'hw{index}', 'approved', f'2020-02-13T1{index}:00:00Z')
+        for index in range(1, 5)
+    ])
+    assert history.review_latencies(0, 2 ** 40) == [
+        3600, 7200, 10800, 14400
+    ]
+    assert history.latency_percentiles(0, 2 ** 40, (0.5, 1)) == {
+        0.5: 7200, 1: 14400
+    }
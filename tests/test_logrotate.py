@@ -0,0 +1,51 @@
+import gzip
+import logging
+import os
+
+from logrotate import CompressingRotatingFileHandler, LogArchiver
+
+
+def test_rollover_compresses_in_background(tmp_path):
+    path = str(tmp_path / 'bot.log')
+    handler = CompressingRotatingFileHandler(path, maxBytes=200, backupCount=2)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    for index in range(100):
+        handler.emit(logging.makeLogRecord({'msg': f'line {index:03}'}))
+    handler.archiver.wait()
+    usage = handler.archiver.disk_usage()
+    handler.close()
+    archives = sorted(name for name in os.listdir(tmp_path)
+                      if name != 'bot.log')
+    assert len(archives) == 2 and all(
+        name.endswith('.gz') for name in archives
+    ), 'Должны остаться только два последних сжатых архива.'
+    assert usage['files'] == 2
+    with gzip.open(tmp_path / archives[-1], 'rt') as file:
+        assert file.read().startswith('line ')
+
+
+def test_archiver_expires_old_and_oversized(tmp_path):
+    now = 1_000_000
+    for index, age in enumerate((10, 100, 1000)):
+        path = tmp_path / f'bot.log.{index}.gz'
+        path.write_bytes(b'x' * 100)
+        os.utime(path, (now - age, now - age))
+    archiver = LogArchiver(str(tmp_path / 'bot.log'), max_age=500,
+                           max_bytes=150, clock=lambda: now)
+    archiver.expire()
+    archiver.close()
+    assert os.listdir(tmp_path) == ['bot.log.0.gz'], (
+        'Архивы старше срока и сверх объёма должны удаляться.'
+    )
+
+
+def test_leftover_rotated_files_are_compressed(tmp_path):
+    (tmp_path / 'bot.log.20240101-000000-000000').write_text('old')
+    handler = CompressingRotatingFileHandler(
+        str(tmp_path / 'bot.log'), maxBytes=1000
+    )
+    handler.archiver.wait()
+    handler.close()
+    assert sorted(os.listdir(tmp_path)) == [
+        'bot.log', 'bot.log.20240101-000000-000000.gz'
+    ]
@@ -0,0 +1,80 @@
+import time
+from http import HTTPStatus
+
+import utils
+from metrics import metrics
+from notifiers import (FanOut, SmtpNotifier, TelegramNotifier,
+                       WebhookNotifier)
+
+
+def test_smtp_notifier():
+    with utils.LocalSMTPServer() as server:
+        notifier = SmtpNotifier(
+            '127.0.0.1', server.port, 'bot@example.com', ['me@example.com'],
+            timeout=2
+        )
+        assert notifier.submit('Работа проверена').result(timeout=2)
+    assert 'Работа проверена' in server.messages[0]
+
+
+def test_webhook_notifier_retries():
+    with utils.LocalWebhookServer(
+        http_status=HTTPStatus.INTERNAL_SERVER_ERROR
+    ) as server:
+        failed = metrics.get('notifier.webhook.failed')
+        notifier = WebhookNotifier(
+            f'http://127.0.0.1:{server.port}', retries=2, backoff=0
+        )
+        assert not notifier.submit('message').result(timeout=2)
+    assert server.requests == [{'text': 'message'}] * 3, (
+        'Канал должен повторять доставку заданное число раз.'
+    )
+    assert metrics.get('notifier.webhook.failed') == failed + 1
+
+
+def test_slow_backend_does_not_delay_others():
+    bot = utils.MockTelegramBot()
+    with utils.LocalWebhookServer(delay=0.5) as server:
+        slow = WebhookNotifier(f'http://127.0.0.1:{server.port}')
+        fast = TelegramNotifier(bot, '12345')
+        started = time.monotonic()
+        slow_future, fast_future = FanOut([slow, fast]).notify('message')
+        assert time.monotonic() - started < 0.1, (
+            'Постановка в каналы не должна ждать доставки.'
+        )
+        assert fast_future.result(timeout=1)
+        assert not slow_future.done(), (
+            'Медленный канал не должен задерживать остальные.'
+        )
+        assert slow_future.result(timeout=2)
+    assert bot.text == 'message'
+
+
+def test_fan_out_waits_for_telegram(monkeypatch, homework_module):
+    class FakeFanOut:
+        messages = []
+
+        def notify(self, message, backends=None):
+            self.messages.append(message)
+
+    class FlakyBot:
+        failures = 1
+
+        def send_message(self, chat_id, text, **kwargs):
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError('Telegram недоступен')
+
+    monkeypatch.setattr(homework_module, 'get_api_answer', lambda ts: {
+        'homeworks': [{'homework_name': 'hw1', 'status': 'approved'}],
+        'current_date': ts + 600,
+    })
+    fan_out = FakeFanOut()
+    extensions = homework_module.Extensions(None, fan_out, None, None)
+    bot = FlakyBot()
+    assert homework_module.poll_once(bot, 100, extensions) == 100
+    assert fan_out.messages == [], (
+        'Пока Telegram не принял сообщение, каналы не должны его получать.'
+    )
+    assert homework_module.poll_once(bot, 100, extensions) == 700
+    assert len(fan_out.messages) == 1
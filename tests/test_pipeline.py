@@ -0,0 +1,113 @@
+import pytest
+
+from metrics import metrics
+from pipeline import COALESCE, DROP_OLDEST, PAUSE, DeliveryQueue, Pipeline
+
+
+def hw(name, status='approved'):
+    return {'homework_name': name, 'status': status}
+
+
+def test_new_status_supersedes_pending_one():
+    deliveries = DeliveryQueue(10)
+    deliveries.put('1', hw('hw1', 'reviewing'))
+    deliveries.put('2', hw('hw1', 'reviewing'))
+    deliveries.put('1', hw('hw1', 'approved'))
+    assert len(deliveries) == 2
+    chat_id, homeworks = deliveries.get()
+    assert (chat_id, homeworks['hw1']['status']) == ('1', 'approved')
+
+
+def test_full_queue_policies():
+    coalescing = DeliveryQueue(2, COALESCE)
+    for name in ('hw1', 'hw2', 'hw3'):
+        coalescing.put('1', hw(name))
+    assert len(coalescing) == 1
+    assert list(coalescing.get()[1]) == ['hw1', 'hw2', 'hw3'], (
+        'Работы чата должны объединяться в одно сообщение.'
+    )
+    shedding = DeliveryQueue(1, DROP_OLDEST)
+    shed = metrics.get('pipeline.shed')
+    shedding.put('1', hw('hw1'))
+    shedding.put('2', hw('hw2'))
+    assert shedding.get() == ('2', {'hw2': hw('hw2')})
+    assert metrics.get('pipeline.shed') == shed + 1
+    pausing = DeliveryQueue(1, PAUSE)
+    pausing.put('1', hw('hw1'))
+    assert not pausing.put('2', hw('hw2'), timeout=0.01)
+    with pytest.raises(ValueError):
+        DeliveryQueue(1, 'drop_everything')
+
+
+def test_pipeline_stages_and_backpressure():
+    sent = []
+    results = [False]
+    pipeline = Pipeline(
+        lambda homework: ('1',),
+        lambda chat_id, homeworks: ','.join(homeworks),
+        lambda chat_id, message: sent.append(message) or (
+            results.pop() if results else True
+        ),
+        capacity=1, retry_delay=0
+    )
+    pipeline.submit([hw('hw1')])
+    assert not pipeline.accepting(), (
+        'Заполненная очередь разбора должна приостанавливать опрос.'
+    )
+    pipeline.parse_once(timeout=0)
+    assert pipeline.report() == {'parse': (0, 1), 'deliver': (1, 1)}
+    assert not pipeline.accepting()
+    pipeline.deliver_once(timeout=0)
+    assert len(pipeline.deliveries) == 1, (
+        'Неотправленная запись должна вернуться в очередь.'
+    )
+    pipeline.deliver_once(timeout=0)
+    assert sent == ['hw1', 'hw1']
+    assert pipeline.accepting()
+
+
+def test_poll_once_skips_fetch_when_pipeline_full(monkeypatch,
+                                                 homework_module):
+    class Full:
+        def accepting(self):
+            return False
+
+    def fail(timestamp):
+        raise AssertionError('Опрос API должен быть пропущен.')
+
+    monkeypatch.setattr(homework_module, 'get_api_answer', fail)
+    extensions = homework_module.Extensions(None, None, None, None, Full())
+    assert homework_module.poll_once(None, 100, extensions) == 100
+
+
+def test_failing_chat_backs_off_without_blocking_others():
+    now = [0]
+    sent = []
+    pipeline = Pipeline(
+        lambda homework: (homework['homework_name'][-1],),
+        lambda chat_id, homeworks: ','.join(homeworks),
+        lambda chat_id, message: sent.append(message) or chat_id != '1',
+        capacity=1, retry_delay=10, clock=lambda: now[0]
+    )
+    pipeline.submit([hw('hw1')])
+    pipeline.parse_once(timeout=0)
+    assert not pipeline.accepting()
+    pipeline.deliver_once(timeout=0)
+    assert pipeline.accepting(), (
+        'Отложенный чат не должен занимать место в очереди.'
+    )
+    pipeline.submit([hw('hw2')])
+    pipeline.parse_once(timeout=0)
+    pipeline.deliver_once(timeout=0)
+    assert sent == ['hw1', 'hw2'], (
+        'Неудачная отправка не должна задерживать другие чаты.'
+    )
+    now[0] = 10
+    pipeline.deliver_once(timeout=0)
+    now[0] = 25
+    pipeline.deliver_once(timeout=0)
+    now[0] = 30
+    pipeline.deliver_once(timeout=0)
+    assert sent == ['hw1', 'hw2', 'hw1', 'hw1'], (
+        'Пауза перед повтором должна расти с каждой неудачей.'
+    )
@@ -0,0 +1,119 @@
+import threading
+import time
+
+from telegram.error import BadRequest
+
+from exceptions import AuthError
+from preflight import Preflight, secret_key
+from subscriptions import Hub
+from utils import FakeClock
+
+
+def fail():
+    raise ValueError('Unauthorized')
+
+
+def test_checks_run_concurrently():
+    barrier = threading.Barrier(4, timeout=1)
+    checks = [(f'chat:{index}', barrier.wait) for index in range(4)]
+    assert Preflight(workers=4).run(checks) == {}, (
+        'Проверки должны выполняться одновременно в пуле потоков.'
+    )
+
+
+def test_successes_are_cached_until_ttl(tmp_path):
+    clock = FakeClock(1000)
+    path = str(tmp_path / 'preflight.json')
+    calls = []
+    checks = [
+        ('chat:1', lambda: calls.append('chat')),
+        (secret_key('practicum', 'token'), fail),
+    ]
+    failed = Preflight(path, ttl=60, clock=clock).run(checks)
+    assert list(failed) == [secret_key('practicum', 'token')]
+    assert 'token' not in (tmp_path / 'preflight.json').read_text(), (
+        'Секреты не должны попадать в кеш.'
+    )
+    Preflight(path, ttl=60, clock=clock).run(checks)
+    assert calls == ['chat'], 'Свежий результат должен браться из кеша.'
+    clock.now += 61
+    Preflight(path, ttl=60, clock=clock).run(checks)
+    assert calls == ['chat', 'chat']
+
+
+def test_hub_skips_quarantined_tenant():
+    clock = FakeClock(1000)
+    polled = []
+    hub = Hub(lambda timestamp, token: polled.append(token) or {
+        'homeworks': []
+    }, lambda response: None, lambda homework: 'msg',
+        lambda chat_id, message: True, '{new_error}', clock=clock)
+    hub.subscribe('bad', '1')
+    hub.subscribe('good', '2')
+    hub.quarantine(0, clock() + 3600)
+    hub.poll_all()
+    assert polled == ['good']
+    clock.now += 3600
+    hub.poll_all()
+    assert polled[1:] == ['bad', 'good'], (
+        'После карантина арендатор должен опрашиваться снова.'
+    )
+
+
+def test_run_preflight_quarantines_broken_tenant(monkeypatch,
+                                                 homework_module):
+    class Bot:
+        def get_me(self):
+            return True
+
+        def get_chat(self, chat_id):
+            if chat_id == 'gone':
+                raise BadRequest('Chat not found')
+
+    def validate(token):
+        if token == 'bad':
+            raise AuthError('401')
+        if token == 'offline':
+            raise ConnectionError('timeout')
+
+    monkeypatch.setattr(homework_module, 'PREFLIGHT', True)
+    monkeypatch.setattr(homework_module, 'PREFLIGHT_CACHE', None)
+    monkeypatch.setattr(homework_module, 'validate_token', validate)
+    hub = Hub(None, None, None, None, '{new_error}')
+    hub.subscribe('bad', '1')
+    hub.subscribe('good', '2')
+    hub.subscribe('good', 'gone')
+    assert homework_module.run_preflight(Bot(), hub)
+    assert hub.quarantined[0] > time.time()
+    assert hub.chats[1] == ['2']
+    monkeypatch.setattr(homework_module, 'PRACTICUM_TOKEN', 'bad')
+    assert not homework_module.run_preflight(Bot(), None), (
+        'Без общего опроса ошибка проверки должна останавливать бота.'
+    )
+    monkeypatch.setattr(homework_module, 'PRACTICUM_TOKEN', 'offline')
+    assert homework_module.run_preflight(Bot(), None), (
+        'Сетевой сбой при проверке не должен останавливать бота.'
+    )
+
+
+def test_hub_quarantines_rejected_token():
+    clock = FakeClock(1000)
+    polled = []
+
+    def fetch(timestamp, token):
+        polled.append(token)
+        if token == 'revoked':
+            raise AuthError('401')
+        return {'homeworks': []}
+
+    hub = Hub(fetch, lambda response: None, lambda homework: 'msg',
+              lambda chat_id, message: True, '{new_error}', clock=clock,
+              intervals={None: 60}, quarantine_period=3600)
+    hub.subscribe('revoked', '1')
+    hub.subscribe('good', '2')
+    hub.poll_all()
+    clock.now += 60
+    hub.poll_all()
+    assert polled == ['revoked', 'good', 'good'], (
+        'Отклонённый во время работы токен должен уходить на карантин.'
+    )
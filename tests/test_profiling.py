@@ -0,0 +1,54 @@
+import os
+import pstats
+import signal
+import tracemalloc
+
+from profiling import Profiler
+
+
+def busy():
+    return sum(index * index for index in range(1000))
+
+
+def test_profiler_records_requested_cycles(tmp_path):
+    profiler = Profiler(str(tmp_path / 'homework.py'), 2, clock=lambda: 1)
+    profiler.begin()
+    profiler.end()
+    assert not list(tmp_path.iterdir()), (
+        'Без сигнала профилирование не должно включаться.'
+    )
+    profiler.on_toggle()
+    for _ in range(2):
+        profiler.begin()
+        busy()
+        profiler.end()
+    path = tmp_path / 'homework.py.1.prof'
+    assert path.exists()
+    functions = [name for _, _, name in pstats.Stats(str(path)).stats]
+    assert 'busy' in functions
+
+
+def test_profiler_signals(tmp_path):
+    profiler = Profiler(str(tmp_path / 'homework.py'), 5, clock=lambda: 2)
+    old_handlers = [signal.getsignal(signum)
+                    for signum in (signal.SIGUSR1, signal.SIGUSR2)]
+    profiler.install()
+    try:
+        os.kill(os.getpid(), signal.SIGUSR1)
+        profiler.begin()
+        busy()
+        profiler.end()
+        os.kill(os.getpid(), signal.SIGUSR1)
+        assert (tmp_path / 'homework.py.2.prof').exists(), (
+            'Повторный SIGUSR1 должен досрочно записывать профиль.'
+        )
+        os.kill(os.getpid(), signal.SIGUSR2)
+        leak = [bytearray(1000) for _ in range(100)]
+        os.kill(os.getpid(), signal.SIGUSR2)
+        report = (tmp_path / 'homework.py.2.memory.txt').read_text()
+        assert report.startswith('current=')
+        assert leak
+    finally:
+        tracemalloc.stop()
+        signal.signal(signal.SIGUSR1, old_handlers[0])
+        signal.signal(signal.SIGUSR2, old_handlers[1])
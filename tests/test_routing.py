@@ -0,0 +1,81 @@
+import json
+import os
+
+import pytest
+
+from routing import Route, Router, RuleSet
+
+RULES = [
+    {'status': 'rejected', 'chats': ['mentor']},
+    {'homework_name': 'hw1', 'chats': ['student'], 'backends': ['smtp']},
+    {'homework_pattern': r'sprint_\d+', 'lesson_name': 'Финал',
+     'chats': ['cohort']},
+    {'tenant': '1', 'homework_pattern': '.*', 'backends': ['webhook']},
+]
+
+
+def test_rule_set_routes_by_exact_keys_and_patterns():
+    rules = RuleSet(RULES)
+    assert rules.route(
+        {'homework_name': 'hw1', 'status': 'rejected'}
+    ) == Route(('mentor', 'student'), ('smtp',))
+    assert rules.route(
+        {'homework_name': 'sprint_12', 'status': 'approved',
+         'lesson_name': 'Финал'}
+    ) == Route(('cohort',), ())
+    assert rules.route(
+        {'homework_name': 'sprint_12x', 'status': 'approved',
+         'lesson_name': 'Финал'}
+    ) is None, 'Шаблон названия должен совпадать с названием целиком.'
+    assert rules.route(
+        {'homework_name': 'hw2', 'status': 'approved'}, tenant='1'
+    ) == Route((), ('webhook',))
+
+
+def test_rule_set_with_groups_in_patterns():
+    rules = RuleSet([
+        {'homework_pattern': r'(?P<sprint>sprint)_\d+', 'chats': ['named']},
+        {'homework_pattern': r'(a)\1', 'chats': ['backref']},
+        {'homework_pattern': r'_rule0|r3', 'chats': ['plain']},
+    ])
+    assert rules.route({'homework_name': 'sprint_1'}).chats == ('named',)
+    assert rules.route({'homework_name': 'aa'}).chats == ('backref',)
+    assert rules.route({'homework_name': 'r3'}).chats == ('plain',)
+    assert rules.route({'homework_name': 'hw1'}) is None, (
+        'Группы в шаблонах не должны ломать поиск правил.'
+    )
+
+
+def test_rule_set_rejects_unknown_fields():
+    with pytest.raises(ValueError):
+        RuleSet([{'homework': 'hw1', 'chats': ['1']}])
+
+
+def test_rule_set_with_many_rules():
+    rules = RuleSet(
+        [{'homework_name': f'hw{index}', 'chats': [str(index)]}
+         for index in range(5000)]
+        + [{'homework_pattern': f'project{index}_.*', 'chats': ['p']}
+           for index in range(1000)]
+    )
+    assert rules.route({'homework_name': 'hw4321'}).chats == ('4321',)
+    assert rules.route({'homework_name': 'project999_final'}).chats == ('p',)
+
+
+def test_router_reloads_changed_file(tmp_path):
+    path = tmp_path / 'rules.json'
+    path.write_text(json.dumps(RULES[:1]))
+    router = Router(str(path))
+    homework = {'homework_name': 'hw1', 'status': 'rejected'}
+    assert router.route(homework).chats == ('mentor',)
+    assert not router.reload()
+    path.write_text(json.dumps(RULES[1:2]))
+    os.utime(path, ns=(1, 1))
+    assert router.reload()
+    assert router.route(homework).chats == ('student',)
+    path.write_text('[{"broken": ')
+    os.utime(path, ns=(2, 2))
+    assert not router.reload()
+    assert router.route(homework).chats == ('student',), (
+        'При ошибке в правилах должны действовать прежние правила.'
+    )
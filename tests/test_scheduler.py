@@ -0,0 +1,81 @@
+from array import array
+
+from scheduler import IDLE, Scheduler
+from subscriptions import Hub
+from utils import FakeClock
+
+
+def test_scheduler_orders_and_skips_stale_entries():
+    scheduler = Scheduler(array('d', [0.0] * 3))
+    scheduler.schedule(0, 30)
+    scheduler.schedule(1, 10)
+    scheduler.schedule(2, 20)
+    scheduler.schedule(1, 40)
+    assert scheduler.next_time() == 20, (
+        'Перепланированная запись не должна оставаться в очереди.'
+    )
+    assert scheduler.pop_due(30) == [2, 0]
+    assert scheduler.pop_due(35) == []
+    assert scheduler.pop_due(40) == [1]
+    assert scheduler.next_time() is None
+
+
+def test_idle_tick_over_many_tenants_is_cheap():
+    class CountingColumn(list):
+        reads = 0
+
+        def __getitem__(self, index):
+            CountingColumn.reads += 1
+            return super().__getitem__(index)
+
+    count = 100_000
+    scheduler = Scheduler(CountingColumn([0.0] * count))
+    for tenant in range(count):
+        scheduler.schedule(tenant, 1000 + tenant)
+    for now in range(1000):
+        scheduler.pop_due(now)
+    assert CountingColumn.reads <= 1000, (
+        'Тик без созревших арендаторов не должен перебирать очередь.'
+    )
+    assert len(scheduler.pop_due(1000 + 9)) == 10
+
+
+def test_hub_polls_reviewing_tenants_sooner():
+    clock = FakeClock()
+    statuses = {'reviewing-token': 'reviewing', 'idle-token': 'approved'}
+    polled = []
+
+    def fetch(timestamp, token):
+        polled.append(token)
+        return {'homeworks': [
+            {'homework_name': 'hw', 'status': statuses[token]}
+        ], 'current_date': clock()}
+
+    hub = Hub(fetch, lambda response: None, lambda homework: 'msg',
+              lambda chat_id, message: True, '{new_error}', clock=clock,
+              intervals={'reviewing': 600, IDLE: 1800})
+    hub.subscribe('reviewing-token', '1')
+    hub.subscribe('idle-token', '2')
+    for _ in range(6):
+        hub.poll_all()
+        clock.now += 600
+    assert polled.count('reviewing-token') == 6
+    assert polled.count('idle-token') == 2, (
+        'Арендатор без работ на проверке должен опрашиваться реже.'
+    )
+
+
+def test_main_sleeps_until_next_due_tenant(homework_module):
+    clock = FakeClock()
+    hub = Hub(lambda timestamp, token: {'homeworks': [
+        {'homework_name': 'hw', 'status': 'reviewing'}
+    ]}, lambda response: None, lambda homework: 'msg',
+        lambda chat_id, message: True, '{new_error}', clock=clock,
+        intervals={'reviewing': 60, IDLE: 1800})
+    hub.subscribe('token', '1')
+    hub.poll_all()
+    clock.now = 15
+    assert homework_module.sleep_period(hub) == 45, (
+        'Бот должен просыпаться к сроку опроса ближайшего арендатора.'
+    )
+    assert homework_module.sleep_period(None) == homework_module.RETRY_PERIOD
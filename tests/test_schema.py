@@ -0,0 +1,80 @@
+import pytest
+
+from exceptions import SchemaError
+from schema import ResponseValidator, compile_schema
+
+STATUSES = ('approved', 'reviewing', 'rejected')
+
+
+def test_errors_are_aggregated_with_paths():
+    validator = ResponseValidator(STATUSES)
+    with pytest.raises(SchemaError) as error:
+        validator.validate({'homeworks': [
+            {'homework_name': 'hw1', 'status': 'approved'},
+            {'status': 'unknown'},
+            'hw3',
+        ]})
+    assert [str(violation) for violation in error.value.errors] == [
+        'homeworks[1].homework_name: отсутствует обязательный ключ',
+        "homeworks[1].status: недопустимое значение 'unknown'",
+        'homeworks[2]: ожидался тип dict, получен str',
+    ], 'Все нарушения должны собираться за один проход.'
+
+
+def test_lenient_mode_keeps_valid_items():
+    validator = ResponseValidator(STATUSES, strict=False)
+    good = {'homework_name': 'hw1', 'status': 'approved', 'lesson_name': None}
+    valid, errors = validator.validate(
+        {'homeworks': [good, {'homework_name': 'hw2'}], 'current_date': 1}
+    )
+    assert valid == [good]
+    assert len(errors) == 1
+    with pytest.raises(TypeError):
+        validator.validate({'homeworks': {}})
+
+
+def test_compiled_schema_rejects_bool_for_int():
+    check = compile_schema({'type': int})
+    errors = []
+    check(True, ('current_date',), errors)
+    assert errors, 'Логическое значение не должно считаться числом.'
+
+
+def test_check_response_drops_invalid_items(monkeypatch, homework_module):
+    monkeypatch.setattr(
+        homework_module, 'get_validator',
+        lambda: ResponseValidator(STATUSES, strict=False)
+    )
+    response = {'homeworks': [
+        {'homework_name': 'hw1', 'status': 'bogus'},
+        {'homework_name': 'hw2', 'status': 'approved'},
+    ]}
+    homework_module.check_response(response)
+    assert [hw['homework_name'] for hw in response['homeworks']] == ['hw2']
+
+
+def test_lenient_by_default(homework_module):
+    response = {'homeworks': [
+        {'homework_name': 'hw1', 'status': 'approved'},
+        {'homework_name': 'hw2', 'status': 'bogus'},
+    ]}
+    homework_module.check_response(response)
+    assert len(response['homeworks']) == 1, (
+        'По умолчанию некорректная работа не должна прерывать цикл.'
+    )
+
+
+def test_poll_path_renders_without_revalidation(monkeypatch, homework_module):
+    calls = []
+    validator = ResponseValidator(STATUSES)
+    monkeypatch.setattr(homework_module, 'get_validator', lambda: validator)
+    monkeypatch.setattr(
+        validator, 'validate_homework', lambda homework: calls.append(homework)
+    )
+    homework = {'homework_name': 'hw1', 'status': 'approved'}
+    assert homework_module.render_status(homework) == (
+        homework_module.parse_status(homework)
+    )
+    assert calls == [homework], (
+        'Проверенная работа не должна проверяться повторно при отправке.'
+    )
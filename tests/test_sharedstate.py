@@ -0,0 +1,84 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from sharedstate import Segment, SegmentWriter
+
+STATUSES = ('approved', 'reviewing', 'rejected')
+COUNTERS = ('poll.cycles', 'telegram.sent')
+
+
+def test_workers_write_and_reader_snapshots(tmp_path):
+    path = str(tmp_path / 'state.bin')
+    first = SegmentWriter(Segment.create(path, 2, 4, STATUSES, COUNTERS), 0)
+    second = SegmentWriter(Segment.create(path, 2, 4, STATUSES, COUNTERS), 1)
+    first.set_tenant(0, 100, 'reviewing')
+    second.set_status(3, 'approved')
+    second.set_tenant(3, 200)
+    first.publish({'poll.cycles': 5, 'unknown': 1})
+    second.publish({'poll.cycles': 7, 'telegram.sent': 2})
+    first.set_tenant(10, 1)
+    reader = Segment(path, writable=False)
+    snapshot = reader.snapshot()
+    assert {key: (tenant['cursor'], tenant['status'])
+            for key, tenant in snapshot['tenants'].items()} == {
+        '0/0': (100, 'reviewing'), '1/3': (200, 'approved')
+    }
+    assert snapshot['counters'] == {'poll.cycles': 12, 'telegram.sent': 2}, (
+        'Счётчики обработчиков должны суммироваться.'
+    )
+    reader.close()
+
+
+def test_segment_is_shared_between_processes(tmp_path):
+    path = str(tmp_path / 'state.bin')
+    segment = Segment.create(path, 1, 2, STATUSES, COUNTERS)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, '-c', (
+        'import sys; sys.path.insert(0, sys.argv[1]);'
+        'from sharedstate import Segment;'
+        'Segment(sys.argv[2]).set_tenant(0, 1, 42, "rejected")'
+    ), root, path], check=True)
+    assert segment.tenant(0, 1)[:2] == (42, 'rejected'), (
+        'Запись другого процесса должна быть видна без копирования.'
+    )
+
+
+def test_rejects_foreign_file(tmp_path):
+    path = tmp_path / 'state.bin'
+    path.write_bytes(b'\0' * 64)
+    with pytest.raises(ValueError):
+        Segment(str(path))
+
+
+def test_publish_state(monkeypatch, tmp_path, homework_module):
+    path = str(tmp_path / 'state.bin')
+    writer = SegmentWriter(
+        Segment.create(path, 1, 1, STATUSES, COUNTERS), 0
+    )
+    monkeypatch.setattr(homework_module, 'get_shared', lambda: writer)
+    homework_module.remember(
+        '1', [{'homework_name': 'hw', 'status': 'approved'}]
+    )
+    homework_module.publish_state(500)
+    assert writer.segment.tenant(0, 0)[:2] == (500, 'approved')
+
+
+def test_worker_outside_segment(monkeypatch, tmp_path, homework_module):
+    path = str(tmp_path / 'state.bin')
+    segment = Segment.create(path, 2, 1, STATUSES, COUNTERS)
+    with pytest.raises(ValueError):
+        SegmentWriter(segment, 2)
+    with pytest.raises(IndexError):
+        segment.tenant_offset(2, 0)
+    homework_module.get_shared.cache_clear()
+    monkeypatch.setattr(homework_module, 'SHARED_STATE_FILE', path)
+    monkeypatch.setattr(homework_module, 'SHARED_WORKER', 5)
+    try:
+        assert homework_module.get_shared() is None, (
+            'Неверный номер обработчика не должен останавливать бота.'
+        )
+    finally:
+        homework_module.get_shared.cache_clear()
@@ -0,0 +1,41 @@
+from simulation import (START_TIME, ScriptedApi, VirtualClock,
+                        generate_timelines, simulate)
+
+
+def test_scripted_api_returns_events_since_cursor():
+    clock = VirtualClock()
+    api = ScriptedApi({'token': [
+        (START_TIME + 10, 'hw1', 'reviewing'),
+        (START_TIME + 20, 'hw1', 'approved'),
+    ]}, clock)
+    assert api.fetch(START_TIME, 'token')['homeworks'] == []
+    clock.sleep(30)
+    homeworks = api.fetch(START_TIME, 'token')['homeworks']
+    assert [homework['status'] for homework in homeworks] == [
+        'approved', 'reviewing'
+    ], 'Ответ должен содержать работы от новых к старым.'
+    assert api.fetch(START_TIME + 10, 'token')['homeworks'] == homeworks[:1]
+
+
+def test_simulate_scripted_scenario():
+    report = simulate(
+        {'token': [
+            (START_TIME + 100, 'hw1', 'reviewing'),
+            (START_TIME + 1000, 'hw1', 'approved'),
+        ]},
+        duration=3600,
+        chats_per_token=2,
+    )
+    assert report['api_calls'] == 6
+    assert report['messages_sent'] == 4
+    assert report['delay_max'] == 500, (
+        'Задержка должна считаться от смены статуса до отправки.'
+    )
+
+
+def test_simulate_day_for_many_tenants():
+    duration = 24 * 3600
+    report = simulate(generate_timelines(1000, duration), duration)
+    assert report['api_calls'] == 1000 * 144, (
+        'Сутки опроса тысячи арендаторов должны моделироваться целиком.'
+    )
@@ -0,0 +1,125 @@
+import json
+
+from faults import FaultResponse
+from sources import Poller, Source, load_sources
+from utils import FakeClock
+
+
+class FakeSession:
+    def __init__(self, payloads):
+        self.payloads = payloads
+        self.requests = []
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        self.requests.append((url, headers, params))
+        payload = self.payloads[url]
+        if isinstance(payload, int):
+            return FaultResponse(payload, '')
+        return FaultResponse(200, json.dumps(payload))
+
+
+def test_sources_share_session_and_queue():
+    clock = FakeClock(1000)
+    session = FakeSession({
+        'https://a/': {'items': [{'id': 1, 'state': 'up'}], 'ts': 1100},
+        'https://b/': 500,
+    })
+    sent = []
+    poller = Poller(lambda chat, text: sent.append((chat, text)) or True,
+                    session=session, clock=clock)
+    first = poller.add(Source(
+        'a', 'https://a/', '1', headers={'Authorization': 'Bearer x'},
+        cursor_param='since', cursor_field='ts', template='{id}: {state}',
+        interval=60, cursor=0
+    ))
+    poller.add(Source('b', 'https://b/', '2', template='{id}', cursor=0))
+    assert poller.tick()
+    assert sent == [('1', '1: up')]
+    assert session.requests[0] == (
+        'https://a/', {'Authorization': 'Bearer x'}, {'since': 0}
+    )
+    assert first.cursor == 1100
+    clock.now += 60
+    poller.tick()
+    assert [url for url, _, _ in session.requests] == [
+        'https://a/', 'https://b/', 'https://a/'
+    ], 'Источники должны опрашиваться каждый со своим периодом.'
+    assert session.requests[-1][2] == {'since': 1100}
+
+
+def test_failed_send_stays_in_queue():
+    clock = FakeClock(1000)
+    session = FakeSession({'https://a/': {'items': [{'id': 1}, {'id': 2}]}})
+    results = [False, True, True]
+    sent = []
+
+    def send(chat_id, text):
+        sent.append(text)
+        return results.pop(0)
+
+    poller = Poller(send, session=session, clock=clock)
+    poller.add(Source('a', 'https://a/', '1', template='{id}', cursor=0))
+    assert not poller.tick()
+    assert poller.tick()
+    assert sent == ['1', '1', '2'], (
+        'Неотправленное сообщение должно отправляться первым в следующий тик.'
+    )
+
+
+def test_load_sources_with_renderer(tmp_path):
+    path = tmp_path / 'sources.json'
+    path.write_text(json.dumps([{
+        'name': 'practicum', 'endpoint': 'https://p/', 'chat_id': '1',
+        'items_field': 'homeworks', 'renderer': 'json:dumps',
+    }]), encoding='utf-8')
+    source, = load_sources(str(path))
+    assert source.render({'homework_name': 'hw1'}) == (
+        '{"homework_name": "hw1"}'
+    )
+
+
+def test_failing_chat_does_not_block_others():
+    clock = FakeClock(1000)
+    session = FakeSession({
+        'https://a/': {'items': [{'id': 1}]},
+        'https://b/': {'items': [{'id': 2}, {'name': 'no id'}]},
+        'https://c/': {'items': [{'id': 3}]},
+    })
+    sent = []
+
+    def send(chat_id, text):
+        sent.append(text)
+        return chat_id != '1'
+
+    poller = Poller(send, session=session, clock=clock, queue_size=1)
+    for name, chat_id in (('a', '1'), ('b', '2'), ('c', '3')):
+        poller.add(Source(name, f'https://{name}/', chat_id,
+                          template='{id}', cursor=0))
+    assert not poller.tick()
+    assert sent == ['1', '3'], (
+        'Сбой отрисовки не должен ставить в очередь часть ответа, '
+        'а сбой отправки в один чат - задерживать другие.'
+    )
+    assert poller.sources[1].cursor == 0
+    clock.now += 600
+    poller.tick()
+    assert list(poller.queues) == ['1'] and len(poller.queues['1']) == 1
+
+
+def test_sources_follow_bot_wakeups(homework_module):
+    poller = Poller(None, session=FakeSession({}), min_interval=600)
+    source = poller.add(Source('a', 'https://a/', '1', interval=300))
+    assert source.interval == 600, (
+        'Период источника не может быть короче периода пробуждения бота.'
+    )
+    clock = FakeClock(1000)
+    hub = homework_module.Hub(
+        None, None, None, None, '{new_error}', clock=clock,
+        intervals={None: 1800}
+    )
+    hub.subscribe('token', '1')
+    hub.scheduler.schedule(0, 1800)
+    scheduled = Poller(None, session=FakeSession({}), clock=clock)
+    scheduled.add(Source('b', 'https://b/', '1', interval=60, cursor=0))
+    scheduled.scheduler.schedule(0, 1060)
+    assert homework_module.sleep_period(hub, scheduled) == 60
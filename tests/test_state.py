@@ -0,0 +1,36 @@
+from state import TenantStates
+
+BYTES_PER_TENANT_BUDGET = 32
+
+
+def test_tenant_states_round_trip():
+    states = TenantStates(('approved', 'reviewing', 'rejected'))
+    first = states.add(timestamp=100)
+    second = states.add(timestamp=200)
+    assert (first, second) == (0, 1)
+    assert states.get_status(first) is None
+    states.set_status(second, 'reviewing')
+    states.set_status(first, 'unknown')
+    assert states.get_status(second) == 'reviewing'
+    assert states.get_status(first) == 'unknown', (
+        'Новые статусы должны интернироваться на лету.'
+    )
+    assert states.timestamps[second] == 200
+
+
+def test_tenant_states_error_dedup():
+    states = TenantStates()
+    tenant = states.add()
+    assert states.is_new_error(tenant, 'Сбой')
+    states.set_error(tenant, 'Сбой')
+    assert not states.is_new_error(tenant, 'Сбой')
+    assert states.is_new_error(tenant, 'Другой сбой')
+
+
+def test_tenant_states_memory_budget():
+    states = TenantStates()
+    states.extend(10_000)
+    assert len(states) == 10_000
+    assert states.nbytes() / len(states) <= BYTES_PER_TENANT_BUDGET, (
+        'Состояние арендатора не укладывается в бюджет памяти.'
+    )
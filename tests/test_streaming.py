@@ -0,0 +1,142 @@
+import json
+import tracemalloc
+
+import pytest
+import requests
+
+import utils
+from exceptions import ApiError
+from streaming import HomeworkStream
+
+
+def chunked(data, size):
+    raw = json.dumps(data, ensure_ascii=False).encode()
+    return [raw[index:index + size] for index in range(0, len(raw), size)]
+
+
+@pytest.mark.parametrize('size', (1, 7, 4096))
+def test_stream_yields_homeworks_and_fields(size):
+    data = {
+        'homeworks': [
+            {'homework_name': 'Проект', 'status': 'approved', 'id': 12345},
+            {'homework_name': 'hw2', 'status': 'reviewing', 'id': 1.5e3},
+        ],
+        'current_date': 1234567890,
+    }
+    stream = HomeworkStream(chunked(data, size))
+    assert list(stream) == data['homeworks'], (
+        'Работы должны выдаваться целиком независимо от размера кусков.'
+    )
+    assert stream.fields == {'current_date': 1234567890}
+
+
+def test_stream_yields_before_download_completes():
+    received = []
+
+    def chunks():
+        yield b'{"homeworks": [{"homework_name": "hw1", "status": "approved"}'
+        received.append('first chunk consumed')
+        yield b', {"homework_name": "hw2", "status": "approved"}]}'
+
+    stream = iter(HomeworkStream(chunks()))
+    assert next(stream)['homework_name'] == 'hw1'
+    assert received == [], (
+        'Первая работа должна выдаваться до загрузки всего ответа.'
+    )
+
+
+@pytest.mark.parametrize('data, error', (
+    ([], TypeError),
+    ({'current_date': 1}, KeyError),
+    ({'homeworks': {'status': 'approved'}}, TypeError),
+    ({'homeworks': [1]}, TypeError),
+    ({'code': 'not_authenticated', 'homeworks': []}, ApiError),
+))
+def test_stream_validates_response(data, error):
+    with pytest.raises(error):
+        list(HomeworkStream(chunked(data, 5)))
+
+
+def test_stream_truncated_response():
+    with pytest.raises(ValueError):
+        list(HomeworkStream([b'{"homeworks": [{"homework_name": "hw']))
+
+
+def test_stream_memory_is_bounded_by_item():
+    item = b'{"homework_name": "hw", "status": "approved", "x": "' + (
+        b'a' * 1000
+    ) + b'"}'
+
+    def chunks():
+        yield b'{"homeworks": ['
+        for index in range(5000):
+            yield (b',' if index else b'') + item
+        yield b'], "current_date": 1}'
+
+    tracemalloc.start()
+    try:
+        count = sum(1 for _ in HomeworkStream(chunks()))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert count == 5000
+    assert peak < 1_000_000, (
+        'Память потокового разбора не должна расти с размером ответа.'
+    )
+
+
+class StreamResponse(utils.MockResponseGET):
+    closed = False
+
+    def iter_content(self, chunk_size):
+        return chunked(self.data, 3)
+
+    def close(self):
+        self.closed = True
+
+
+def test_poll_stream(monkeypatch, homework_module):
+    responses = []
+
+    def mock_get(*args, **kwargs):
+        assert kwargs.get('stream'), 'Ответ должен загружаться потоково.'
+        responses.append(StreamResponse(*args, data={
+            'homeworks': [
+                {'homework_name': 'hw0', 'status': 'bogus'},
+                {'homework_name': 'hw1', 'status': 'approved'},
+            ],
+            'current_date': 100,
+        }, **kwargs))
+        return responses[-1]
+
+    sent = []
+    remembered = []
+    monkeypatch.setattr(
+        homework_module, 'remember',
+        lambda chat_id, homeworks: remembered.extend(homeworks)
+    )
+    monkeypatch.setattr(requests, 'get', mock_get)
+    monkeypatch.setattr(homework_module, 'STREAM_RESPONSES', True)
+    monkeypatch.setattr(
+        homework_module, 'send_message',
+        lambda bot, message: sent.append(message) or True
+    )
+    extensions = homework_module.Extensions(None, None, None, None)
+    assert homework_module.poll_once(None, 0, extensions) == 100
+    assert sent == [homework_module.parse_status(
+        {'homework_name': 'hw1', 'status': 'approved'}
+    )], 'Работа, не соответствующая схеме, должна отбрасываться.'
+    assert [hw['homework_name'] for hw in remembered] == ['hw1']
+    assert responses[0].closed, 'Потоковый ответ должен закрываться.'
+
+
+def test_poll_stream_closes_response_on_error(monkeypatch, homework_module):
+    response = StreamResponse(data={'homeworks': {}})
+    monkeypatch.setattr(requests, 'get', lambda *args, **kwargs: response)
+    monkeypatch.setattr(homework_module, 'STREAM_RESPONSES', True)
+    extensions = homework_module.Extensions(None, None, None, None)
+    with pytest.raises(TypeError):
+        homework_module.poll_once(None, 0, extensions)
+    assert response.closed, (
+        'Соединение должно закрываться и при ошибке разбора ответа.'
+    )
@@ -0,0 +1,207 @@
+import json
+
+import pytest
+import requests
+
+import utils
+from digest import Digest
+from subscriptions import Hub, load_subscriptions, tenant_id
+
+VERDICTS = {'approved': 'Ура!', 'reviewing': 'На проверке.'}
+
+
+def parse(homework):
+    return f'{homework["homework_name"]}: {VERDICTS[homework["status"]]}'
+
+
+def check(response):
+    if 'homeworks' not in response:
+        raise KeyError('homeworks')
+
+
+class Recorder:
+    def __init__(self, responses):
+        self.responses = responses
+        self.fetched = []
+        self.sent = []
+
+    def fetch(self, timestamp, token):
+        self.fetched.append((timestamp, token))
+        return self.responses[token]
+
+    def send(self, chat_id, message):
+        self.sent.append((chat_id, message))
+        return True
+
+
+@pytest.fixture
+def recorder():
+    return Recorder({
+        'token1': {
+            'homeworks': [{'homework_name': 'hw1', 'status': 'approved'}],
+            'current_date': 500
+        },
+        'token2': {'homeworks': [], 'current_date': 500},
+    })
+
+
+def make_hub(recorder, digest=None):
+    hub = Hub(
+        recorder.fetch, check, parse, recorder.send,
+        'Сбой: {new_error}', digest=digest, clock=lambda: 100
+    )
+    for token, chat_id in (('token1', 'student'), ('token1', 'mentor'),
+                           ('token1', 'cohort'), ('token2', 'other')):
+        hub.subscribe(token, chat_id)
+    return hub
+
+
+def test_hub_polls_once_per_token(recorder):
+    hub = make_hub(recorder)
+    hub.poll_all()
+    assert recorder.fetched == [(100, 'token1'), (100, 'token2')], (
+        'API должен опрашиваться один раз на уникальный токен.'
+    )
+    assert recorder.sent == [
+        (chat_id, 'hw1: Ура!') for chat_id in ('student', 'mentor', 'cohort')
+    ]
+    assert hub.states.timestamps[hub.tenants['token1']] == 500
+    assert hub.states.get_status(hub.tenants['token1']) == 'approved'
+
+
+def test_hub_sends_error_once(recorder):
+    recorder.responses['token2'] = {}
+    hub = make_hub(recorder)
+    hub.poll(hub.tenants['token2'])
+    hub.poll(hub.tenants['token2'])
+    assert recorder.sent == [('other', "Сбой: 'homeworks'")], (
+        'Одинаковая ошибка должна отправляться подписчикам один раз.'
+    )
+
+
+def test_hub_with_digest(recorder):
+    digest = Digest(VERDICTS, 0, 10, clock=lambda: 0)
+    hub = make_hub(recorder, digest=digest)
+    hub.poll_all()
+    assert [chat_id for chat_id, _ in recorder.sent] == [
+        'student', 'mentor', 'cohort'
+    ]
+    assert all('Ура!' in message for _, message in recorder.sent)
+
+
+def test_load_subscriptions(tmp_path):
+    path = tmp_path / 'subscriptions.json'
+    path.write_text(json.dumps({
+        'token1': ['1', 2], 'token2': {'name': 'cohort', 'chats': ['3']}
+    }))
+    assert load_subscriptions(str(path)) == [
+        ('token1', '1', None), ('token1', '2', None), ('token2', '3', 'cohort')
+    ]
+
+
+@pytest.mark.parametrize('subscriptions', (
+    {'token1': {'name': 'default', 'chats': ['1']}},
+    {
+        'token1': {'name': 'cohort', 'chats': ['1']},
+        'token2': {'name': 'cohort', 'chats': ['2']},
+    },
+))
+def test_load_subscriptions_rejects_duplicate_names(tmp_path, subscriptions):
+    path = tmp_path / 'subscriptions.json'
+    path.write_text(json.dumps(subscriptions))
+    with pytest.raises(ValueError):
+        load_subscriptions(str(path))
+
+
+def test_hub_rejects_duplicate_names(recorder):
+    hub = make_hub(recorder)
+    hub.subscribe('token3', 'named', 'cohort')
+    hub.subscribe('token3', 'other', 'cohort')
+    with pytest.raises(ValueError):
+        hub.subscribe('token4', 'named', 'cohort')
+    assert hub.names[-1] == 'cohort' and len(hub.names) == 3, (
+        'Арендатор с занятым именем не должен добавляться.'
+    )
+
+
+def test_tenant_names_are_stable(recorder):
+    hub = make_hub(recorder)
+    hub.subscribe('token3', 'named', 'cohort')
+    assert hub.names == [tenant_id('token1'), tenant_id('token2'), 'cohort']
+    other = Hub(recorder.fetch, check, parse, recorder.send, '{new_error}')
+    other.subscribe('token2', 'other')
+    other.subscribe('token1', 'student')
+    assert other.names[1] == hub.names[0], (
+        'Имя арендатора не должно зависеть от порядка подписок.'
+    )
+
+
+@pytest.mark.parametrize('failure', ('exception', 'status'))
+def test_api_errors_do_not_leak_token(monkeypatch, homework_module, failure):
+    def get(*args, **kwargs):
+        if failure == 'exception':
+            raise requests.RequestException('Something wrong')
+        return utils.MockResponseGET(http_status=500)
+
+    monkeypatch.setattr(requests, 'get', get)
+    with pytest.raises(Exception) as error:
+        homework_module.get_token_api_answer(0, 'STUDENT_TOKEN')
+    message = homework_module.ERROR_MESSAGE.format(new_error=error.value)
+    assert 'STUDENT_TOKEN' not in message, (
+        'Токен не должен попадать в сообщение об ошибке для подписчиков.'
+    )
+
+
+def test_failing_chat_does_not_repeat_others(recorder):
+    blocked = {'mentor'}
+    sent = recorder.sent
+    fetch = recorder.fetch
+
+    def fetch_since(timestamp, token):
+        response = fetch(timestamp, token)
+        if timestamp >= response['current_date']:
+            return {'homeworks': [], 'current_date': timestamp}
+        return response
+
+    def send(chat_id, message):
+        if chat_id in blocked:
+            return False
+        sent.append((chat_id, message))
+        return True
+
+    recorder.fetch = fetch_since
+    recorder.send = send
+    hub = make_hub(recorder)
+    for _ in range(3):
+        hub.poll_all()
+    assert sorted(sent) == [
+        ('cohort', 'hw1: Ура!'), ('student', 'hw1: Ура!')
+    ], 'Сбой одного подписчика не должен повторять рассылку остальным.'
+    assert hub.states.timestamps[hub.tenants['token1']] == 500
+    blocked.clear()
+    hub.poll_all()
+    assert ('mentor', 'hw1: Ура!') in sent, (
+        'Неотправленное сообщение должно доходить после восстановления чата.'
+    )
+
+
+def test_hub_marks_each_tenant_for_watchdog(recorder):
+    beats = []
+
+    class Watchdog:
+        def begin(self, tenant):
+            beats.append(('begin', tenant))
+
+        def end(self, tenant):
+            beats.append(('end', tenant))
+
+    hub = make_hub(recorder)
+    hub.watchdog = Watchdog()
+    hub.poll_all()
+    assert beats == [
+        (event, name) for name in hub.names for event in ('begin', 'end')
+    ], 'Сторож должен отмечать цикл каждого арендатора отдельно.'
+    restored = make_hub(recorder)
+    restored.restore(hub.cursors())
+    assert restored.cursors() == hub.cursors()
+    assert restored.cursors()[hub.names[0]] == 500
@@ -1,10 +1,15 @@
+import json
 import logging
 import signal
+import socketserver
 import re
+import threading
+import time
 from collections import namedtuple
 from contextlib import contextmanager
 from functools import wraps
 from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from inspect import signature
 from types import ModuleType
 
@@ -114,6 +119,16 @@ class MockTelegramBot:
         self.text = text
 
 
+class FakeClock:
+    """Manually advanced clock for code that takes a `clock` callable."""
+
+    def __init__(self, now=0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
 class BreakInfiniteLoop(Exception):
     pass
 
@@ -165,3 +180,92 @@ def with_timeout(f):
             )
 
     return inner
+
+
+class LocalServer:
+    """Base for local stand-ins running in a background thread."""
+
+    def start(self):
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+        self.thread.start()
+        return self
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class LocalSMTPServer(LocalServer):
+    """Minimal SMTP stand-in that stores received messages."""
+
+    def __init__(self, delay=0):
+        self.messages = []
+        stand_in = self
+
+        class SMTPHandler(socketserver.StreamRequestHandler):
+            def reply(self, line):
+                self.wfile.write(line.encode() + b'\r\n')
+
+            def handle(self):
+                self.reply('220 localhost')
+                while True:
+                    line = self.rfile.readline().decode().strip()
+                    command = line[:4].upper()
+                    if not line or command == 'QUIT':
+                        self.reply('221 bye')
+                        return
+                    if command == 'EHLO':
+                        self.reply('250 localhost')
+                    elif command == 'DATA':
+                        self.reply('354 go ahead')
+                        self.receive()
+                    else:
+                        self.reply('250 ok')
+
+            def receive(self):
+                lines = []
+                while True:
+                    line = self.rfile.readline().decode()
+                    if line in ('.\r\n', ''):
+                        break
+                    lines.append(line)
+                time.sleep(delay)
+                stand_in.messages.append(''.join(lines))
+                self.reply('250 queued')
+
+        self.server = socketserver.ThreadingTCPServer(
+            ('127.0.0.1', 0), SMTPHandler
+        )
+        self.server.daemon_threads = True
+
+
+class LocalWebhookServer(LocalServer):
+    """HTTP stand-in that stores JSON bodies of POST requests."""
+
+    def __init__(self, delay=0, http_status=HTTPStatus.OK):
+        self.requests = []
+        stand_in = self
+
+        class WebhookHandler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers['Content-Length'])
+                stand_in.requests.append(json.loads(self.rfile.read(length)))
+                time.sleep(delay)
+                self.send_response(http_status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), WebhookHandler)
+        self.server.daemon_threads = True